@@ -0,0 +1,22 @@
+"""
+Benchmarks for the Citation Tool Python SDK.
+
+Times loading, searching, statistics, exports and formatting on
+deterministic synthetic exports and writes the results as JSON so runs
+can be compared across releases:
+
+    python -m benchmarks run --sizes 1k 10k 100k --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
+
+from .generator import ExportGenerator, generate_export
+from .runner import BENCHMARKS, compare_results, load_results, run_benchmarks
+
+__all__ = [
+    "ExportGenerator",
+    "generate_export",
+    "BENCHMARKS",
+    "run_benchmarks",
+    "compare_results",
+    "load_results",
+]
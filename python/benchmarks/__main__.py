@@ -0,0 +1,96 @@
+"""
+Command line entry point: ``python -m benchmarks <command>``.
+
+Commands:
+    run       Time the suite and write results as JSON
+    compare   Compare two results files and flag regressions
+    generate  Write a synthetic export
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .generator import generate_export
+from .runner import (
+    DEFAULT_DATA_DIR, DEFAULT_REPEAT, DEFAULT_SIZES, DEFAULT_THRESHOLD, compare_results,
+    format_comparison, load_results, parse_size, run_benchmarks
+)
+
+
+def _log(line: str) -> None:
+    print(line, file=sys.stderr, flush=True)
+
+
+def _report(baseline_path: str, current: dict, threshold: float) -> int:
+    rows = compare_results(load_results(baseline_path), current, threshold)
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {threshold:.0%}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n")[1]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmark suite")
+    run.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=list(DEFAULT_SIZES),
+        help="library sizes, e.g. 1k 10k 1M (default: 1k 10k 100k)"
+    )
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="samples per benchmark")
+    run.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    run.add_argument(
+        "--only", nargs="+", metavar="PREFIX",
+        help="run benchmarks whose name starts with a prefix, e.g. search load"
+    )
+    run.add_argument(
+        "--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+        help=f"where generated exports are kept (default: {DEFAULT_DATA_DIR})"
+    )
+    run.add_argument("--output", "-o", type=Path, help="results file (default: stdout)")
+    run.add_argument("--baseline", help="compare against this results file")
+    run.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="relative slowdown reported as a regression (default: 0.10)"
+    )
+
+    compare = commands.add_parser("compare", help="compare two results files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    generate = commands.add_parser("generate", help="write a synthetic export")
+    generate.add_argument("size", type=parse_size)
+    generate.add_argument("output", type=Path)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--domains", type=int, default=12)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        generate_export(args.output, args.size, args.seed, args.domains)
+        return 0
+    if args.command == "compare":
+        return _report(args.baseline, load_results(args.current), args.threshold)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.seed, args.only, args.data_dir, _log)
+    text = json.dumps(results, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    if args.baseline:
+        return _report(args.baseline, results, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
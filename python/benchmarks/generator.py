@@ -0,0 +1,293 @@
+"""
+Deterministic synthetic Citation Tool exports.
+
+Produces files in the web app's ``CitationExport`` JSON shape (``version``,
+``exportDate``, ``citations``, ``domains``, ``metadata``) with the skew of
+a real library: a few prolific authors, popular tags and domains, and
+publication years concentrated in the last decade. The same size and seed
+always give byte-identical output. Records are written as they are
+generated, so multi-million record files need little memory.
+"""
+
+import json
+import random
+import uuid
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, TextIO, Tuple, Union
+
+from citation_tool.models import CitationType
+
+EXPORT_VERSION = "1.0"
+
+# Fixed so that output does not depend on when it was generated
+EXPORT_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+NEWEST_YEAR = 2024
+OLDEST_YEAR = 1950
+
+_TYPE_WEIGHTS: Sequence[Tuple[CitationType, float]] = (
+    (CitationType.ARTICLE, 45),
+    (CitationType.IN_PROCEEDINGS, 30),
+    (CitationType.BOOK, 5),
+    (CitationType.IN_BOOK, 4),
+    (CitationType.TECH_REPORT, 4),
+    (CitationType.THESIS, 3),
+    (CitationType.WEBSITE, 3),
+    (CitationType.STANDARD, 2),
+    (CitationType.MANUAL, 1),
+    (CitationType.PATENT, 1),
+    (CitationType.MISC, 2),
+)
+
+_DOMAIN_NAMES = (
+    "Artificial Intelligence", "Computer Vision", "Natural Language Processing",
+    "Distributed Systems", "Databases", "Security", "Networking", "Human-Computer Interaction",
+    "Quantum Computing", "Bioinformatics", "Robotics", "Programming Languages",
+    "Software Engineering", "Theory", "Graphics", "Information Retrieval",
+)
+_COLORS = ("#0d6efd", "#6610f2", "#d63384", "#dc3545", "#fd7e14", "#198754", "#20c997", "#0dcaf0")
+
+_WORDS = (
+    "learning deep neural network model data analysis system efficient scalable robust "
+    "transformer attention graph optimization distributed secure privacy inference language "
+    "vision quantum cloud kubernetes federated reinforcement adversarial generative "
+    "representation embedding retrieval search index query database storage consistency "
+    "replication consensus protocol latency throughput compiler type program verification "
+    "synthesis hardware accelerator energy memory cache parallel concurrent streaming "
+    "benchmark evaluation survey framework approach method algorithm theory bounds complexity "
+    "approximation randomized online estimation sampling bayesian probabilistic causal "
+    "interpretable fairness medical genomic protein molecular climate simulation robotics "
+    "control planning perception segmentation detection tracking recognition translation "
+    "summarization dialogue question answering knowledge reasoning multimodal sparse dense "
+    "pretraining finetuning compression quantization pruning distillation edge mobile"
+).split()
+_STOPWORDS = ("a", "the", "for", "of", "in", "with", "on", "via", "towards", "and")
+_GIVEN = (
+    "Alice Bob Carol David Emma Feng Grace Hiro Ines Jun Karim Lena Maria Nikhil Olga "
+    "Pedro Qian Rosa Sven Tariq Uma Victor Wei Ximena Yusuf Zoe Ada Björn Chloé Dmitri "
+    "Élodie Farah Gustavo Hana Ivan Jana Kenji Lars Mei Noor"
+).split()
+_FAMILY = (
+    "Smith Johnson Lee Wang Zhang Garcia Müller Kim Nguyen Patel Rossi Silva Tanaka "
+    "Kowalski Novak Ivanov Chen Li Brown Martin Dubois Schmidt Sato Singh Kumar Ahmed "
+    "Hernández O'Neil Andersson Jensen Costa Yilmaz Popescu Nakamura Fischer Rahman"
+).split()
+_VENUES = (
+    "NeurIPS", "ICML", "ICLR", "CVPR", "ACL", "EMNLP", "SIGMOD", "VLDB", "OSDI", "SOSP",
+    "NSDI", "CCS", "USENIX Security", "CHI", "PLDI", "POPL", "STOC", "FOCS", "KDD", "WWW",
+    "Nature", "Science", "Communications of the ACM", "IEEE Transactions on Software Engineering",
+    "Journal of Machine Learning Research", "ACM Computing Surveys",
+)
+_PUBLISHERS = ("ACM", "IEEE", "Springer", "Elsevier", "MIT Press", "O'Reilly", "USENIX")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative weights of a Zipf distribution over ``count`` ranks."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class _Pick:
+    """Draws items with fixed cumulative weights."""
+
+    def __init__(self, items: Sequence[Any], cum_weights: List[float]):
+        self.items = items
+        self.cum_weights = cum_weights
+        self.total = cum_weights[-1]
+
+    def __call__(self, rng: random.Random) -> Any:
+        return self.items[bisect(self.cum_weights, rng.random() * self.total)]
+
+
+class ExportGenerator:
+    """
+    Generates a synthetic export of a given size.
+
+    Example:
+        >>> ExportGenerator(10_000, seed=1).write("bench-10k.json")
+    """
+
+    def __init__(self, count: int, seed: int = 0, domains: int = 12):
+        """
+        Args:
+            count: Number of citations
+            seed: Random seed; equal seeds give identical exports
+            domains: Number of domains (at most 16)
+        """
+        self.count = count
+        self.seed = seed
+        rng = random.Random(f"{seed}:setup")
+
+        self.domains = [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "name": name,
+                "description": f"Research on {name.lower()}",
+                "color": _COLORS[i % len(_COLORS)],
+                "dateCreated": _iso(EXPORT_DATE - timedelta(days=900 - i)),
+            }
+            for i, name in enumerate(_DOMAIN_NAMES[:max(1, min(domains, len(_DOMAIN_NAMES)))])
+        ]
+        self._domain = _Pick([d["id"] for d in self.domains], _zipf_weights(len(self.domains)))
+
+        # The author pool grows with the library, as in real collections
+        names = [f"{g} {f}" for f in _FAMILY for g in _GIVEN]
+        rng.shuffle(names)
+        pool_size = max(200, count // 4)
+        authors = [
+            names[i] if i < len(names) else f"{names[i % len(names)]} {i // len(names)}"
+            for i in range(pool_size)
+        ]
+        self._author = _Pick(authors, _zipf_weights(pool_size, 1.05))
+
+        tags = [f"{a}-{b}" for a in _WORDS[:20] for b in _WORDS[20:40]]
+        rng.shuffle(tags)
+        tags = sorted(_WORDS[:40]) + tags[:260]
+        self._tag = _Pick(tags, _zipf_weights(len(tags), 1.2))
+        self._word = _Pick(_WORDS, _zipf_weights(len(_WORDS), 0.9))
+        self._venue = _Pick(_VENUES, _zipf_weights(len(_VENUES)))
+        types = [t for t, _ in _TYPE_WEIGHTS]
+        self._type = _Pick(types, list(accumulate(w for _, w in _TYPE_WEIGHTS)))
+
+    def _title(self, rng: random.Random) -> str:
+        words = [self._word(rng) for _ in range(rng.randint(3, 10))]
+        if len(words) > 4:
+            words.insert(rng.randrange(1, len(words) - 1), rng.choice(_STOPWORDS))
+        return " ".join(words).capitalize()
+
+    def iter_citations(self) -> Iterator[Dict[str, Any]]:
+        """Yield the export's citation records in order."""
+        rng = random.Random(f"{self.seed}:citations")
+        for i in range(self.count):
+            citation_type = self._type(rng)
+            year = max(OLDEST_YEAR, NEWEST_YEAR - int(rng.expovariate(1 / 7)))
+            authors: List[str] = []
+            for _ in range(min(1 + int(rng.expovariate(1 / 2.5)), 30)):
+                author = self._author(rng)
+                if author not in authors:
+                    authors.append(author)
+            tags: List[str] = []
+            for _ in range(rng.choice((0, 1, 1, 2, 2, 3, 4, 6))):
+                tag = self._tag(rng)
+                if tag not in tags:
+                    tags.append(tag)
+            added = EXPORT_DATE - timedelta(seconds=rng.randrange(5 * 365 * 86400))
+            modified = added
+            if rng.random() < 0.3:
+                modified += timedelta(seconds=rng.randrange(90 * 86400))
+            citation_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            is_paper = citation_type in (CitationType.ARTICLE, CitationType.IN_PROCEEDINGS)
+            is_book = citation_type in (CitationType.BOOK, CitationType.IN_BOOK)
+            first_page = rng.randint(1, 900)
+            isbn = "978-%d-%04d-%04d-%d" % (
+                rng.randint(0, 9), rng.randint(0, 9999), rng.randint(0, 9999), rng.randint(0, 9)
+            )
+            doi = f"10.{rng.randint(1000, 9999)}/{citation_id[:8]}.{i}"
+            url = f"https://example.org/papers/{citation_id[:13]}"
+
+            record: Dict[str, Any] = {
+                "id": citation_id,
+                "title": self._title(rng),
+                "authors": authors,
+                "type": citation_type.value,
+                "journalOrConference": self._venue(rng) if is_paper else None,
+                "volume": str(rng.randint(1, 60)) if is_paper and rng.random() < 0.7 else None,
+                "issue": str(rng.randint(1, 12)) if is_paper and rng.random() < 0.5 else None,
+                "pages": f"{first_page}-{first_page + rng.randint(4, 30)}" if is_paper else None,
+                "year": year if rng.random() < 0.97 else None,
+                "month": rng.choice(_MONTHS) if rng.random() < 0.4 else None,
+                "publisher": rng.choice(_PUBLISHERS) if rng.random() < 0.5 else None,
+                "doi": doi if rng.random() < 0.6 else None,
+                "url": url if rng.random() < 0.5 else None,
+                "isbn": isbn if is_book else None,
+                "abstract": " ".join(self._word(rng) for _ in range(rng.randint(40, 160)))
+                if rng.random() < 0.7 else None,
+                "notes": f"Read {rng.choice(_MONTHS)} {year}; see section {rng.randint(1, 9)}"
+                if rng.random() < 0.1 else None,
+                "tags": tags,
+                "domainId": self._domain(rng) if rng.random() < 0.9 else None,
+                "dateAdded": _iso(added),
+                "dateModified": _iso(modified),
+            }
+            if record["url"] and rng.random() < 0.2:
+                healthy = rng.random() < 0.85
+                record["lastHealthCheck"] = {
+                    "checkedAt": _iso(modified),
+                    "statusCode": 200 if healthy else rng.choice((404, 500, 0)),
+                    "isHealthy": healthy,
+                    "errorMessage": None if healthy else "Not Found",
+                }
+            yield record
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """
+        Write the export to a file.
+
+        Args:
+            path: Output file
+
+        Returns:
+            The path written
+        """
+        path = Path(path)
+        with open(path, "w", encoding="utf-8") as f:
+            self.write_to(f)
+        return path
+
+    def write_to(self, f: TextIO) -> None:
+        """Write the export to an open text file."""
+        oldest = newest = None
+        tags: Dict[str, None] = {}
+        types: Dict[str, int] = {}
+        f.write('{"version": "%s", "exportDate": "%s", "citations": [' % (
+            EXPORT_VERSION, _iso(EXPORT_DATE)
+        ))
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+        for i, record in enumerate(self.iter_citations()):
+            f.write(",\n" if i else "\n")
+            f.write(dumps(record))
+            year = record["year"]
+            if year:
+                oldest = year if oldest is None else min(oldest, year)
+                newest = year if newest is None else max(newest, year)
+            for tag in record["tags"]:
+                tags[tag] = None
+            types[record["type"]] = types.get(record["type"], 0) + 1
+        metadata = {
+            "citationCount": self.count,
+            "domainCount": len(self.domains),
+            "oldestYear": oldest,
+            "newestYear": newest,
+            "tags": sorted(tags),
+            "citationTypes": types,
+        }
+        f.write('\n], "domains": %s, "metadata": %s}\n' % (
+            json.dumps(self.domains, ensure_ascii=False), json.dumps(metadata, ensure_ascii=False)
+        ))
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def generate_export(
+    path: Union[str, Path],
+    count: int,
+    seed: int = 0,
+    domains: int = 12
+) -> Path:
+    """
+    Write a synthetic export with ``count`` citations.
+
+    Args:
+        path: Output file
+        count: Number of citations
+        seed: Random seed
+        domains: Number of domains
+
+    Returns:
+        The path written
+    """
+    return ExportGenerator(count, seed, domains).write(path)
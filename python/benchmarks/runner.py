@@ -0,0 +1,433 @@
+"""
+Benchmark definitions, timing and result comparison.
+
+Each benchmark times one library operation on a synthetic export of a
+given size. Fast operations are repeated in a loop until a sample takes
+long enough to measure reliably; every benchmark reports the per-call
+minimum, median and mean over several samples. Results are plain JSON so
+runs from different releases can be compared with compare_results().
+"""
+
+import gc
+import json
+import math
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import citation_tool
+from citation_tool import CitationLibrary, CitationType
+
+from .generator import ExportGenerator
+
+RESULTS_SCHEMA = 1
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+
+# A sample runs the operation this long at least (in seconds)
+_MIN_SAMPLE_TIME = 0.05
+_MAX_NUMBER = 10_000
+
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "citation-tool-benchmarks"
+
+
+class Benchmark(NamedTuple):
+    """A named operation; ``setup`` receives the context and returns the callable to time."""
+    name: str
+    setup: Callable[["Context"], Callable[[], Any]]
+    # Timed once per sample, without a warm-up call (for slow operations)
+    single: bool = False
+    requires: Optional[str] = None
+
+
+class Context:
+    """Lazily created library shared by the benchmarks of one size."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._library: Optional[CitationLibrary] = None
+
+    @property
+    def library(self) -> CitationLibrary:
+        # No query cache: benchmarks measure the work, not cache hits
+        if self._library is None:
+            self._library = CitationLibrary(self.path, query_cache_size=0)
+        return self._library
+
+    @property
+    def top_domain(self) -> str:
+        """Name of the domain with the most citations."""
+        counts: Dict[str, int] = self.library.get_statistics()["by_domain"]
+        return max(counts, key=lambda name: counts[name])
+
+    @property
+    def top_tag(self) -> str:
+        """Most frequent tag."""
+        counts: Dict[str, int] = {}
+        for citation in self.library.citations:
+            for tag in citation.tags:
+                counts[tag] = counts.get(tag, 0) + 1
+        return max(counts, key=lambda tag: counts[tag])
+
+
+def _search(**kwargs: Any) -> Callable[[Context], Callable[[], Any]]:
+    def setup(ctx: Context) -> Callable[[], Any]:
+        library = ctx.library
+        return lambda: library.search(**kwargs)
+    return setup
+
+
+def _search_domain(ctx: Context) -> Callable[[], Any]:
+    library, domain = ctx.library, ctx.top_domain
+    return lambda: library.search(domain=domain)
+
+
+def _search_tags(ctx: Context) -> Callable[[], Any]:
+    library, tag = ctx.library, ctx.top_tag
+    return lambda: library.search(tags=[tag])
+
+
+def _search_combined(ctx: Context) -> Callable[[], Any]:
+    library, domain = ctx.library, ctx.top_domain
+    return lambda: library.search("learning", domain=domain, year_from=2018, limit=50)
+
+
+def _exists(ctx: Context) -> Callable[[], Any]:
+    library, domain = ctx.library, ctx.top_domain
+    return lambda: library.query(domain=domain, year_from=2023, year_to=2023).exists()
+
+
+def _statistics(ctx: Context) -> Callable[[], Any]:
+    library = ctx.library
+
+    def statistics() -> Any:
+        # The counts are kept once built; time building them from the citations
+        library.clear_facets()
+        return library.get_statistics()
+    return statistics
+
+
+def _export_bibtex(ctx: Context) -> Callable[[], Any]:
+    library = ctx.library
+
+    def export() -> Any:
+        # Formatted entries are cached on the library; time the formatting too
+        library.formatter.clear()
+        return library.export_bibtex()
+    return export
+
+
+def _format_all(style: str) -> Callable[[Context], Callable[[], Any]]:
+    def setup(ctx: Context) -> Callable[[], Any]:
+        citations = list(ctx.library.citations)
+        method = {"ieee": "format_ieee", "apa": "format_apa", "bibtex": "format_bibtex"}[style]
+        return lambda: [getattr(c, method)() for c in citations]
+    return setup
+
+
+def _format_many(warm: bool) -> Callable[[Context], Callable[[], Any]]:
+    def setup(ctx: Context) -> Callable[[], Any]:
+        library = ctx.library
+        if warm:
+            library.format_many(style="apa")
+            return lambda: library.format_many(style="apa")
+
+        def cold() -> Any:
+            library.formatter.clear()
+            return library.format_many(style="apa")
+        return cold
+    return setup
+
+
+BENCHMARKS: Sequence[Benchmark] = (
+    Benchmark("load", lambda ctx: lambda: CitationLibrary(ctx.path, query_cache_size=0), True),
+    Benchmark(
+        "load.compact",
+        lambda ctx: lambda: CitationLibrary(ctx.path, compact=True, query_cache_size=0),
+        True
+    ),
+    Benchmark(
+        "load.eager_index",
+        lambda ctx: lambda: CitationLibrary(ctx.path, eager_index=True, query_cache_size=0),
+        True
+    ),
+    Benchmark(
+        "load.streaming",
+        lambda ctx: lambda: CitationLibrary(ctx.path, streaming=True, query_cache_size=0),
+        True
+    ),
+    Benchmark("search.text", _search(query="learning")),
+    Benchmark("search.text_multi", _search(query="neural network")),
+    Benchmark("search.text_short", _search(query="ai")),
+    Benchmark("search.text_limit", _search(query="learning", limit=10)),
+    Benchmark("search.domain", _search_domain),
+    Benchmark("search.type_year", _search(
+        citation_type=CitationType.ARTICLE, year_from=2015, year_to=2020
+    )),
+    Benchmark("search.tags", _search_tags),
+    Benchmark("search.combined", _search_combined),
+    Benchmark("search.ranked", _search(query="transformer attention", ranked=True, limit=10)),
+    Benchmark("query.exists", _exists),
+    Benchmark("get_statistics", _statistics),
+    Benchmark("to_dataframe", lambda ctx: ctx.library.to_dataframe, True, requires="pandas"),
+    Benchmark("export_json", lambda ctx: ctx.library.export_json, True),
+    Benchmark("export_bibtex", _export_bibtex, True),
+    Benchmark("format.ieee", _format_all("ieee"), True),
+    Benchmark("format.apa", _format_all("apa"), True),
+    Benchmark("format.bibtex", _format_all("bibtex"), True),
+    Benchmark("format_many.cold", _format_many(warm=False), True),
+    Benchmark("format_many.warm", _format_many(warm=True)),
+)
+
+
+def parse_size(value: str) -> int:
+    """Parse a record count such as ``5000``, ``10k`` or ``5M``."""
+    text = value.strip().lower().replace("_", "")
+    factor = 1
+    if text.endswith("k"):
+        factor, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        factor, text = 1_000_000, text[:-1]
+    try:
+        size = int(float(text) * factor)
+    except ValueError:
+        raise ValueError(f"invalid size: {value!r}") from None
+    if size < 1:
+        raise ValueError(f"size must be positive: {value!r}")
+    return size
+
+
+def dataset_path(size: int, seed: int = 0, data_dir: Union[str, Path] = DEFAULT_DATA_DIR) -> Path:
+    """
+    Return the synthetic export for a size and seed, generating it if needed.
+
+    Args:
+        size: Number of citations
+        seed: Generator seed
+        data_dir: Directory keeping generated exports between runs
+
+    Returns:
+        Path of the export
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"export-{size}-seed{seed}.json"
+    if not path.exists():
+        partial = path.with_suffix(".partial")
+        ExportGenerator(size, seed).write(partial)
+        partial.replace(path)
+    return path
+
+
+def _module_available(name: str) -> bool:
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def time_call(func: Callable[[], Any], repeat: int, single: bool = False) -> Dict[str, Any]:
+    """
+    Time a callable.
+
+    Args:
+        func: Operation to time
+        repeat: Number of samples
+        single: Call once per sample, without calibration or warm-up
+
+    Returns:
+        Per-call ``min``, ``median``, ``mean`` and ``stdev`` in seconds,
+        with the ``number`` of calls per sample and ``repeat``
+    """
+    number = 1
+    if not single:
+        # Warm up, then loop fast operations until a sample is measurable
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if elapsed < _MIN_SAMPLE_TIME:
+            number = min(math.ceil(_MIN_SAMPLE_TIME / max(elapsed, 1e-7)), _MAX_NUMBER)
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the interpreter, machine and code version of a run."""
+    commit = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, timeout=10, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    pandas_version = None
+    if _module_available("pandas"):
+        import pandas
+        pandas_version = pandas.__version__
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "citation_tool": citation_tool.__version__,
+        "pandas": pandas_version,
+        "git_commit": commit,
+    }
+
+
+def run_benchmarks(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    only: Optional[Sequence[str]] = None,
+    data_dir: Union[str, Path] = DEFAULT_DATA_DIR,
+    log: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes: Library sizes (number of citations) to benchmark
+        repeat: Samples per benchmark
+        seed: Seed of the synthetic exports
+        only: Run only benchmarks whose name starts with one of these prefixes
+        data_dir: Directory keeping generated exports between runs
+        log: Called with a progress line after each benchmark
+
+    Returns:
+        JSON-serializable results with ``environment``, ``config`` and
+        one ``results`` entry per benchmark and size
+    """
+    sizes = list(sizes)
+    selected = [
+        b for b in BENCHMARKS if not only or any(b.name.startswith(prefix) for prefix in only)
+    ]
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        path = dataset_path(size, seed, data_dir)
+        ctx = Context(path)
+        for benchmark in selected:
+            entry: Dict[str, Any] = {"name": benchmark.name, "size": size}
+            if benchmark.requires and not _module_available(benchmark.requires):
+                entry["skipped"] = f"{benchmark.requires} is not installed"
+            else:
+                func = benchmark.setup(ctx)
+                entry.update(time_call(func, repeat, benchmark.single))
+            results.append(entry)
+            if log is not None:
+                if "skipped" in entry:
+                    log(f"{benchmark.name:<20} {size:>9}  skipped ({entry['skipped']})")
+                else:
+                    log(f"{benchmark.name:<20} {size:>9}  {_format_seconds(entry['median'])}")
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "config": {"sizes": sizes, "repeat": repeat, "seed": seed},
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Compare the medians of two runs.
+
+    Args:
+        baseline: Results of the reference run
+        current: Results of the run to check
+        threshold: Relative slowdown flagged as a regression (0.10 = 10%)
+
+    Returns:
+        One entry per benchmark and size timed in both runs, with the
+        ``baseline`` and ``current`` medians, their ``ratio`` and a
+        ``status`` of "regression", "improvement" or "unchanged"
+    """
+    before = {
+        (r["name"], r["size"]): r["median"] for r in baseline["results"] if "median" in r
+    }
+    rows = []
+    for result in current["results"]:
+        key = (result["name"], result["size"])
+        if "median" not in result or key not in before or before[key] <= 0:
+            continue
+        ratio = result["median"] / before[key]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append({
+            "name": result["name"],
+            "size": result["size"],
+            "baseline": before[key],
+            "current": result["median"],
+            "ratio": ratio,
+            "status": status,
+        })
+    return rows
+
+
+def load_results(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a results file written by the benchmark runner."""
+    with open(path, "r", encoding="utf-8") as f:
+        data: Dict[str, Any] = json.load(f)
+    if data.get("schema") != RESULTS_SCHEMA:
+        raise ValueError(f"{path}: unsupported results schema {data.get('schema')!r}")
+    return data
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:8.3f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.3f} ms"
+    return f"{seconds * 1e6:8.3f} us"
+
+
+def format_comparison(rows: Sequence[Dict[str, Any]]) -> str:
+    """Render compare_results() output as a text table."""
+    lines = [f"{'benchmark':<20} {'size':>9}  {'baseline':>11}  {'current':>11}  {'change':>8}"]
+    for row in rows:
+        change = (row["ratio"] - 1) * 100
+        flag = {"regression": "  REGRESSION", "improvement": "  faster"}.get(row["status"], "")
+        lines.append(
+            f"{row['name']:<20} {row['size']:>9}  {_format_seconds(row['baseline'])}  "
+            f"{_format_seconds(row['current'])}  {change:+7.1f}%{flag}"
+        )
+    return "\n".join(lines)
@@ -20,8 +20,42 @@ Example usage:
     df = library.to_dataframe()
 """
 
+from .authors import AuthorIndex, CoauthorGraph
+from .bibtex import BibTexParseError
+from .formatting import CitationFormatter
+from .instrumentation import Metrics, profile
 from .library import CitationLibrary
-from .models import Citation, Domain, CitationType
+from .models import (
+    Citation, Domain, CitationType, DoiLookupErrorType, DoiLookupResult, DuplicateMatch,
+    DuplicateMatchReason, FuzzyMatch, HealthLevel, UrlHealthStatus
+)
+from .query import CitationQuery, Page
+from .querycache import QueryCache
+from .sharded import ShardedCitationLibrary
+from .store import CitationStore
 
 __version__ = "1.0.0"
-__all__ = ["CitationLibrary", "Citation", "Domain", "CitationType"]
+__all__ = [
+    "CitationLibrary",
+    "ShardedCitationLibrary",
+    "Citation",
+    "Domain",
+    "CitationType",
+    "CitationStore",
+    "CitationQuery",
+    "Page",
+    "QueryCache",
+    "CitationFormatter",
+    "AuthorIndex",
+    "CoauthorGraph",
+    "Metrics",
+    "profile",
+    "DuplicateMatch",
+    "DuplicateMatchReason",
+    "FuzzyMatch",
+    "BibTexParseError",
+    "HealthLevel",
+    "UrlHealthStatus",
+    "DoiLookupResult",
+    "DoiLookupErrorType",
+]
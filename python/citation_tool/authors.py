@@ -0,0 +1,459 @@
+"""
+Author index and co-authorship graph.
+
+Author names are reduced to a key of surname and first initial, so name
+order and abbreviation variants such as "Smith, J.", "J. Smith" and
+"John Smith" fall together. Names are split like format_apa() does: the
+last word is the surname and the words before it are given names; a name
+with a comma is read as "Surname, Given names" instead.
+
+The co-authorship graph is stored as a compressed sparse row (CSR)
+adjacency matrix: one row per author, listing co-authors and the number
+of citations shared with each. Degree, component and top-collaborator
+queries walk these flat arrays instead of comparing citations pairwise.
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from itertools import chain, combinations
+from operator import sub
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .fuzzy import fold
+from .index import _insert
+from .models import Citation
+
+_INITIALS = re.compile(r"[^\W\d_]")
+
+
+@lru_cache(maxsize=65536)
+def author_key(name: str) -> str:
+    """
+    Return the normalized key of an author name.
+
+    Args:
+        name: Author name, e.g. "Jane Q. Smith" or "Smith, J."
+
+    Returns:
+        Folded surname and first initial (``"smith|j"``); names of a single
+        word have no initial (``"plato|"``)
+
+    Example:
+        >>> author_key("Smith, J.") == author_key("Jane Smith")
+        True
+    """
+    if "," in name:
+        surname_part, _, given = name.partition(",")
+        surnames = surname_part.split()
+        given_names = given.split()
+    else:
+        given_names = name.split()
+        surnames = given_names[-1:]
+        del given_names[-1:]
+    surname = fold(surnames[-1]).strip(".") if surnames else ""
+    initial = _INITIALS.search(fold(" ".join(given_names)))
+    return f"{surname}|{initial.group() if initial else ''}"
+
+
+def _preferred(name: str, current: str) -> bool:
+    """Return True if ``name`` makes a better display name than ``current``."""
+    rank, current_rank = ("," not in name, len(name)), ("," not in current, len(current))
+    # Ties go to the alphabetically first spelling, whatever the citation order
+    return rank > current_rank or (rank == current_rank and name < current)
+
+
+def _author_keys(citation: Citation) -> List[str]:
+    """Return the distinct author keys of a citation, in author order."""
+    return list(dict.fromkeys(author_key(author) for author in citation.authors if author.strip()))
+
+
+class AuthorIndex:
+    """
+    Normalized authors with the citations of each.
+
+    Every distinct author key gets an ID, a display name and a sorted
+    ``array`` of the document positions listing that author. The display
+    name is the longest spelling seen in given-name-first order, so "John
+    Smith" wins over "J. Smith" and "Smith, John". Authors whose citations
+    are all removed keep their ID with an empty posting list until the
+    index is rebuilt. Removing the citation a display name came from marks
+    the name stale until update_names() picks it again.
+    """
+
+    def __init__(self, citations: Iterable[Optional[Citation]]):
+        """
+        Build the index.
+
+        Args:
+            citations: Citations by document position (None marks an
+                unused position)
+        """
+        self._author_ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._docs: List[array] = []
+        # Authors whose display name may have come from a removed citation
+        self._stale: Set[int] = set()
+
+        postings: Dict[str, List[int]] = {}
+        names: Dict[str, str] = {}
+        for doc, citation in enumerate(citations):
+            if citation is None:
+                continue
+            for author in citation.authors:
+                if not author.strip():
+                    continue
+                key = author_key(author)
+                docs = postings.get(key)
+                if docs is None:
+                    postings[key] = [doc]
+                    names[key] = author
+                    continue
+                if docs[-1] != doc:
+                    docs.append(doc)
+                if _preferred(author, names[key]):
+                    names[key] = author
+        for author_id, (key, docs) in enumerate(postings.items()):
+            self._author_ids[key] = author_id
+            self._names.append(names[key])
+            self._docs.append(array("I", docs))
+
+    def __len__(self) -> int:
+        """Return the number of distinct authors."""
+        return len(self._names)
+
+    def add(self, doc: int, citation: Citation) -> None:
+        """
+        Index a citation at a position that is not currently indexed.
+
+        Args:
+            doc: Document position
+            citation: The citation stored at that position
+        """
+        for author in citation.authors:
+            if not author.strip():
+                continue
+            key = author_key(author)
+            author_id = self._author_ids.get(key)
+            if author_id is None:
+                self._author_ids[key] = len(self._names)
+                self._names.append(author)
+                self._docs.append(array("I", [doc]))
+                continue
+            _insert(self._docs[author_id], doc)
+            if _preferred(author, self._names[author_id]):
+                self._names[author_id] = author
+
+    def remove(self, doc: int, citation: Citation) -> None:
+        """
+        Remove a citation from the index.
+
+        Args:
+            doc: Document position the citation was indexed at
+            citation: The citation as it was when indexed
+        """
+        for author in citation.authors:
+            if not author.strip():
+                continue
+            author_id = self._author_ids.get(author_key(author))
+            if author_id is None:
+                continue
+            docs = self._docs[author_id]
+            i = bisect_left(docs, doc)
+            if i < len(docs) and docs[i] == doc:
+                del docs[i]
+            if author == self._names[author_id]:
+                self._stale.add(author_id)
+
+    def update_names(self, citations: Sequence[Optional[Citation]]) -> None:
+        """
+        Pick the display names marked stale by remove() again.
+
+        Each is chosen from the spellings in the author's remaining
+        citations; an author without citations keeps the old name.
+
+        Args:
+            citations: Citations by document position
+        """
+        for author_id in self._stale:
+            key = author_key(self._names[author_id])
+            best: Optional[str] = None
+            for doc in self._docs[author_id]:
+                for author in citations[doc].authors:
+                    if not author.strip() or author_key(author) != key:
+                        continue
+                    if best is None or _preferred(author, best):
+                        best = author
+            if best is not None:
+                self._names[author_id] = best
+        self._stale.clear()
+
+    def lookup(self, name: str) -> Optional[int]:
+        """Return the ID of an author given any spelling of the name, or None."""
+        return self._author_ids.get(author_key(name))
+
+    def name(self, author_id: int) -> str:
+        """Return an author's display name."""
+        return self._names[author_id]
+
+    def docs(self, author_id: int) -> array:
+        """Return the sorted document positions of an author's citations."""
+        return self._docs[author_id]
+
+    def doc_authors(self, citation: Citation) -> List[int]:
+        """Return the distinct author IDs of an indexed citation."""
+        ids = self._author_ids
+        return [ids[key] for key in _author_keys(citation) if key in ids]
+
+    def top(
+        self,
+        limit: Optional[int] = 10,
+        docs: Optional[Iterable[int]] = None,
+        citations: Optional[Sequence[Optional[Citation]]] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Find the authors with the most citations.
+
+        Args:
+            limit: Number of authors to return (None for all)
+            docs: Only count these document positions (requires ``citations``)
+            citations: Citations by document position
+
+        Returns:
+            ``(author_id, count)`` pairs, most citations first (ties by
+            display name)
+        """
+        if docs is None:
+            counts: Dict[int, int] = {
+                author_id: len(postings)
+                for author_id, postings in enumerate(self._docs) if postings
+            }
+        else:
+            if citations is None:
+                raise ValueError("citations are required to count a subset of documents")
+            selected = map(citations.__getitem__, docs)
+            counts = Counter(chain.from_iterable(
+                self.doc_authors(citation) for citation in selected if citation is not None
+            ))
+        key = lambda item: (-item[1], self._names[item[0]])  # noqa: E731
+        if limit is None:
+            return sorted(counts.items(), key=key)
+        return heapq.nsmallest(limit, counts.items(), key=key)
+
+
+class CoauthorGraph:
+    """
+    Co-authorship graph of an AuthorIndex as a sparse adjacency matrix.
+
+    Row ``a`` of the matrix lists the co-authors of author ``a`` in
+    ``indices[indptr[a]:indptr[a + 1]]`` and the number of citations they
+    share in the same slice of ``weights`` (scipy's CSR layout). Authors
+    are identified by any spelling of their name.
+
+    The graph is a snapshot: it does not change when the library does.
+    """
+
+    def __init__(self, index: AuthorIndex, citations: Iterable[Optional[Citation]]):
+        """
+        Build the graph.
+
+        Args:
+            index: Author index covering the citations
+            citations: Citations by document position (None marks an
+                unused position)
+        """
+        self._index = index
+        size = len(index)
+        doc_authors = index.doc_authors
+        # Each unordered author pair, encoded as one integer
+        pairs = Counter(chain.from_iterable(
+            (a * size + b if a < b else b * size + a for a, b in combinations(ids, 2))
+            for ids in (doc_authors(c) for c in citations if c is not None)
+            if len(ids) > 1
+        ))
+
+        degrees = [0] * size
+        for pair in pairs:
+            a, b = divmod(pair, size)
+            degrees[a] += 1
+            degrees[b] += 1
+        indptr = array("Q", [0])
+        total = 0
+        for degree in degrees:
+            total += degree
+            indptr.append(total)
+        indices = array("I", bytes(4 * total))
+        weights = array("I", bytes(4 * total))
+        fill = list(indptr[:-1])
+        for pair in sorted(pairs):
+            a, b = divmod(pair, size)
+            weight = pairs[pair]
+            i = fill[a]
+            indices[i] = b
+            weights[i] = weight
+            fill[a] = i + 1
+            j = fill[b]
+            indices[j] = a
+            weights[j] = weight
+            fill[b] = j + 1
+
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._labels: Optional[array] = None
+
+    def __len__(self) -> int:
+        """Return the number of authors (nodes)."""
+        return len(self.indptr) - 1
+
+    @property
+    def edge_count(self) -> int:
+        """Number of distinct co-author pairs."""
+        return len(self.indices) // 2
+
+    def _id(self, author: str) -> int:
+        author_id = self._index.lookup(author)
+        if author_id is None or author_id >= len(self):
+            raise KeyError(f"Unknown author: {author}")
+        return author_id
+
+    def degree(self, author: str) -> int:
+        """
+        Count an author's distinct co-authors.
+
+        Raises:
+            KeyError: If the author is not in the graph
+        """
+        author_id = self._id(author)
+        return self.indptr[author_id + 1] - self.indptr[author_id]
+
+    def degrees(self) -> List[int]:
+        """Return the number of distinct co-authors of every author, by author ID."""
+        return list(map(sub, self.indptr[1:], self.indptr[:-1]))
+
+    def strengths(self) -> List[int]:
+        """Return every author's total shared citations over all co-authors, by author ID."""
+        weights = self.weights
+        indptr = self.indptr
+        return [sum(weights[indptr[a]:indptr[a + 1]]) for a in range(len(self))]
+
+    def most_connected(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Find the authors with the most distinct co-authors.
+
+        Args:
+            limit: Number of authors to return
+
+        Returns:
+            ``(name, degree)`` pairs, highest degree first (ties by name)
+        """
+        name = self._index.name
+        top = heapq.nsmallest(
+            limit, enumerate(self.degrees()), key=lambda item: (-item[1], name(item[0]))
+        )
+        return [(name(author_id), degree) for author_id, degree in top]
+
+    def collaborators(self, author: str, limit: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """
+        Find an author's most frequent co-authors.
+
+        Args:
+            author: Any spelling of the author's name
+            limit: Number of co-authors to return (None for all)
+
+        Returns:
+            ``(name, shared citations)`` pairs, most shared first (ties by name)
+
+        Raises:
+            KeyError: If the author is not in the graph
+        """
+        author_id = self._id(author)
+        start, end = self.indptr[author_id], self.indptr[author_id + 1]
+        name = self._index.name
+        row = [(name(b), w) for b, w in zip(self.indices[start:end], self.weights[start:end])]
+        key = lambda item: (-item[1], item[0])  # noqa: E731
+        if limit is None:
+            return sorted(row, key=key)
+        return heapq.nsmallest(limit, row, key=key)
+
+    def component_labels(self) -> array:
+        """
+        Label every author with its connected component.
+
+        Returns:
+            Component number by author ID; components are numbered in
+            order of their lowest author ID
+        """
+        if self._labels is None:
+            size = len(self)
+            labels = array("i", [-1]) * size
+            indptr = self.indptr
+            indices = self.indices
+            label = 0
+            for start in range(size):
+                if labels[start] >= 0:
+                    continue
+                labels[start] = label
+                stack = [start]
+                while stack:
+                    node = stack.pop()
+                    for neighbor in indices[indptr[node]:indptr[node + 1]]:
+                        if labels[neighbor] < 0:
+                            labels[neighbor] = label
+                            stack.append(neighbor)
+                label += 1
+            self._labels = labels
+        return self._labels
+
+    def components(self, min_size: int = 2, limit: Optional[int] = None) -> List[List[str]]:
+        """
+        Group authors into connected components (collaboration clusters).
+
+        Args:
+            min_size: Smallest component to return (2 skips authors
+                without co-authors)
+            limit: Number of components to return (None for all)
+
+        Returns:
+            Author names per component, largest component first
+        """
+        members: Dict[int, List[int]] = {}
+        for author_id, label in enumerate(self.component_labels()):
+            members.setdefault(label, []).append(author_id)
+        groups = [ids for ids in members.values() if len(ids) >= min_size]
+        groups.sort(key=len, reverse=True)
+        name = self._index.name
+        return [[name(author_id) for author_id in ids] for ids in groups[:limit]]
+
+    def component(self, author: str) -> List[str]:
+        """
+        Return every author connected to an author through co-authorship.
+
+        Raises:
+            KeyError: If the author is not in the graph
+        """
+        labels = self.component_labels()
+        label = labels[self._id(author)]
+        name = self._index.name
+        return [name(author_id) for author_id, other in enumerate(labels) if other == label]
+
+    def to_scipy(self):
+        """
+        Return the adjacency matrix as a ``scipy.sparse.csr_matrix``.
+
+        Entries are shared citation counts; use ``scipy.sparse.csgraph``
+        for further graph algorithms.
+
+        Raises:
+            ImportError: If scipy is not installed
+        """
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise ImportError("scipy is required for to_scipy(). Install with: pip install scipy")
+
+        size = len(self)
+        return csr_matrix((self.weights, self.indices, self.indptr), shape=(size, size))
@@ -0,0 +1,595 @@
+"""
+Streaming BibTeX reader.
+
+Entries are mapped onto ``Citation`` the same way as the web app's
+``BibTexParserService``: same entry-type table, field precedence, value
+cleanup, author, year, month and DOI normalization. On top of that the
+tokenizer understands arbitrarily nested braces, ``@string`` macros
+(including the standard month abbreviations), ``#`` concatenation and
+parenthesized entries.
+
+Input is read in chunks, so memory use does not grow with the file size.
+An entry that cannot be parsed is reported and skipped; parsing resumes at
+the next entry. Large files can be split at entry boundaries and parsed in
+worker processes.
+"""
+
+import hashlib
+import io
+import logging
+import mmap
+import os
+import re
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from .models import Citation, CitationType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Files smaller than this are always parsed in-process
+_MIN_PARALLEL_BYTES = 4 << 20
+_MAX_RANGE_BYTES = 16 << 20
+
+# Citation IDs are derived from the entry key so re-imports are stable
+_ID_NAMESPACE = uuid.UUID("6b1f2c4e-8f0a-5d3b-9c7e-2a4d6e8f0b1c")
+
+ENTRY_TYPES = {
+    "article": CitationType.ARTICLE,
+    "inproceedings": CitationType.IN_PROCEEDINGS,
+    "conference": CitationType.IN_PROCEEDINGS,
+    "book": CitationType.BOOK,
+    "inbook": CitationType.IN_BOOK,
+    "incollection": CitationType.IN_BOOK,
+    "techreport": CitationType.TECH_REPORT,
+    "report": CitationType.TECH_REPORT,
+    "phdthesis": CitationType.THESIS,
+    "mastersthesis": CitationType.THESIS,
+    "thesis": CitationType.THESIS,
+    "manual": CitationType.MANUAL,
+    "misc": CitationType.WEBSITE,
+    "online": CitationType.WEBSITE,
+    "electronic": CitationType.WEBSITE,
+    "standard": CitationType.STANDARD,
+}
+
+# Predefined BibTeX macros
+DEFAULT_MACROS = {
+    "jan": "January", "feb": "February", "mar": "March", "apr": "April",
+    "may": "May", "jun": "June", "jul": "July", "aug": "August",
+    "sep": "September", "oct": "October", "nov": "November", "dec": "December",
+}
+
+_MONTHS = {
+    "jan": "Jan", "january": "Jan", "1": "Jan",
+    "feb": "Feb", "february": "Feb", "2": "Feb",
+    "mar": "Mar", "march": "Mar", "3": "Mar",
+    "apr": "Apr", "april": "Apr", "4": "Apr",
+    "may": "May", "5": "May",
+    "jun": "Jun", "june": "Jun", "6": "Jun",
+    "jul": "Jul", "july": "Jul", "7": "Jul",
+    "aug": "Aug", "august": "Aug", "8": "Aug",
+    "sep": "Sep", "september": "Sep", "9": "Sep",
+    "oct": "Oct", "october": "Oct", "10": "Oct",
+    "nov": "Nov", "november": "Nov", "11": "Nov",
+    "dec": "Dec", "december": "Dec", "12": "Dec",
+}
+
+_LATEX_REPLACEMENTS = (
+    ("\\'e", "é"),
+    ("\\'a", "á"),
+    ("\\'i", "í"),
+    ("\\'o", "ó"),
+    ("\\'u", "ú"),
+    ('\\"a', "ä"),
+    ('\\"o', "ö"),
+    ('\\"u', "ü"),
+    ("\\~n", "ñ"),
+    ("\\c{c}", "ç"),
+    ("--", "–"),
+    ("``", "“"),
+    ("''", "”"),
+    ("\\&", "&"),
+    ("\\%", "%"),
+)
+
+_DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/")
+
+_ENTRY_START = re.compile(r"@[ \t\r\n]*([A-Za-z][\w\-]*)[ \t\r\n]*([{(])")
+# An entry starting a line; used to recover from unbalanced entries and to
+# split files between workers
+_LINE_ENTRY = re.compile(r"\n[ \t]*@[ \t]*[A-Za-z][\w\-]*[ \t]*[{(]")
+_LINE_ENTRY_BYTES = re.compile(rb"\n[ \t]*@[ \t]*[A-Za-z][\w\-]*[ \t]*[{(]")
+_STRING_ENTRY_BYTES = re.compile(rb"@[ \t\r\n]*[Ss][Tt][Rr][Ii][Nn][Gg][ \t\r\n]*[{(]")
+# Fast paths for the common case of entries nested at most one level deep
+# and single-part field values; anything else uses the general tokenizer.
+_FLAT_ENTRY_BODY = re.compile(r"[^{}]*(?:\{[^{}]*\}[^{}]*)*\}")
+_SIMPLE_FIELD = re.compile(
+    r"[\s,]*([^\s=,{}\"#()]+)\s*=\s*(?:\{([^{}]*)\}|\"([^\"{}]*)\"|(\d+))\s*(?=,|$)"
+)
+_BRACES = re.compile(r"[{}]")
+_BRACES_OR_PAREN = re.compile(r"[{})]")
+_QUOTE_OR_BRACES = re.compile(r'["{}]')
+_SEPARATORS = re.compile(r"[\s,]*")
+_SPACE = re.compile(r"\s*")
+_FIELD_NAME = re.compile(r"([^\s=,{}\"#()]+)\s*=\s*")
+_BARE_VALUE = re.compile(r"[^\s,#{}\"()=]+")
+_AUTHOR_SEPARATOR = re.compile(" and | AND ")
+_KEYWORD_SEPARATOR = re.compile("[,;]")
+_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+
+Source = Union[str, Path, IO[str]]
+
+
+class BibTexParseError(ValueError):
+    """An entry that could not be parsed and was skipped."""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.message = message
+        self.line = line
+
+
+ErrorHandler = Callable[[BibTexParseError], None]
+
+
+def _log_error(error: BibTexParseError) -> None:
+    logger.warning("Skipping BibTeX entry: %s", error)
+
+
+def _find_close(text: str, pos: int, closer: str) -> int:
+    """Return the index of the delimiter closing an entry, or -1 if not in ``text``."""
+    if closer == "}":
+        match = _FLAT_ENTRY_BODY.match(text, pos)
+        if match is not None:
+            return match.end() - 1
+    depth = 0
+    pattern = _BRACES if closer == "}" else _BRACES_OR_PAREN
+    for match in pattern.finditer(text, pos):
+        ch = match.group()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            if depth == 0:
+                return match.start() if closer == "}" else -1
+            depth -= 1
+        elif depth == 0:
+            return match.start()
+    return -1
+
+
+def _closing_brace(text: str, pos: int) -> int:
+    """Index of the ``}`` matching an opening brace just before ``pos``."""
+    end = text.find("}", pos)
+    if end < 0 or text.find("{", pos, end) < 0:
+        return end
+    depth = 0
+    for match in _BRACES.finditer(text, pos):
+        if match.group() == "{":
+            depth += 1
+        elif depth == 0:
+            return match.start()
+        else:
+            depth -= 1
+    return -1
+
+
+def _closing_quote(text: str, pos: int) -> int:
+    """Index of the ``"`` closing a quoted value (quotes inside braces don't count)."""
+    depth = 0
+    for match in _QUOTE_OR_BRACES.finditer(text, pos):
+        ch = match.group()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth < 0:
+                return -1
+        elif depth == 0:
+            return match.start()
+    return -1
+
+
+def _parse_fields(body: str, pos: int, macros: Dict[str, str]) -> Dict[str, str]:
+    """
+    Parse ``name = value`` pairs into raw (uncleaned) values.
+
+    Values may be braced, quoted, numbers or macro names, joined with ``#``.
+    Unknown macros expand to an empty string, like in BibTeX.
+    """
+    fields: Dict[str, str] = {}
+    size = len(body)
+    simple = _SIMPLE_FIELD.match
+    while True:
+        match = simple(body, pos)
+        if match is not None:
+            name, braced, quoted, number = match.groups()
+            if braced is not None:
+                fields[name.lower()] = braced
+            elif quoted is not None:
+                fields[name.lower()] = quoted
+            else:
+                fields[name.lower()] = number
+            pos = match.end()
+            continue
+
+        skipped = _SEPARATORS.match(body, pos)
+        # _SEPARATORS and _SPACE also match the empty string, so they never fail
+        assert skipped is not None
+        pos = skipped.end()
+        if pos >= size:
+            return fields
+        match = _FIELD_NAME.match(body, pos)
+        if match is None:
+            raise ValueError(f"expected a field name near {body[pos:pos + 30]!r}")
+        name = match.group(1).lower()
+        pos = match.end()
+
+        parts = []
+        while True:
+            if pos >= size:
+                raise ValueError(f"missing value for field {name!r}")
+            ch = body[pos]
+            if ch == "{":
+                end = _closing_brace(body, pos + 1)
+                if end < 0:
+                    raise ValueError(f"unbalanced braces in field {name!r}")
+                parts.append(body[pos + 1:end])
+                pos = end + 1
+            elif ch == '"':
+                end = _closing_quote(body, pos + 1)
+                if end < 0:
+                    raise ValueError(f"unterminated quoted value in field {name!r}")
+                parts.append(body[pos + 1:end])
+                pos = end + 1
+            else:
+                match = _BARE_VALUE.match(body, pos)
+                if match is None:
+                    raise ValueError(f"invalid value for field {name!r}")
+                word = match.group()
+                pos = match.end()
+                parts.append(word if word.isdigit() else macros.get(word.lower(), ""))
+
+            skipped = _SPACE.match(body, pos)
+            assert skipped is not None
+            pos = skipped.end()
+            if pos < size and body[pos] == "#":
+                skipped = _SPACE.match(body, pos + 1)
+                assert skipped is not None
+                pos = skipped.end()
+                continue
+            break
+
+        if pos < size and body[pos] != ",":
+            raise ValueError(f"expected ',' after field {name!r}")
+        fields[name] = parts[0] if len(parts) == 1 else "".join(parts)
+
+
+def _clean(value: str) -> str:
+    """Strip braces, collapse whitespace and replace common LaTeX escapes."""
+    if "{" in value or "}" in value:
+        value = value.replace("{", "").replace("}", "")
+    value = " ".join(value.split())
+    if "\\" in value or "--" in value or "``" in value or "''" in value:
+        for old, new in _LATEX_REPLACEMENTS:
+            value = value.replace(old, new)
+    return value
+
+
+def _normalize_author(author: str) -> str:
+    """Turn "Last, First" into "First Last"."""
+    if "," in author:
+        last, first = author.split(",", 1)
+        return f"{first.strip()} {last.strip()}"
+    return author
+
+
+def _citation_id(key: str) -> str:
+    """Return ``str(uuid.uuid5(_ID_NAMESPACE, key))`` without building UUID objects."""
+    digest = bytearray(hashlib.sha1(_ID_NAMESPACE.bytes + key.encode("utf-8")).digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _to_citation(entry_type: str, key: str, raw: Dict[str, str]) -> Citation:
+    """Map a parsed entry onto a Citation like the web app does."""
+    fields = {}
+    for name, value in raw.items():
+        value = _clean(value)
+        if value:
+            fields[name] = value
+    get = fields.get
+
+    authors = []
+    author_field = get("author")
+    if author_field:
+        for author in _AUTHOR_SEPARATOR.split(author_field):
+            author = author.strip()
+            if author:
+                authors.append(_normalize_author(author))
+
+    year = None
+    year_field = get("year")
+    if year_field:
+        match = _YEAR.search(year_field)
+        if match:
+            year = int(match.group())
+
+    month = get("month")
+    if month is not None:
+        month = _MONTHS.get(month.lower().strip())
+
+    doi = get("doi")
+    if doi is not None:
+        for prefix in _DOI_PREFIXES:
+            doi = doi.replace(prefix, "")
+        doi = doi.strip()
+
+    tags = []
+    keywords = get("keywords")
+    if keywords:
+        tags = [k.strip() for k in _KEYWORD_SEPARATOR.split(keywords) if k.strip()]
+
+    return Citation(
+        id=_citation_id(key),
+        title=get("title") or f"Untitled ({key})",
+        authors=authors,
+        type=ENTRY_TYPES.get(entry_type, CitationType.MISC),
+        journal_or_conference=get("journal") or get("booktitle") or get("publisher"),
+        volume=get("volume"),
+        issue=get("number"),
+        pages=get("pages"),
+        year=year,
+        month=month,
+        publisher=get("publisher"),
+        doi=doi,
+        url=get("url") or get("howpublished"),
+        isbn=get("isbn"),
+        abstract=get("abstract"),
+        notes=get("note"),
+        tags=tags,
+    )
+
+
+class _Buffer:
+    """Text read so far from a stream, with line accounting for dropped text."""
+
+    def __init__(self, fp: IO[str], chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.eof = False
+        self.line_base = 1
+
+    def fill(self, keep_from: int) -> bool:
+        """Drop text before ``keep_from`` and read another chunk."""
+        if keep_from:
+            self.line_base += self.text.count("\n", 0, keep_from)
+            self.text = self.text[keep_from:]
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text += chunk
+        return True
+
+    def line(self, pos: int) -> int:
+        return self.line_base + self.text.count("\n", 0, pos)
+
+
+def _scan(buffer: _Buffer) -> Iterator[Tuple[str, str, int, Optional[str]]]:
+    """
+    Split a stream into entries.
+
+    Yields ``(entry_type, body, offset, error)`` tuples; ``error`` is set
+    (and ``body`` empty) for an entry whose delimiters do not balance.
+    ``offset`` is the entry's position in ``buffer.text``, valid until the
+    generator is resumed.
+    """
+    pos = 0
+    while True:
+        text = buffer.text
+        at = text.find("@", pos)
+        if at < 0:
+            if not buffer.fill(len(text)):
+                return
+            pos = 0
+            continue
+
+        match = _ENTRY_START.match(text, at)
+        if match is None:
+            if len(text) - at < 256 and not buffer.eof:
+                buffer.fill(at)
+                pos = 0
+            else:
+                pos = at + 1
+            continue
+
+        start = match.end()
+        closer = "}" if match.group(2) == "{" else ")"
+        end = _find_close(text, start, closer)
+        while end < 0 and not buffer.eof and _LINE_ENTRY.search(text, start) is None:
+            # The entry continues past the buffered text
+            buffer.fill(at)
+            start -= at
+            at = 0
+            text = buffer.text
+            end = _find_close(text, start, closer)
+
+        entry_type = match.group(1).lower()
+        # A new entry starting a line inside this one means its delimiters
+        # are unbalanced; resynchronize there.
+        restart = _LINE_ENTRY.search(text, start, end if end >= 0 else len(text))
+        if restart is not None:
+            yield entry_type, "", at, "unbalanced braces"
+            pos = restart.start() + 1
+        elif end < 0:
+            yield entry_type, "", at, "unexpected end of input"
+            return
+        else:
+            yield entry_type, text[start:end], at, None
+            pos = end + 1
+
+
+def _parse_stream(
+    fp: IO[str],
+    macros: Dict[str, str],
+    on_error: ErrorHandler,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Citation]:
+    """Parse a text stream, updating ``macros`` with its ``@string`` entries."""
+    buffer = _Buffer(fp, chunk_size)
+    for entry_type, body, offset, error in _scan(buffer):
+        if error is not None:
+            on_error(BibTexParseError(error, buffer.line(offset)))
+            continue
+        if entry_type in ("comment", "preamble"):
+            continue
+        try:
+            if entry_type == "string":
+                for name, value in _parse_fields(body, 0, macros).items():
+                    macros[name] = value
+                continue
+            comma = body.find(",")
+            key = (body if comma < 0 else body[:comma]).strip()
+            if "=" in key:
+                raise ValueError("missing citation key")
+            raw = _parse_fields(body, comma + 1, macros) if comma >= 0 else {}
+            citation = _to_citation(entry_type, key, raw)
+        except ValueError as e:
+            on_error(BibTexParseError(str(e), buffer.line(offset)))
+            continue
+        yield citation
+
+
+def _prescan_macros(mapped: mmap.mmap) -> List[Tuple[int, str, str]]:
+    """Collect every ``@string`` definition of a file with its byte offset, in order."""
+    macros = dict(DEFAULT_MACROS)
+    definitions: List[Tuple[int, str, str]] = []
+    for match in _STRING_ENTRY_BYTES.finditer(mapped):
+        text = mapped[match.start():match.start() + 65536].decode("utf-8", errors="replace")
+        entry = _ENTRY_START.match(text)
+        length = _entry_length(text)
+        if entry is None or not length:
+            continue
+        try:
+            fields = _parse_fields(text[entry.end():length - 1], 0, macros)
+        except ValueError:
+            continue
+        for name, value in fields.items():
+            macros[name] = value
+            definitions.append((match.start(), name, value))
+    return definitions
+
+
+def _entry_length(text: str) -> int:
+    match = _ENTRY_START.match(text)
+    if match is None:
+        return 0
+    end = _find_close(text, match.end(), "}" if match.group(2) == "{" else ")")
+    return end + 1 if end >= 0 else 0
+
+
+def _split_points(mapped: mmap.mmap, parts: int) -> List[int]:
+    """Byte offsets splitting a file into roughly equal ranges at entry starts."""
+    size = len(mapped)
+    points = [0]
+    for k in range(1, parts):
+        match = _LINE_ENTRY_BYTES.search(mapped, max(k * size // parts, points[-1]))
+        if match is None:
+            break
+        offset = match.start() + 1
+        if offset > points[-1]:
+            points.append(offset)
+    points.append(size)
+    return points
+
+
+def _parse_range(
+    path: str, start: int, end: int, macros: Dict[str, str]
+) -> Tuple[List[Citation], List[Tuple[int, str]], int]:
+    """Worker: parse one byte range; returns citations, errors and its line count."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8", errors="replace")
+    errors: List[Tuple[int, str]] = []
+    citations = list(_parse_stream(
+        io.StringIO(text), dict(macros), lambda e: errors.append((e.line, e.message))
+    ))
+    return citations, errors, text.count("\n")
+
+
+def _iter_parallel(path: Path, workers: int, on_error: ErrorHandler) -> Iterator[Citation]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        definitions = deque(_prescan_macros(mapped))
+        parts = max(workers * 4, -(-len(mapped) // _MAX_RANGE_BYTES))
+        points = _split_points(mapped, parts)
+
+    line_base = 0
+    macros = dict(DEFAULT_MACROS)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        ranges = iter(zip(points, points[1:]))
+
+        def submit() -> None:
+            for start, end in ranges:
+                # Each range sees only the macros defined before it, like a serial parse
+                while definitions and definitions[0][0] < start:
+                    _, name, value = definitions.popleft()
+                    macros[name] = value
+                pending.append(pool.submit(_parse_range, str(path), start, end, dict(macros)))
+                return
+
+        for _ in range(workers * 2):
+            submit()
+        while pending:
+            citations, errors, lines = pending.popleft().result()
+            submit()
+            for line, message in errors:
+                on_error(BibTexParseError(message, line_base + line))
+            line_base += lines
+            yield from citations
+
+
+def iter_bibtex(
+    source: Source,
+    workers: int = 1,
+    on_error: Optional[ErrorHandler] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Citation]:
+    """
+    Parse BibTeX entries into citations, in file order.
+
+    Citation IDs are derived from the entry keys, so parsing the same file
+    twice yields the same IDs.
+
+    Args:
+        source: Path of a ``.bib`` file or a text stream
+        workers: Worker processes for large files (paths only); each
+            parses a range of whole entries
+        on_error: Called with a BibTexParseError for every skipped entry
+            (defaults to logging a warning)
+        chunk_size: Characters read at a time
+
+    Yields:
+        Citations
+    """
+    on_error = on_error or _log_error
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Data file not found: {path}")
+        if workers > 1 and os.path.getsize(path) >= _MIN_PARALLEL_BYTES:
+            yield from _iter_parallel(path, workers, on_error)
+            return
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            yield from _parse_stream(f, dict(DEFAULT_MACROS), on_error, chunk_size)
+    else:
+        yield from _parse_stream(source, dict(DEFAULT_MACROS), on_error, chunk_size)
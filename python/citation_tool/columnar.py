@@ -0,0 +1,226 @@
+"""
+Column-oriented conversion of citations for pandas and Apache Arrow.
+
+Citations are walked once and every output column is collected into its own
+list; the lists are then handed to pandas or pyarrow in bulk instead of
+building one dict per row.
+"""
+
+from datetime import timezone
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .models import Citation, CitationType
+
+# Output columns, in order.
+COLUMNS = [
+    "id",
+    "title",
+    "authors",
+    "author_count",
+    "type",
+    "type_display",
+    "year",
+    "journal_or_conference",
+    "volume",
+    "issue",
+    "pages",
+    "doi",
+    "url",
+    "domain_id",
+    "domain_name",
+    "tags",
+    "tag_count",
+    "has_abstract",
+    "abstract_length",
+    "date_added",
+]
+
+# Fields that can be exploded into one row per value.
+EXPLODABLE = ("authors", "tags")
+
+TYPE_VALUES = [t.value for t in CitationType]
+TYPE_DISPLAY_NAMES = [t.display_name for t in CitationType]
+
+DEFAULT_BATCH_SIZE = 65536
+
+
+def build_columns(citations: Iterable[Citation], domain_names: Dict[str, str]) -> Dict[str, list]:
+    """
+    Collect citation fields into per-column lists in a single pass.
+
+    Authors and tags are kept as lists (one list per citation).
+
+    Args:
+        citations: Citations to convert
+        domain_names: Domain ID to name map used for ``domain_name``
+
+    Returns:
+        Dictionary of column name to list of values, keyed by ``COLUMNS``
+    """
+    columns: Dict[str, list] = {name: [] for name in COLUMNS}
+    ids = columns["id"].append
+    titles = columns["title"].append
+    authors = columns["authors"].append
+    author_counts = columns["author_count"].append
+    types = columns["type"].append
+    type_displays = columns["type_display"].append
+    years = columns["year"].append
+    venues = columns["journal_or_conference"].append
+    volumes = columns["volume"].append
+    issues = columns["issue"].append
+    pages = columns["pages"].append
+    dois = columns["doi"].append
+    urls = columns["url"].append
+    domain_ids = columns["domain_id"].append
+    domain_labels = columns["domain_name"].append
+    tags = columns["tags"].append
+    tag_counts = columns["tag_count"].append
+    has_abstracts = columns["has_abstract"].append
+    abstract_lengths = columns["abstract_length"].append
+    dates = columns["date_added"].append
+
+    for c in citations:
+        ids(c.id)
+        titles(c.title)
+        authors(list(c.authors))
+        author_counts(len(c.authors))
+        types(c.type.value)
+        type_displays(c.type.display_name)
+        years(c.year)
+        venues(c.journal_or_conference)
+        volumes(c.volume)
+        issues(c.issue)
+        pages(c.pages)
+        dois(c.doi)
+        urls(c.url)
+        domain_ids(c.domain_id)
+        domain_labels(domain_names.get(c.domain_id) if c.domain_id else None)
+        tags(list(c.tags))
+        tag_counts(len(c.tags))
+        abstract_length = len(c.abstract) if c.abstract else 0
+        has_abstracts(abstract_length > 0)
+        abstract_lengths(abstract_length)
+        dates(c.date_added)
+
+    return columns
+
+
+def to_pandas(columns: Dict[str, list], lists: bool = False):
+    """
+    Build a DataFrame from ``build_columns()`` output.
+
+    ``type``, ``type_display``, ``domain_id`` and ``domain_name`` become
+    categoricals and ``year`` a nullable ``Int64`` column. Authors and tags
+    are ``"; "``-joined strings unless ``lists`` is true.
+    """
+    import pandas as pd
+
+    data: Dict[str, Any] = dict(columns)
+    data["type"] = pd.Categorical(columns["type"], categories=TYPE_VALUES)
+    data["type_display"] = pd.Categorical(columns["type_display"], categories=TYPE_DISPLAY_NAMES)
+    data["year"] = pd.array(columns["year"], dtype="Int64")
+    data["domain_id"] = pd.Categorical(columns["domain_id"])
+    data["domain_name"] = pd.Categorical(columns["domain_name"])
+    if not lists:
+        data["authors"] = ["; ".join(values) for values in columns["authors"]]
+        data["tags"] = ["; ".join(values) for values in columns["tags"]]
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def to_exploded_pandas(columns: Dict[str, list], field: str):
+    """
+    Build a long DataFrame with one row per author or tag.
+
+    Columns are ``citation_id``, ``position`` (order within the citation)
+    and the singular field name (``author`` or ``tag``) as a categorical.
+    """
+    import pandas as pd
+
+    if field not in EXPLODABLE:
+        raise ValueError(f"field must be one of {EXPLODABLE}, got {field!r}")
+
+    citation_ids: List[str] = []
+    positions: List[int] = []
+    values: List[str] = []
+    for citation_id, items in zip(columns["id"], columns[field]):
+        for position, value in enumerate(items):
+            citation_ids.append(citation_id)
+            positions.append(position)
+            values.append(value)
+
+    return pd.DataFrame({
+        "citation_id": citation_ids,
+        "position": pd.array(positions, dtype="int32"),
+        field[:-1]: pd.Categorical(values),
+    })
+
+
+def arrow_schema():
+    """Return the Arrow schema used by ``to_arrow_batch()``."""
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("authors", pa.list_(pa.string())),
+        ("author_count", pa.int32()),
+        ("type", category),
+        ("type_display", category),
+        ("year", pa.int32()),
+        ("journal_or_conference", pa.string()),
+        ("volume", pa.string()),
+        ("issue", pa.string()),
+        ("pages", pa.string()),
+        ("doi", pa.string()),
+        ("url", pa.string()),
+        ("domain_id", category),
+        ("domain_name", category),
+        ("tags", pa.list_(pa.string())),
+        ("tag_count", pa.int32()),
+        ("has_abstract", pa.bool_()),
+        ("abstract_length", pa.int32()),
+        ("date_added", pa.timestamp("us", tz="UTC")),
+    ])
+
+
+def to_arrow_batch(columns: Dict[str, list], schema=None):
+    """Convert ``build_columns()`` output into a pyarrow RecordBatch."""
+    import pyarrow as pa
+
+    schema = schema or arrow_schema()
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        if field.name == "date_added":
+            # Arrow stores one time zone per column; aware values are
+            # converted to UTC and naive values are taken as UTC.
+            values = [
+                d.astimezone(timezone.utc) if d is not None and d.tzinfo else d
+                for d in values
+            ]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_arrow_batches(
+    citations: Iterable[Citation],
+    domain_names: Dict[str, str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Any]:
+    """
+    Yield pyarrow RecordBatches of at most ``batch_size`` citations.
+
+    Only one batch worth of column lists is held at a time.
+    """
+    schema = arrow_schema()
+    iterator = iter(citations)
+    while True:
+        chunk = list(islice(iterator, batch_size))
+        if not chunk:
+            return
+        yield to_arrow_batch(build_columns(chunk, domain_names), schema)
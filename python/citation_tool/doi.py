@@ -0,0 +1,483 @@
+"""
+Batch DOI metadata lookup.
+
+Resolves DOIs against the CrossRef works API and maps the responses onto
+``Citation`` exactly like the web app's ``DoiLookupService``. DOIs are
+normalized and deduplicated first, then fetched by a fixed pool of async
+workers over keep-alive connections. Rate limiting and transient failures
+are retried with exponential backoff; a 429 pauses every worker.
+
+Responses can be kept in an on-disk cache (``ResultCache``), so repeated
+enrichment runs only contact the API for DOIs that are new or expired.
+"""
+
+import asyncio
+import dataclasses
+import json
+import re
+import socket
+import ssl
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote, urlencode
+
+from .httpclient import ConnectionPool, ProtocolError, parse_target
+from .models import Citation, CitationType, DoiLookupErrorType, DoiLookupResult
+from .resultcache import ResultCache
+
+CROSSREF_API_BASE = "https://api.crossref.org/works/"
+USER_AGENT = "CitationTool-Python/1.0"
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 15.0
+
+# Metadata rarely changes; unknown DOIs may be registered later
+DEFAULT_TTL = 30 * 24 * 3600.0
+DEFAULT_NOT_FOUND_TTL = 24 * 3600.0
+
+CACHE_NAMESPACE = "crossref"
+
+_DOI_PATTERN = re.compile(r"^10\.\d{4,}/[^\s]+$", re.IGNORECASE)
+_DOI_PREFIXES = (
+    "https://doi.org/",
+    "http://doi.org/",
+    "https://dx.doi.org/",
+    "http://dx.doi.org/",
+    "doi.org/",
+    "doi:",
+    "doi ",
+)
+_XML_TAG = re.compile(r"<[^>]+>")
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_AFTER = 60.0
+_CACHE_FLUSH_SIZE = 500
+
+_CROSSREF_TYPES = {
+    "journal-article": CitationType.ARTICLE,
+    "proceedings-article": CitationType.IN_PROCEEDINGS,
+    "conference-paper": CitationType.IN_PROCEEDINGS,
+    "book": CitationType.BOOK,
+    "book-chapter": CitationType.IN_BOOK,
+    "report": CitationType.TECH_REPORT,
+    "report-component": CitationType.TECH_REPORT,
+    "dissertation": CitationType.THESIS,
+    "standard": CitationType.STANDARD,
+    "posted-content": CitationType.ARTICLE,
+    "preprint": CitationType.ARTICLE,
+}
+_DATE_FIELDS = ("published-print", "published-online", "published", "created")
+_MONTHS = ("", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Citation fields filled in from looked-up metadata
+MERGE_FIELDS = (
+    "title",
+    "authors",
+    "journal_or_conference",
+    "volume",
+    "issue",
+    "pages",
+    "year",
+    "month",
+    "publisher",
+    "url",
+    "isbn",
+    "abstract",
+)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def normalize_doi(value: Optional[str]) -> str:
+    """Strip whitespace and a leading resolver URL or ``doi:`` prefix."""
+    if not value or not value.strip():
+        return ""
+    doi = value.strip()
+    lowered = doi.lower()
+    for prefix in _DOI_PREFIXES:
+        if lowered.startswith(prefix):
+            doi = doi[len(prefix):]
+            break
+    return doi.strip()
+
+
+def is_valid_doi(doi: Optional[str]) -> bool:
+    """Check that a normalized DOI looks like ``10.<registrant>/<suffix>``."""
+    return doi is not None and _DOI_PATTERN.match(doi) is not None
+
+
+def _first_string(message: dict, name: str) -> Optional[str]:
+    values = message.get(name)
+    if isinstance(values, list) and values and isinstance(values[0], str):
+        return values[0]
+    return None
+
+
+def _date_part(message: dict, index: int) -> Optional[int]:
+    for name in _DATE_FIELDS:
+        date = message.get(name)
+        parts = date.get("date-parts") if isinstance(date, dict) else None
+        if isinstance(parts, list) and parts:
+            first = parts[0]
+            value = first[index] if isinstance(first, list) and len(first) > index else None
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def parse_crossref_message(message: dict, doi: str) -> Citation:
+    """
+    Map a CrossRef ``message`` object onto a Citation.
+
+    Args:
+        message: The ``message`` member of a works API response
+        doi: Normalized DOI that was looked up
+
+    Returns:
+        A Citation with an empty ID
+    """
+    authors = []
+    entries = message.get("author")
+    for author in entries if isinstance(entries, list) else ():
+        if not isinstance(author, dict):
+            continue
+        given = author.get("given") or ""
+        family = author.get("family") or ""
+        if family:
+            authors.append(f"{given} {family}" if given else family)
+
+    month = _date_part(message, 1)
+    url = message.get("URL")
+    abstract = message.get("abstract")
+    if isinstance(abstract, str) and abstract:
+        abstract = _XML_TAG.sub("", abstract).strip()
+    else:
+        abstract = None
+
+    def string(name: str) -> Optional[str]:
+        value = message.get(name)
+        return value if isinstance(value, str) else None
+
+    crossref_type = message.get("type")
+    return Citation(
+        id="",
+        doi=doi,
+        title=_first_string(message, "title") or "",
+        authors=authors,
+        type=_CROSSREF_TYPES.get(
+            crossref_type.lower() if isinstance(crossref_type, str) else "", CitationType.MISC
+        ),
+        year=_date_part(message, 0),
+        month=_MONTHS[month] if month is not None and 1 <= month <= 12 else None,
+        journal_or_conference=_first_string(message, "container-title"),
+        volume=string("volume"),
+        issue=string("issue"),
+        pages=string("page"),
+        publisher=string("publisher"),
+        url=url if isinstance(url, str) else f"https://doi.org/{doi}",
+        abstract=abstract,
+        isbn=_first_string(message, "ISBN"),
+    )
+
+
+def merge_metadata(citation: Citation, found: Citation, overwrite: bool = False) -> Citation:
+    """
+    Fill a citation's missing fields from looked-up metadata.
+
+    Args:
+        citation: Citation to enrich
+        found: Citation built from the lookup
+        overwrite: Replace existing values (and the type) as well
+
+    Returns:
+        A new Citation if anything changed, otherwise ``citation`` itself
+    """
+    changes: Dict[str, Any] = {}
+    for name in MERGE_FIELDS:
+        value = getattr(found, name)
+        if value in (None, "", []):
+            continue
+        current = getattr(citation, name)
+        if current in (None, "", []) or (overwrite and current != value):
+            changes[name] = list(value) if isinstance(value, list) else value
+    if overwrite and found.type != citation.type:
+        changes["type"] = found.type
+    return dataclasses.replace(citation, **changes) if changes else citation
+
+
+class _Resolver:
+    """Fetches DOIs with a fixed pool of workers sharing one connection pool."""
+
+    def __init__(
+        self,
+        base_url: str,
+        concurrency: int,
+        timeout: float,
+        retries: int,
+        backoff: float,
+        mailto: Optional[str],
+        ssl_context: Optional[ssl.SSLContext]
+    ):
+        if parse_target(base_url) is None:
+            raise ValueError(f"base_url must be an http or https URL, got {base_url!r}")
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.query = "?" + urlencode({"mailto": mailto}) if mailto else ""
+        user_agent = f"{USER_AGENT} (mailto:{mailto})" if mailto else USER_AGENT
+        self.headers = {"User-Agent": user_agent, "Accept": "application/json"}
+        self.pool = ConnectionPool(ssl_context, self.concurrency)
+        self.paused_until = 0.0
+
+    async def _pause(self) -> None:
+        loop = asyncio.get_running_loop()
+        delay = self.paused_until - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def fetch(self, doi: str) -> Tuple[DoiLookupResult, Optional[dict]]:
+        """
+        Look up one normalized DOI.
+
+        Returns:
+            The result and the value to cache (None if it should not be cached)
+        """
+        target = parse_target(self.base_url + quote(doi, safe="") + self.query)
+        if target is None:
+            failure = DoiLookupResult.fail("Invalid DOI format.", DoiLookupErrorType.INVALID_FORMAT)
+            return failure, None
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            await self._pause()
+            delay = self.backoff * 2 ** attempt
+            try:
+                response = await asyncio.wait_for(
+                    self.pool.request(target, "GET", self.headers), self.timeout
+                )
+            except asyncio.TimeoutError:
+                failure = DoiLookupResult.fail(
+                    "Request timed out. CrossRef may be slow or unreachable. Please try again.",
+                    DoiLookupErrorType.NETWORK_ERROR
+                )
+            except (ssl.SSLError, socket.gaierror, OSError, asyncio.IncompleteReadError):
+                failure = DoiLookupResult.fail(
+                    "Network error while contacting CrossRef. Please check your connection "
+                    "and try again.",
+                    DoiLookupErrorType.NETWORK_ERROR
+                )
+            except ProtocolError as e:
+                return DoiLookupResult.fail(
+                    f"Error parsing CrossRef response: {e}", DoiLookupErrorType.PARSE_ERROR
+                ), None
+            else:
+                status = response.status
+                if status == 404:
+                    result = DoiLookupResult.fail(
+                        f"DOI '{doi}' was not found in CrossRef. Please verify the DOI is correct.",
+                        DoiLookupErrorType.NOT_FOUND
+                    )
+                    return result, {"notFound": True}
+                if 200 <= status < 300:
+                    return self._parse(response.body, doi)
+                if status == 429:
+                    failure = DoiLookupResult.fail(
+                        "Too many requests. Please wait a moment and try again.",
+                        DoiLookupErrorType.RATE_LIMITED
+                    )
+                else:
+                    failure = DoiLookupResult.fail(
+                        f"CrossRef API returned an error ({status} {response.reason}). "
+                        "Please try again.",
+                        DoiLookupErrorType.NETWORK_ERROR
+                    )
+                if status not in _RETRY_STATUSES:
+                    return failure, None
+                retry_after = response.headers.get("retry-after", "")
+                if retry_after.isdigit():
+                    delay = min(float(retry_after), _MAX_RETRY_AFTER)
+                if status == 429:
+                    # Slow every worker down, not just this one
+                    self.paused_until = max(self.paused_until, loop.time() + delay)
+
+            if attempt >= self.retries:
+                return failure, None
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _parse(body: bytes, doi: str) -> Tuple[DoiLookupResult, Optional[dict]]:
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            return DoiLookupResult.fail(
+                f"Error parsing CrossRef response: {e}", DoiLookupErrorType.PARSE_ERROR
+            ), None
+        message = data.get("message") if isinstance(data, dict) else None
+        if not isinstance(message, dict):
+            return DoiLookupResult.fail(
+                "Unexpected response format from CrossRef API.", DoiLookupErrorType.PARSE_ERROR
+            ), None
+        try:
+            citation = parse_crossref_message(message, doi)
+        except Exception as e:
+            # Malformed metadata fails this DOI only, never the whole batch
+            return DoiLookupResult.fail(
+                f"Error parsing CrossRef response: {e}", DoiLookupErrorType.PARSE_ERROR
+            ), None
+        return DoiLookupResult.ok(citation), {"message": message}
+
+    async def run(
+        self,
+        dois: List[str],
+        on_result: Callable[[str, DoiLookupResult, Optional[dict]], None]
+    ) -> None:
+        queue: Deque[str] = deque(dois)
+
+        async def worker() -> None:
+            while queue:
+                doi = queue.popleft()
+                result, cached = await self.fetch(doi)
+                on_result(doi, result, cached)
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(dois)))))
+        finally:
+            self.pool.close()
+
+
+def _from_cache(doi: str, value: dict) -> DoiLookupResult:
+    if value.get("notFound"):
+        return DoiLookupResult.fail(
+            f"DOI '{doi}' was not found in CrossRef. Please verify the DOI is correct.",
+            DoiLookupErrorType.NOT_FOUND
+        )
+    return DoiLookupResult.ok(parse_crossref_message(value["message"], doi))
+
+
+async def resolve_dois_async(
+    dois: Iterable[str],
+    base_url: str = CROSSREF_API_BASE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = 3,
+    backoff: float = 1.0,
+    cache_path: Optional[Union[str, Path]] = None,
+    ttl: float = DEFAULT_TTL,
+    not_found_ttl: float = DEFAULT_NOT_FOUND_TTL,
+    mailto: Optional[str] = None,
+    ssl_context: Optional[ssl.SSLContext] = None,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, DoiLookupResult]:
+    """
+    Look up metadata for many DOIs (coroutine version of resolve_dois()).
+
+    DOIs are normalized and compared case-insensitively, so each distinct
+    DOI is requested at most once.
+
+    Args:
+        dois: DOIs, optionally with a resolver URL or ``doi:`` prefix
+        base_url: Works endpoint; the escaped DOI is appended to it
+        concurrency: Number of requests in flight
+        timeout: Seconds allowed per request attempt
+        retries: Extra attempts after a timeout, network error, 429 or 5xx
+        backoff: Delay before the first retry, doubled for each later one
+            (a numeric Retry-After header takes precedence)
+        cache_path: SQLite file caching responses between runs
+        ttl: Seconds a cached response stays fresh
+        not_found_ttl: Seconds a cached "not found" answer stays fresh
+        mailto: Contact address sent to CrossRef (selects its polite pool)
+        ssl_context: TLS settings for https endpoints
+        progress: Called with ``(completed, total)`` distinct DOIs
+
+    Returns:
+        Dictionary of each input string to its DoiLookupResult
+    """
+    inputs = list(dict.fromkeys(dois))
+    results: Dict[str, DoiLookupResult] = {}
+    spelling: Dict[str, str] = {}
+    for value in inputs:
+        doi = normalize_doi(value)
+        if not doi:
+            results[value] = DoiLookupResult.fail(
+                "DOI cannot be empty.", DoiLookupErrorType.INVALID_FORMAT
+            )
+        elif not is_valid_doi(doi):
+            results[value] = DoiLookupResult.fail(
+                "Invalid DOI format. DOI should start with '10.' followed by a registrant code "
+                "and suffix (e.g., 10.1000/xyz123).",
+                DoiLookupErrorType.INVALID_FORMAT
+            )
+        else:
+            spelling.setdefault(doi.lower(), doi)
+
+    resolver = _Resolver(base_url, concurrency, timeout, retries, backoff, mailto, ssl_context)
+    by_key: Dict[str, DoiLookupResult] = {}
+    total = len(spelling)
+    cache = ResultCache(cache_path, CACHE_NAMESPACE) if cache_path is not None else None
+    try:
+        if cache is not None:
+            for key, value in cache.get_many(spelling).items():
+                by_key[key] = _from_cache(spelling[key], value)
+            if progress is not None and by_key:
+                progress(len(by_key), total)
+
+        unflushed: List[Tuple[str, dict, float]] = []
+
+        def flush() -> None:
+            if cache is not None and unflushed:
+                cache.put_many(unflushed)
+                unflushed.clear()
+
+        def on_result(doi: str, result: DoiLookupResult, cached: Optional[dict]) -> None:
+            by_key[doi.lower()] = result
+            if cache is not None and cached is not None:
+                unflushed.append(
+                    (doi.lower(), cached, not_found_ttl if "notFound" in cached else ttl)
+                )
+                if len(unflushed) >= _CACHE_FLUSH_SIZE:
+                    flush()
+            if progress is not None:
+                progress(len(by_key), total)
+
+        try:
+            await resolver.run(
+                [doi for key, doi in spelling.items() if key not in by_key], on_result
+            )
+        finally:
+            flush()
+    finally:
+        if cache is not None:
+            cache.close()
+
+    ordered: Dict[str, DoiLookupResult] = {}
+    for value in inputs:
+        if value in results:
+            ordered[value] = results[value]
+        else:
+            key = normalize_doi(value).lower()
+            if key in by_key:
+                ordered[value] = by_key[key]
+    return ordered
+
+
+def resolve_dois(dois: Iterable[str], **options) -> Dict[str, DoiLookupResult]:
+    """
+    Look up metadata for many DOIs.
+
+    Runs resolve_dois_async() in a new event loop; from code that already
+    runs an event loop, await resolve_dois_async() instead.
+
+    Args:
+        dois: DOIs to look up
+        **options: Any option of resolve_dois_async()
+
+    Returns:
+        Dictionary of each input string to its DoiLookupResult
+
+    Example:
+        >>> results = resolve_dois(["10.1000/xyz123"], cache_path="crossref.sqlite")
+    """
+    return asyncio.run(resolve_dois_async(dois, **options))
@@ -0,0 +1,413 @@
+"""
+Library-wide duplicate detection.
+
+Uses the same signals and thresholds as the web app's
+``DuplicateDetectionService``: normalized DOI, exact normalized title, and
+author + year + fuzzy title. Instead of comparing every pair of citations,
+candidate pairs are generated by blocking (DOI, title, year + author
+surname) and by MinHash/LSH over title trigrams, then verified with a
+banded Levenshtein distance, optionally in a process pool. Author blocks
+can be large, so their members are only paired with neighbours in title
+order (a sorted-neighbourhood window).
+"""
+
+import os
+import random
+import zlib
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, combinations, islice
+from typing import (
+    Deque, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+)
+
+from .models import Citation, DuplicateMatchReason
+
+# Minimum similarity for a title-only fuzzy match
+TITLE_SIMILARITY_THRESHOLD = 0.85
+
+# Lower threshold used when the citations also share an author and year
+TITLE_SIMILARITY_WITH_CONTEXT_THRESHOLD = 0.70
+
+_DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "doi:", "doi.org/")
+
+# Mersenne prime used by the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+# Smaller inputs are hashed and verified in-process
+_MIN_PARALLEL_RECORDS = 2000
+_MIN_PARALLEL_PAIRS = 20000
+_CHUNK_SIZE = 5000
+# Title-order neighbours each member of an author block is paired with
+_AUTHOR_WINDOW = 16
+# Verification chunks submitted to the pool ahead of the results being read
+_MAX_PENDING_CHUNKS = 8
+
+
+def normalize_doi(doi: Optional[str]) -> str:
+    """Lowercase a DOI and strip a leading resolver prefix."""
+    if not doi or not doi.strip():
+        return ""
+    normalized = doi.strip().lower()
+    for prefix in _DOI_PREFIXES:
+        if normalized.startswith(prefix):
+            return normalized[len(prefix):]
+    return normalized
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Lowercase a title, drop punctuation and collapse spaces."""
+    if not title or not title.strip():
+        return ""
+    kept = "".join(ch for ch in title.lower() if ch.isalnum() or ch.isspace())
+    return " ".join(part for part in kept.split(" ") if part)
+
+
+def last_name(full_name: str) -> str:
+    """Return the last space-separated part of an author name."""
+    parts = [part for part in full_name.strip().split(" ") if part]
+    return parts[-1] if parts else ""
+
+
+def levenshtein(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Compute the Levenshtein distance between two strings.
+
+    When ``max_distance`` is given only a diagonal band of that width is
+    evaluated and the computation stops as soon as the distance is known to
+    exceed it; ``max_distance + 1`` is then returned.
+
+    Args:
+        s1: First string
+        s2: Second string
+        max_distance: Optional upper bound of interest
+
+    Returns:
+        The edit distance, capped at ``max_distance + 1``
+    """
+    if s1 == s2:
+        return 0
+    n1, n2 = len(s1), len(s2)
+    k = max(n1, n2) if max_distance is None else max_distance
+    cap = k + 1
+    if abs(n1 - n2) > k:
+        return cap
+
+    prev = [j if j <= k else cap for j in range(n2 + 1)]
+    for i in range(1, n1 + 1):
+        lo = max(1, i - k)
+        hi = min(n2, i + k)
+        cur = [cap] * (n2 + 1)
+        cur[0] = i if i <= k else cap
+        row_min = cur[0]
+        ch = s1[i - 1]
+        for j in range(lo, hi + 1):
+            value = prev[j - 1] + (ch != s2[j - 1])
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            if value > cap:
+                value = cap
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > k:
+            return cap
+        prev = cur
+    return min(prev[n2], cap)
+
+
+def _max_distance(max_length: int, threshold: float) -> int:
+    """Largest distance whose similarity ``1 - d / max_length`` meets the threshold."""
+    d = int((1.0 - threshold) * max_length)
+    while d + 1 <= max_length and 1.0 - (d + 1) / max_length >= threshold:
+        d += 1
+    while d >= 0 and 1.0 - d / max_length < threshold:
+        d -= 1
+    return d
+
+
+def _bag_distance(a: Counter, b: Counter) -> int:
+    """Lower bound of the edit distance of two strings, from their character counts."""
+    return max(sum((a - b).values()), sum((b - a).values()))
+
+
+def _similarity(n1: str, n2: str, threshold: float) -> float:
+    """Levenshtein similarity of normalized titles, or 0.0 below the threshold."""
+    if n1 == n2:
+        return 1.0
+    if not n1 or not n2:
+        return 0.0
+    max_length = max(len(n1), len(n2))
+    limit = _max_distance(max_length, threshold)
+    if limit < 0 or abs(len(n1) - len(n2)) > limit:
+        return 0.0
+    # Most candidate pairs are rejected here, far cheaper than the distance
+    if limit < max_length and _bag_distance(Counter(n1), Counter(n2)) > limit:
+        return 0.0
+    distance = levenshtein(n1, n2, limit)
+    if distance > limit:
+        return 0.0
+    return 1.0 - distance / max_length
+
+
+def title_similarity(title1: Optional[str], title2: Optional[str]) -> float:
+    """
+    Similarity between two titles from 0 (different) to 1 (identical).
+
+    Titles are normalized first; the score is ``1 - distance / max_length``
+    over the normalized strings.
+    """
+    if not title1 or not title1.strip() or not title2 or not title2.strip():
+        return 0.0
+    return _similarity(normalize_title(title1), normalize_title(title2), 0.0)
+
+
+class _Keys(NamedTuple):
+    """Pre-normalized fields used to compare one citation."""
+    doi: Optional[str]
+    has_title: bool
+    title: str
+    surnames: FrozenSet[str]
+    year: Optional[int]
+
+
+def _keys(citation: Citation) -> _Keys:
+    return _Keys(
+        doi=normalize_doi(citation.doi) if citation.doi else None,
+        has_title=bool(citation.title and citation.title.strip()),
+        title=normalize_title(citation.title),
+        surnames=frozenset(
+            name.casefold() for name in map(last_name, citation.authors) if name
+        ),
+        year=citation.year,
+    )
+
+
+def _check(a: _Keys, b: _Keys) -> Optional[Tuple[float, DuplicateMatchReason]]:
+    """Classify a pair the way the web app does (highest priority first)."""
+    if a.doi is not None and b.doi is not None and a.doi == b.doi:
+        return 1.0, DuplicateMatchReason.EXACT_DOI
+
+    if a.title and a.title == b.title:
+        return 0.98, DuplicateMatchReason.EXACT_TITLE
+
+    if (a.year is not None and a.year == b.year and a.surnames & b.surnames
+            and a.has_title and b.has_title):
+        similarity = _similarity(a.title, b.title, TITLE_SIMILARITY_WITH_CONTEXT_THRESHOLD)
+        if similarity >= TITLE_SIMILARITY_WITH_CONTEXT_THRESHOLD:
+            return 0.7 + similarity * 0.25, DuplicateMatchReason.SAME_AUTHOR_YEAR_TITLE
+        # Titles below the lower threshold cannot meet the title-only one
+        return None
+
+    if a.title and b.title:
+        similarity = _similarity(a.title, b.title, TITLE_SIMILARITY_THRESHOLD)
+        if similarity >= TITLE_SIMILARITY_THRESHOLD:
+            return similarity, DuplicateMatchReason.SIMILAR_TITLE
+
+    return None
+
+
+def _permutations(count: int, seed: int = 0x5EED) -> List[Tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count)]
+
+
+def _minhash(title: str, permutations: Sequence[Tuple[int, int]]) -> Tuple[int, ...]:
+    """MinHash signature of a normalized title's character trigrams."""
+    if len(title) < 3:
+        shingles = {title}
+    else:
+        shingles = {title[i:i + 3] for i in range(len(title) - 2)}
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in permutations)
+
+
+# Per-process state for pool workers
+_worker_keys: List[_Keys] = []
+_worker_permutations: List[Tuple[int, int]] = []
+
+
+def _init_worker(keys: List[_Keys], permutations: List[Tuple[int, int]]) -> None:
+    global _worker_keys, _worker_permutations
+    _worker_keys = keys
+    _worker_permutations = permutations
+
+
+def _signature_chunk(titles: List[str]) -> List[Tuple[int, ...]]:
+    return [_minhash(title, _worker_permutations) for title in titles]
+
+
+def _verify_chunk(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int, float, str]]:
+    keys = _worker_keys
+    found = []
+    for i, j in pairs:
+        match = _check(keys[i], keys[j])
+        if match is not None:
+            found.append((i, j, match[0], match[1].value))
+    return found
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _author_pairs(members: List[int], keys: List[_Keys]) -> Iterator[Tuple[int, int]]:
+    """
+    Pair the members of an author block whose titles could be near-duplicates.
+
+    Blocks of common surnames can hold thousands of citations, so members
+    are not paired exhaustively: each is paired with its next
+    ``_AUTHOR_WINDOW`` neighbours in title order and in reversed-title
+    order, which keeps titles that differ only towards one end adjacent.
+    Neighbours whose lengths or character counts differ by more than the
+    author/year threshold allows are skipped without computing a distance.
+    """
+    threshold = TITLE_SIMILARITY_WITH_CONTEXT_THRESHOLD
+    bags: Dict[int, Counter] = {}
+    for reverse in (False, True):
+        if reverse and len(members) <= _AUTHOR_WINDOW + 1:
+            break
+        ordered = sorted(members, key=lambda i: keys[i].title[::-1] if reverse else keys[i].title)
+        for x, i in enumerate(ordered):
+            a = keys[i].title
+            for j in ordered[x + 1:x + 1 + _AUTHOR_WINDOW]:
+                b = keys[j].title
+                longest = max(len(a), len(b))
+                limit = _max_distance(longest, threshold) if longest else 0
+                if abs(len(a) - len(b)) > limit:
+                    continue
+                for member, title in ((i, a), (j, b)):
+                    if member not in bags:
+                        bags[member] = Counter(title)
+                if _bag_distance(bags[i], bags[j]) > limit:
+                    continue
+                yield (i, j) if i < j else (j, i)
+
+
+def _candidate_pairs(
+    blocks: Dict[tuple, List[int]],
+    keys: List[_Keys]
+) -> Iterator[Tuple[int, int]]:
+    """Yield each candidate pair of the blocks once, block by block."""
+    size = len(keys)
+    seen: Set[int] = set()
+    for block, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if block[0] == "author":
+            pairs: Iterable[Tuple[int, int]] = _author_pairs(members, keys)
+        else:
+            pairs = combinations(members, 2)
+        for i, j in pairs:
+            code = i * size + j
+            if code not in seen:
+                seen.add(code)
+                yield i, j
+
+
+def _verify_in_pool(
+    pool: ProcessPoolExecutor,
+    pairs: Iterable[Tuple[int, int]]
+) -> Iterator[Tuple[int, int, float, str]]:
+    """Verify pairs in the pool, keeping only a few chunks in flight."""
+    pending: Deque[Future] = deque()
+    for chunk in _chunks(pairs, _CHUNK_SIZE):
+        pending.append(pool.submit(_verify_chunk, chunk))
+        if len(pending) >= _MAX_PENDING_CHUNKS:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def find_duplicate_pairs(
+    citations: Iterable[Citation],
+    workers: Optional[int] = None,
+    bands: int = 20,
+    rows: int = 3,
+) -> List[Tuple[int, int, float, DuplicateMatchReason]]:
+    """
+    Find all duplicate pairs among a collection of citations.
+
+    Candidate pairs come from four blocking schemes: equal normalized DOI,
+    equal normalized title, equal year plus a shared author surname, and
+    MinHash/LSH buckets over title trigrams (``bands`` x ``rows`` hashes).
+    Every candidate is then classified with the web app's rules as it is
+    generated. DOI and exact title matches are found exhaustively, as are
+    author/year matches in blocks of up to ``_AUTHOR_WINDOW + 1`` members.
+    Larger author blocks only pair neighbours in title order, and LSH can
+    miss title-only pairs whose trigram sets overlap little despite a small
+    edit distance; both kinds are found with high probability.
+
+    Args:
+        citations: Citations to check
+        workers: Worker processes for hashing and verification (None uses
+            every CPU, 1 runs in-process)
+        bands: Number of LSH bands
+        rows: MinHash values per band
+
+    Returns:
+        ``(i, j, confidence, reason)`` tuples with ``i < j`` positions in
+        the input order, sorted by position
+    """
+    keys = [_keys(c) for c in citations]
+    permutations = _permutations(bands * rows)
+    workers = workers or os.cpu_count() or 1
+    titled = [i for i, k in enumerate(keys) if k.title]
+
+    pool = None
+    if workers > 1 and len(keys) >= _MIN_PARALLEL_RECORDS:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(keys, permutations)
+        )
+    try:
+        titles = [keys[i].title for i in titled]
+        if pool is not None:
+            signatures: List[Tuple[int, ...]] = []
+            for chunk in pool.map(_signature_chunk, _chunks(titles, _CHUNK_SIZE)):
+                signatures.extend(chunk)
+        else:
+            signatures = [_minhash(title, permutations) for title in titles]
+
+        blocks: Dict[tuple, List[int]] = {}
+        for i, k in enumerate(keys):
+            if k.doi is not None:
+                blocks.setdefault(("doi", k.doi), []).append(i)
+            if k.title:
+                blocks.setdefault(("title", k.title), []).append(i)
+            if k.year is not None and k.has_title:
+                for surname in k.surnames:
+                    blocks.setdefault(("author", k.year, surname), []).append(i)
+        for i, signature in zip(titled, signatures):
+            for band in range(bands):
+                key = ("lsh", band) + signature[band * rows:(band + 1) * rows]
+                blocks.setdefault(key, []).append(i)
+
+        pairs = _candidate_pairs(blocks, keys)
+        if pool is not None:
+            first = list(islice(pairs, _MIN_PARALLEL_PAIRS))
+            if len(first) == _MIN_PARALLEL_PAIRS:
+                results = [
+                    (i, j, conf, DuplicateMatchReason(reason))
+                    for i, j, conf, reason in _verify_in_pool(pool, chain(first, pairs))
+                ]
+                results.sort()
+                return results
+            pairs = iter(first)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    results = []
+    for i, j in pairs:
+        match = _check(keys[i], keys[j])
+        if match is not None:
+            results.append((i, j, match[0], match[1]))
+    results.sort()
+    return results
@@ -0,0 +1,272 @@
+"""
+Facet counts for search results and the whole library.
+
+A FacetCounts tallies citations by type, domain, year and tag. A
+FacetIndex keeps each slot's facet values in columns, so the facets of a
+query are counted from its matching positions without building any
+citation, and keeps whole-library counts that follow refresh() like the
+search indexes, so get_statistics() no longer walks every citation.
+"""
+
+from array import array
+from collections import Counter
+from itertools import chain
+from operator import attrgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .models import Citation, CitationType
+
+_get_type = attrgetter("type")
+_get_domain = attrgetter("domain_id")
+_get_year = attrgetter("year")
+_get_tags = attrgetter("tags")
+
+
+class FacetCounts:
+    """
+    Citation counts per type, domain, year and tag.
+
+    Counts are kept by raw value: citations without a domain or year are
+    counted under None (or 0) and left out by the accessors. A tag listed
+    twice on one citation counts once.
+    """
+
+    def __init__(self, citations: Iterable[Optional[Citation]] = ()):
+        """
+        Args:
+            citations: Citations to count; None entries (removed slots) are skipped
+        """
+        live = [citation for citation in citations if citation is not None]
+        # One C-level pass per facet beats a single Python loop over all four
+        self.total = len(live)
+        self._types = Counter(map(_get_type, live))
+        self._domains = Counter(map(_get_domain, live))
+        self._years = Counter(map(_get_year, live))
+        self._tags = Counter(chain.from_iterable(map(frozenset, map(_get_tags, live))))
+
+    @classmethod
+    def _from_values(
+        cls,
+        total: int,
+        types: Iterable[Optional[CitationType]],
+        domains: Iterable[Optional[str]],
+        years: Iterable[Optional[int]],
+        tag_sets: Iterable[FrozenSet[str]]
+    ) -> "FacetCounts":
+        """
+        Count per-citation facet values, each given as one iterable.
+
+        Types are typed Optional to accept FacetIndex columns, where None
+        marks a removed slot; callers only pass values of live slots.
+        """
+        counts = cls()
+        counts.total = total
+        counts._types = Counter(types)
+        counts._domains = Counter(domains)
+        counts._years = Counter(years)
+        counts._tags = Counter(chain.from_iterable(tag_sets))
+        return counts
+
+    def add(self, doc: int, citation: Citation) -> None:
+        """Count a citation (``doc`` is accepted for index compatibility)."""
+        self._update(citation, 1)
+
+    def remove(self, doc: int, citation: Citation) -> None:
+        """Stop counting a citation."""
+        self._update(citation, -1)
+
+    def _update(self, citation: Citation, step: int) -> None:
+        """Add ``step`` to every count the citation contributes to."""
+        self.total += step
+        for counts, key in chain(
+            (
+                (self._types, citation.type),
+                (self._domains, citation.domain_id),
+                (self._years, citation.year),
+            ),
+            ((self._tags, tag) for tag in set(citation.tags)),
+        ):
+            count = counts[key] + step
+            if count:
+                counts[key] = count
+            else:
+                del counts[key]
+
+    def by_type(self) -> Dict[str, int]:
+        """Citation count per type value, most common first."""
+        return {kind.value: count for kind, count in _ranked(self._types)}
+
+    def by_domain(self, label: Callable[[str], str] = str) -> Dict[str, int]:
+        """
+        Citation count per domain, most common first.
+
+        Args:
+            label: Maps a domain ID to its display key; IDs sharing a label
+                are added together
+        """
+        counts: Dict[str, int] = {}
+        for domain_id, count in _ranked(self._domains):
+            if domain_id:
+                key = label(domain_id)
+                counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def by_year(self) -> Dict[int, int]:
+        """Citation count per publication year, oldest first."""
+        return {year: self._years[year] for year in sorted(filter(None, self._years))}
+
+    def by_tag(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Citation count per tag, most common first.
+
+        Args:
+            limit: Maximum number of tags (None for all)
+        """
+        return dict(_ranked(self._tags, limit))
+
+    def tags(self) -> List[str]:
+        """Distinct tags, sorted alphabetically."""
+        return sorted(self._tags)
+
+    @property
+    def tag_count(self) -> int:
+        """Number of distinct tags."""
+        return len(self._tags)
+
+    @property
+    def year_range(self) -> Dict[str, Optional[int]]:
+        """Earliest and latest publication year, None if no citation has one."""
+        years = [year for year in self._years if year]
+        return {
+            "min": min(years) if years else None,
+            "max": max(years) if years else None
+        }
+
+    def to_dict(
+        self,
+        label: Callable[[str], str] = str,
+        tag_limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Return every facet as plain dictionaries.
+
+        Args:
+            label: Maps a domain ID to its display key
+            tag_limit: Maximum number of tags (None for all)
+
+        Returns:
+            Dictionary with ``total``, ``by_type``, ``by_domain``,
+            ``by_year`` and ``by_tag``
+        """
+        return {
+            "total": self.total,
+            "by_type": self.by_type(),
+            "by_domain": self.by_domain(label),
+            "by_year": self.by_year(),
+            "by_tag": self.by_tag(tag_limit),
+        }
+
+
+class _Removed:
+    """Facet values recorded for a removed slot."""
+    type = None
+    domain_id = None
+    year = 0
+    tags: Tuple[str, ...] = ()
+
+
+_REMOVED = _Removed()
+
+
+class FacetIndex:
+    """
+    Facet values of every slot, plus the counts of all live slots.
+
+    Follows the index protocol (``add``/``remove`` by slot position) so the
+    library keeps it up to date on refresh(). Columns cost a few machine
+    words per slot: types and domains are shared references, years an
+    integer array (0 for none) and tags one shared set per distinct tag
+    list.
+    """
+
+    def __init__(self, slots: Sequence[Optional[Citation]]):
+        """
+        Args:
+            slots: Citations by slot position, None for removed slots
+        """
+        citations = [_REMOVED if citation is None else citation for citation in slots]
+        # Most citations share their tag list with others: build each set once
+        tag_lists = list(map(tuple, map(_get_tags, citations)))
+        self._tag_sets: Dict[Tuple[str, ...], FrozenSet[str]] = {
+            tags: frozenset(tags) for tags in set(tag_lists)
+        }
+        self._types: List[Optional[CitationType]] = list(map(_get_type, citations))
+        self._domains: List[Optional[str]] = list(map(_get_domain, citations))
+        self._years = array("q", (year or 0 for year in map(_get_year, citations)))
+        self._tags: List[FrozenSet[str]] = list(map(self._tag_sets.__getitem__, tag_lists))
+        self.totals = self.count(
+            [doc for doc, citation in enumerate(citations) if citation is not _REMOVED]
+        )
+
+    def _tag_set(self, citation: Citation) -> FrozenSet[str]:
+        """Return the citation's tags as a set shared with equally tagged citations."""
+        tags = tuple(citation.tags)
+        if tags not in self._tag_sets:
+            self._tag_sets[tags] = frozenset(tags)
+        return self._tag_sets[tags]
+
+    def _append(
+        self,
+        citation_type: Optional[CitationType],
+        domain_id: Optional[str],
+        year: int,
+        tags: FrozenSet[str]
+    ) -> None:
+        """Add a slot's facet values at the end of the columns."""
+        self._types.append(citation_type)
+        self._domains.append(domain_id)
+        self._years.append(year)
+        self._tags.append(tags)
+
+    def add(self, doc: int, citation: Citation) -> None:
+        """Record a citation's facet values at ``doc`` and count it."""
+        while len(self._types) <= doc:
+            self._append(None, None, 0, frozenset())
+        self._types[doc] = citation.type
+        self._domains[doc] = citation.domain_id
+        self._years[doc] = citation.year or 0
+        self._tags[doc] = self._tag_set(citation)
+        self.totals.add(doc, citation)
+
+    def remove(self, doc: int, citation: Citation) -> None:
+        """Forget the citation at ``doc`` and stop counting it."""
+        self._types[doc] = None
+        self._domains[doc] = None
+        self._years[doc] = 0
+        self._tags[doc] = frozenset()
+        self.totals.remove(doc, citation)
+
+    def count(self, docs: Sequence[int]) -> FacetCounts:
+        """
+        Count the facets of the citations at the given live slot positions.
+
+        Args:
+            docs: Slot positions, each holding a citation
+
+        Returns:
+            FacetCounts of those citations
+        """
+        return FacetCounts._from_values(
+            len(docs),
+            map(self._types.__getitem__, docs),
+            map(self._domains.__getitem__, docs),
+            map(self._years.__getitem__, docs),
+            map(self._tags.__getitem__, docs),
+        )
+
+
+def _ranked(counts: Counter, limit: Optional[int] = None) -> List[Tuple[Any, int]]:
+    """Return ``(key, count)`` pairs by descending count, ties in key order."""
+    items = sorted(counts.items(), key=lambda item: str(getattr(item[0], "value", item[0])))
+    items.sort(key=lambda item: item[1], reverse=True)
+    return items if limit is None else items[:limit]
@@ -0,0 +1,214 @@
+"""
+Batch citation formatting with a bounded result cache.
+
+Formatted strings are cached per citation ID and style. Each entry keeps a
+fingerprint of the fields the formatters read, so a cached string is only
+reused while the record is unchanged; edited or reloaded records are simply
+formatted again.
+"""
+
+import threading
+from collections import OrderedDict
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Citation
+
+STYLES = ("ieee", "apa", "bibtex")
+
+DEFAULT_CACHE_SIZE = 10000
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _suffix(n: int) -> str:
+    """Return the n-th key suffix: a, b, ..., z, aa, ab, ..."""
+    letters = []
+    n += 1
+    while n:
+        n, r = divmod(n - 1, 26)
+        letters.append(_ALPHABET[r])
+    return "".join(reversed(letters))
+
+
+def unique_bibtex_keys(citations: Iterable[Citation]) -> Iterator[str]:
+    """
+    Yield a BibTeX key for each citation, unique across the whole input.
+
+    The first citation with a given ``bibtex_key()`` keeps it; later ones
+    get a letter suffix (``smith2020deep``, ``smith2020deepa``, ...). Keys
+    are assigned in a single pass.
+
+    Args:
+        citations: Citations in output order
+
+    Yields:
+        One key per citation
+    """
+    used = set()
+    next_suffix: Dict[str, int] = {}
+    for citation in citations:
+        base = citation.bibtex_key()
+        key = base
+        if key in used:
+            n = next_suffix.get(base, 0)
+            key = base + _suffix(n)
+            while key in used:
+                n += 1
+                key = base + _suffix(n)
+            next_suffix[base] = n + 1
+        used.add(key)
+        yield key
+
+
+def _fingerprint(citation: Citation) -> tuple:
+    """Values of every field read by the formatters."""
+    return (
+        citation.title,
+        tuple(citation.authors),
+        citation.type,
+        citation.journal_or_conference,
+        citation.volume,
+        citation.issue,
+        citation.pages,
+        citation.year,
+        citation.month,
+        citation.publisher,
+        citation.doi,
+        citation.url,
+        citation.isbn,
+    )
+
+
+def _render(citation: Citation, style: str, key: Optional[str]) -> str:
+    if style == "ieee":
+        return citation.format_ieee()
+    if style == "apa":
+        return citation.format_apa()
+    return citation.format_bibtex(key)
+
+
+class CitationFormatter:
+    """
+    Formats citations in IEEE, APA or BibTeX style with an LRU cache.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            maxsize: Maximum number of cached strings (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Tuple[str, str, Optional[str]], Tuple[tuple, str]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def format(self, citation: Citation, style: str, key: Optional[str] = None) -> str:
+        """
+        Format one citation.
+
+        Args:
+            citation: Citation to format
+            style: One of ``STYLES``
+            key: BibTeX entry key (defaults to ``citation.bibtex_key()``)
+
+        Returns:
+            Formatted citation
+        """
+        if style not in STYLES:
+            raise ValueError(f"style must be one of {STYLES}, got {style!r}")
+        if not self.maxsize:
+            return _render(citation, style, key)
+
+        cache_key = (style, citation.id, key)
+        fingerprint = _fingerprint(citation)
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None and entry[0] == fingerprint:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        text = _render(citation, style, key)
+        with self._lock:
+            self._cache[cache_key] = (fingerprint, text)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return text
+
+    def format_many(
+        self,
+        citations: Iterable[Citation],
+        style: str,
+        unique_keys: bool = True
+    ) -> List[str]:
+        """
+        Format a batch of citations.
+
+        Args:
+            citations: Citations to format
+            style: One of ``STYLES``
+            unique_keys: For BibTeX, make entry keys unique across the batch
+
+        Returns:
+            Formatted citations, in input order
+        """
+        if style not in STYLES:
+            raise ValueError(f"style must be one of {STYLES}, got {style!r}")
+        if style == "bibtex" and unique_keys:
+            citations = list(citations)
+            keys: Iterable[Optional[str]] = unique_bibtex_keys(citations)
+        else:
+            keys = repeat(None)
+        if not self.maxsize:
+            return [_render(c, style, key) for c, key in zip(citations, keys)]
+
+        results: List[str] = []
+        append = results.append
+        cache = self._cache
+        maxsize = self.maxsize
+        hits = misses = 0
+        with self._lock:
+            for citation, key in zip(citations, keys):
+                cache_key = (style, citation.id, key)
+                fingerprint = _fingerprint(citation)
+                entry = cache.get(cache_key)
+                if entry is not None and entry[0] == fingerprint:
+                    cache.move_to_end(cache_key)
+                    hits += 1
+                    append(entry[1])
+                    continue
+                misses += 1
+                text = _render(citation, style, key)
+                cache[cache_key] = (fingerprint, text)
+                cache.move_to_end(cache_key)
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+                append(text)
+            self.hits += hits
+            self.misses += misses
+        return results
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return cache hits, misses, current size and maximum size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Drop every cached string and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,469 @@
+"""
+Typo-tolerant search over titles, authors and tags.
+
+Words are folded (accents stripped, case folded) and collected into a
+vocabulary with a posting list of citations per word. Each query word is
+expanded to the vocabulary words within a small edit distance: candidate
+words must share enough character trigrams with it, and are then verified
+with a bounded Damerau-Levenshtein distance (adjacent transpositions count
+as one edit). Citations must match every query word; their score is the
+average similarity of the best-matching word for each.
+"""
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+from .index import _insert
+from .models import Citation
+
+# Largest number of vocabulary words a query word expands to
+DEFAULT_MAX_EXPANSIONS = 50
+
+_WORD = re.compile(r"\w+")
+
+# Probe posting lists with binary searches once they are this many times
+# longer than the set of candidate documents
+_PROBE_RATIO = 16
+
+
+def fold(text: str) -> str:
+    """Strip accents and case-fold text, so "Müller" and "muller" compare equal."""
+    if not text.isascii():
+        text = "".join(
+            c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+        )
+    return text.casefold()
+
+
+def fold_words(text: str) -> List[str]:
+    """Split text into folded words."""
+    return _WORD.findall(fold(text))
+
+
+def max_edits(length: int) -> int:
+    """Default edit budget for a word: none below 3 characters, one below 6, else two."""
+    if length < 3:
+        return 0
+    return 1 if length < 6 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance, bounded.
+
+    Args:
+        a: First string
+        b: Second string
+        limit: Largest distance of interest
+
+    Returns:
+        The distance, or ``limit + 1`` if it exceeds ``limit``
+    """
+    return _bounded_distance(a, _pattern(a), b, limit)
+
+
+def _pattern(word: str) -> Dict[str, int]:
+    """Map each character of a word to the bit mask of its positions."""
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(word):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _bounded_distance(a: str, masks: Dict[str, int], b: str, limit: int) -> int:
+    """
+    Compute edit_distance() with Hyyro's bit-parallel algorithm.
+
+    One column of the dynamic programming matrix is updated per character
+    of ``b`` using integer bit operations on ``a``'s position masks,
+    which is several times faster in Python than filling the matrix cell
+    by cell. Gives up once the distance cannot come back within the limit.
+    """
+    size = len(a)
+    if abs(size - len(b)) > limit:
+        return limit + 1
+    if not size:
+        return len(b)
+    full = (1 << size) - 1
+    last = 1 << (size - 1)
+    vp = full
+    vn = 0
+    d0 = 0
+    pm_previous = 0
+    distance = size
+    remaining = len(b)
+    for char in b:
+        pm = masks.get(char, 0)
+        transposed = (((~d0) & pm) << 1) & pm_previous
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | transposed) & full
+        hp = (vn | ~(d0 | vp)) & full
+        hn = d0 & vp
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        x = ((hp << 1) | 1) & full
+        vn = x & d0
+        vp = ((hn << 1) | ~(x | d0)) & full
+        pm_previous = pm
+        remaining -= 1
+        # Each remaining character lowers the distance by at most one
+        if distance - remaining > limit:
+            return limit + 1
+    return distance if distance <= limit else limit + 1
+
+
+def _score(similarities: List[float]) -> float:
+    """Combine per-word similarities (in query order) into a document score."""
+    return sum(similarities) / len(similarities)
+
+
+def _trigrams(word: str) -> Set[str]:
+    """Return the trigrams of a word padded with two start markers and one end marker."""
+    padded = f"$${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _citation_words(citation: Citation) -> Set[str]:
+    """Return the distinct folded words of a citation's title, authors and tags."""
+    words = set(fold_words(citation.title))
+    for author in citation.authors:
+        words.update(fold_words(author))
+    for tag in citation.tags:
+        words.update(fold_words(tag))
+    return words
+
+
+class FuzzyIndex:
+    """
+    Word vocabulary with trigram postings for approximate matching.
+
+    Every distinct folded word gets an ID, a sorted ``array`` of the
+    document positions containing it, and an entry in the trigram postings
+    of its length. Keying trigram postings by word length means a lookup
+    only touches words whose length is within the edit budget of the query
+    word. Words whose documents are all removed stay in the vocabulary with
+    an empty posting list until the index is rebuilt.
+    """
+
+    def __init__(self, citations: Iterable[Optional[Citation]]):
+        """
+        Build the index.
+
+        Args:
+            citations: Citations by document position (None marks an
+                unused position)
+        """
+        self._word_ids: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._docs: List[array] = []
+        self._grams: Dict[Tuple[str, int], array] = {}
+
+        postings: Dict[str, List[int]] = {}
+        for doc, citation in enumerate(citations):
+            if citation is None:
+                continue
+            for word in _citation_words(citation):
+                docs = postings.get(word)
+                if docs is None:
+                    postings[word] = [doc]
+                else:
+                    docs.append(doc)
+        grams: Dict[Tuple[str, int], List[int]] = {}
+        for word_id, (word, docs) in enumerate(postings.items()):
+            self._word_ids[word] = word_id
+            self._words.append(word)
+            self._docs.append(array("I", docs))
+            size = len(word)
+            for gram in _trigrams(word):
+                ids = grams.get((gram, size))
+                if ids is None:
+                    grams[(gram, size)] = [word_id]
+                else:
+                    ids.append(word_id)
+        self._grams = {key: array("I", ids) for key, ids in grams.items()}
+
+    def __len__(self) -> int:
+        """Return the vocabulary size."""
+        return len(self._words)
+
+    def add(self, doc: int, citation: Citation) -> None:
+        """
+        Index a citation at a position that is not currently indexed.
+
+        Args:
+            doc: Document position
+            citation: The citation stored at that position
+        """
+        for word in _citation_words(citation):
+            word_id = self._word_ids.get(word)
+            if word_id is not None:
+                _insert(self._docs[word_id], doc)
+                continue
+            word_id = len(self._words)
+            self._word_ids[word] = word_id
+            self._words.append(word)
+            self._docs.append(array("I", [doc]))
+            for gram in _trigrams(word):
+                ids = self._grams.get((gram, len(word)))
+                if ids is None:
+                    self._grams[(gram, len(word))] = array("I", [word_id])
+                else:
+                    ids.append(word_id)
+
+    def remove(self, doc: int, citation: Citation) -> None:
+        """
+        Remove a citation from the index.
+
+        Args:
+            doc: Document position the citation was indexed at
+            citation: The citation as it was when indexed
+        """
+        for word in _citation_words(citation):
+            word_id = self._word_ids.get(word)
+            if word_id is None:
+                continue
+            docs = self._docs[word_id]
+            i = bisect_left(docs, doc)
+            if i < len(docs) and docs[i] == doc:
+                del docs[i]
+
+    def expand(
+        self,
+        word: str,
+        max_distance: Optional[int] = None,
+        max_expansions: int = DEFAULT_MAX_EXPANSIONS
+    ) -> List[Tuple[int, float]]:
+        """
+        Find vocabulary words close to a folded query word.
+
+        An edit changes at most three of a word's padded trigrams, and an
+        adjacent transposition four, so a word within ``d`` edits shares
+        at least ``len(word) + 1 - 4 * d`` trigrams with the query word. Words
+        below that count, or sharing no trigram at all, are skipped
+        without computing a distance.
+
+        Args:
+            word: Folded query word
+            max_distance: Edit budget (defaults to max_edits(len(word)))
+            max_expansions: Keep at most this many of the most similar words
+
+        Returns:
+            ``(word_id, similarity)`` pairs, most similar first, where
+            similarity is ``1 - distance / longer length``
+        """
+        limit = max_edits(len(word)) if max_distance is None else max_distance
+        size = len(word)
+        found: List[Tuple[float, int, int]] = []
+        exact = self._word_ids.get(word)
+        if exact is not None and self._docs[exact]:
+            found.append((-1.0, -len(self._docs[exact]), exact))
+        if limit > 0:
+            grams = _trigrams(word)
+            counts: Counter = Counter()
+            for length in range(max(1, size - limit), size + limit + 1):
+                counts.update(chain.from_iterable(
+                    self._grams.get((gram, length), ()) for gram in grams
+                ))
+            required = max(1, len(grams) - 4 * limit)
+            masks = _pattern(word)
+            words, docs = self._words, self._docs
+            for word_id, shared in counts.items():
+                if shared < required or word_id == exact or not docs[word_id]:
+                    continue
+                candidate = words[word_id]
+                distance = _bounded_distance(word, masks, candidate, limit)
+                if distance <= limit:
+                    similarity = 1.0 - distance / max(size, len(candidate))
+                    # Most similar first; more frequent words break ties
+                    found.append((-similarity, -len(docs[word_id]), word_id))
+        return [
+            (word_id, -negated) for negated, _, word_id in heapq.nsmallest(max_expansions, found)
+        ]
+
+    def word(self, word_id: int) -> str:
+        """Return the vocabulary word with an ID."""
+        return self._words[word_id]
+
+    def _best_matches(
+        self,
+        expansions: List[Tuple[int, float]],
+        restrict: Optional[Collection[int]]
+    ) -> Dict[int, Tuple[float, int]]:
+        """Map documents to the similarity and ID of their closest expansion."""
+        best: Dict[int, Tuple[float, int]] = {}
+        for word_id, similarity in expansions:
+            docs = self._docs[word_id]
+            if restrict is not None and len(restrict) * _PROBE_RATIO < len(docs):
+                size = len(docs)
+                for doc in restrict:
+                    if doc not in best:
+                        i = bisect_left(docs, doc)
+                        if i < size and docs[i] == doc:
+                            best[doc] = (similarity, word_id)
+                continue
+            for doc in docs:
+                if doc not in best and (restrict is None or doc in restrict):
+                    best[doc] = (similarity, word_id)
+        return best
+
+    def _closest(
+        self,
+        expansions: List[Tuple[int, float]],
+        doc: int
+    ) -> Optional[Tuple[float, int]]:
+        """Return the similarity and ID of a document's closest expansion, if any."""
+        docs = self._docs
+        for word_id, similarity in expansions:
+            posting = docs[word_id]
+            i = bisect_left(posting, doc)
+            if i < len(posting) and posting[i] == doc:
+                return similarity, word_id
+        return None
+
+    def top_k(
+        self,
+        words: List[str],
+        k: Optional[int] = None,
+        allowed: Optional[Collection[int]] = None,
+        max_distance: Optional[int] = None,
+        max_expansions: int = DEFAULT_MAX_EXPANSIONS
+    ) -> List[Tuple[int, float, List[int]]]:
+        """
+        Find the documents matching every query word most closely.
+
+        Args:
+            words: Folded query words (as produced by fold_words())
+            k: Number of results, or None for every match
+            allowed: Only consider these document positions (a set or
+                other collection with fast membership tests)
+            max_distance: Edit budget per word (defaults to max_edits())
+            max_expansions: Vocabulary words considered per query word
+
+        Returns:
+            ``(doc, score, word_ids)`` tuples, best first; equal scores keep
+            document order. ``word_ids`` holds the matched vocabulary word
+            of each query word, in query order.
+        """
+        words = list(dict.fromkeys(words))
+        if not words:
+            return []
+        expanded = []
+        for word in words:
+            expansions = self.expand(word, max_distance, max_expansions)
+            if not expansions:
+                return []
+            expanded.append(expansions)
+        sizes = [
+            sum(len(self._docs[word_id]) for word_id, _ in expansions) for expansions in expanded
+        ]
+        if k and (allowed is None or len(allowed) * _PROBE_RATIO >= min(sizes)):
+            results = []
+            for doc, score in self._top_k_by_level(expanded, sizes, k, allowed):
+                word_ids = []
+                for expansions in expanded:
+                    match = self._closest(expansions, doc)
+                    # Every hit has a match for each query word
+                    assert match is not None
+                    word_ids.append(match[1])
+                results.append((doc, score, word_ids))
+            return results
+        return self._score_all(expanded, sizes, k, allowed)
+
+    def _top_k_by_level(
+        self,
+        expanded: List[List[Tuple[int, float]]],
+        sizes: List[int],
+        k: int,
+        allowed: Optional[Collection[int]]
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the k best documents without scoring every match.
+
+        The query word with the fewest matching documents drives. Its
+        expansions are grouped into levels of equal similarity and visited
+        best level first, each level's documents in position order. A level
+        can at best score as if every other word matched exactly, so the
+        search stops as soon as k documents beat that bound.
+        """
+        count = len(expanded)
+        driver = min(range(count), key=sizes.__getitem__)
+        others = [(i, expanded[i]) for i in range(count) if i != driver]
+        levels: List[Tuple[float, List[int]]] = []
+        for word_id, similarity in expanded[driver]:
+            if levels and levels[-1][0] == similarity:
+                levels[-1][1].append(word_id)
+            else:
+                levels.append((similarity, [word_id]))
+
+        # Min-heap of (score, -doc, doc): the root is the worst result kept
+        best: List[Tuple[float, int, int]] = []
+        seen: Set[int] = set()
+        similarities = [1.0] * count
+        for similarity, word_ids in levels:
+            similarities[driver] = similarity
+            for i, _ in others:
+                similarities[i] = 1.0
+            bound = _score(similarities)
+            if len(best) == k and best[0][0] > bound:
+                break
+            previous = -1
+            for doc in heapq.merge(*(self._docs[word_id] for word_id in word_ids)):
+                if doc == previous:
+                    continue
+                previous = doc
+                if len(best) == k and (best[0][0], best[0][1]) > (bound, -doc):
+                    # Later documents of this level cannot beat the k-th result
+                    break
+                if doc in seen or (allowed is not None and doc not in allowed):
+                    continue
+                seen.add(doc)
+                for i, expansions in others:
+                    match = self._closest(expansions, doc)
+                    if match is None:
+                        break
+                    similarities[i] = match[0]
+                else:
+                    entry = (_score(similarities), -doc, doc)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+        return [(doc, score) for score, _, doc in sorted(best, reverse=True)]
+
+    def _score_all(
+        self,
+        expanded: List[List[Tuple[int, float]]],
+        sizes: List[int],
+        k: Optional[int],
+        allowed: Optional[Collection[int]]
+    ) -> List[Tuple[int, float, List[int]]]:
+        """Score every matching document, rarest query word first."""
+        order = sorted(range(len(expanded)), key=sizes.__getitem__)
+        matches: Dict[int, List[Tuple[float, int]]] = {
+            doc: [match] for doc, match in self._best_matches(expanded[order[0]], allowed).items()
+        }
+        for i in order[1:]:
+            if not matches:
+                return []
+            best = self._best_matches(expanded[i], matches)
+            matches = {doc: found + [best[doc]] for doc, found in matches.items() if doc in best}
+        if not matches:
+            return []
+
+        # Undo the processing order so word IDs line up with the query
+        position = {i: n for n, i in enumerate(order)}
+        ranked = []
+        for doc, found in matches.items():
+            in_order = [found[position[i]] for i in range(len(expanded))]
+            score = _score([similarity for similarity, _ in in_order])
+            ranked.append((doc, score, [word_id for _, word_id in in_order]))
+        if k:
+            return heapq.nsmallest(k, ranked, key=lambda item: (-item[1], item[0]))
+        return sorted(ranked, key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,259 @@
+"""
+Minimal asyncio HTTP/1.1 client used by the network helpers.
+
+Supports GET and HEAD over plain and TLS connections, kept alive and
+pooled per scheme, host and port. Only what URL checks and metadata
+lookups need is implemented: no proxies, cookies or compression.
+"""
+
+import asyncio
+import ssl
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+_STREAM_LIMIT = 1 << 18
+_PATH_SAFE = "/%:@!$&'()*+,;=-._~"
+
+# Largest response body read into memory
+MAX_BODY_SIZE = 16 << 20
+
+
+class HostKey(NamedTuple):
+    """Connection pool key."""
+    scheme: str
+    host: str
+    port: int
+
+
+class Target(NamedTuple):
+    """A parsed request URL."""
+    key: HostKey
+    host_header: str
+    path: str
+
+
+class Response(NamedTuple):
+    """Status, headers (lowercased names) and body of a response."""
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+class ProtocolError(Exception):
+    """A server sent a response that is not valid HTTP/1.1."""
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the server before it was reused."""
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def parse_target(url: str) -> Optional[Target]:
+    """
+    Split an absolute http(s) URL into pool key, Host header and request path.
+
+    Returns:
+        The target, or None if the URL is not a valid http or https URL
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    try:
+        host = parts.hostname.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    default_port = 443 if parts.scheme == "https" else 80
+    key = HostKey(parts.scheme, host, port or default_port)
+    name = f"[{host}]" if ":" in host else host
+    host_header = name if port in (None, default_port) else f"{name}:{port}"
+    path = quote(parts.path or "/", safe=_PATH_SAFE)
+    if parts.query:
+        path += "?" + quote(parts.query, safe=_PATH_SAFE + "?")
+    return Target(key, host_header, path)
+
+
+def _parse_head(head: bytes) -> Tuple[int, str, Dict[str, str], bool]:
+    """Parse a status line and headers; returns (status, reason, headers, keep-alive)."""
+    lines = head.decode("latin-1").split("\r\n")
+    version, _, rest = lines[0].partition(" ")
+    code, _, reason = rest.partition(" ")
+    if not version.startswith("HTTP/") or not code.isdigit():
+        raise ProtocolError(f"invalid response: {lines[0][:80]!r}")
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        keep_alive = "keep-alive" in connection
+    else:
+        keep_alive = "close" not in connection
+    return int(code), reason.strip(), headers, keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    parts: List[bytes] = []
+    size = 0
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        length = int(line.split(b";", 1)[0].strip(), 16)
+        if length == 0:
+            # Skip trailers
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return b"".join(parts)
+        size += length
+        if size > MAX_BODY_SIZE:
+            raise ConnectionError("response body too large")
+        parts.append(await reader.readexactly(length))
+        await reader.readexactly(2)
+
+
+async def _read_to_eof(reader: asyncio.StreamReader) -> bytes:
+    parts: List[bytes] = []
+    size = 0
+    while True:
+        chunk = await reader.read(1 << 16)
+        if not chunk:
+            return b"".join(parts)
+        size += len(chunk)
+        if size > MAX_BODY_SIZE:
+            raise ConnectionError("response body too large")
+        parts.append(chunk)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, pooled per scheme, host and port."""
+
+    def __init__(self, ssl_context: Optional[ssl.SSLContext] = None, max_idle_per_host: int = 4):
+        """
+        Args:
+            ssl_context: TLS settings for https (defaults to system trust)
+            max_idle_per_host: Idle connections kept open per host
+        """
+        self._ssl_context = ssl_context
+        self._max_idle = max_idle_per_host
+        self._idle: Dict[HostKey, Deque[_Connection]] = {}
+
+    async def _open(self, key: HostKey) -> _Connection:
+        ssl_context = None
+        if key.scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        reader, writer = await asyncio.open_connection(
+            key.host, key.port, ssl=ssl_context, limit=_STREAM_LIMIT
+        )
+        return _Connection(reader, writer)
+
+    async def request(
+        self,
+        target: Target,
+        method: str,
+        headers: Dict[str, str],
+        read_body: bool = True
+    ) -> Response:
+        """
+        Send one request, reusing an idle connection when possible.
+
+        Malformed responses raise ProtocolError; dropped connections raise
+        ConnectionError.
+
+        Args:
+            target: Parsed request URL
+            method: "GET" or "HEAD"
+            headers: Extra request headers
+            read_body: Read the response body; if false the connection is
+                closed after the headers instead of being reused
+
+        Returns:
+            The response (``body`` is empty for HEAD or when not read)
+        """
+        idle = self._idle.get(target.key)
+        while idle:
+            try:
+                return await self._send(idle.pop(), target, method, headers, read_body, True)
+            except _StaleConnection:
+                continue
+        connection = await self._open(target.key)
+        return await self._send(connection, target, method, headers, read_body, False)
+
+    async def _send(
+        self,
+        connection: _Connection,
+        target: Target,
+        method: str,
+        headers: Dict[str, str],
+        read_body: bool,
+        reused: bool
+    ) -> Response:
+        lines = [f"{method} {target.path} HTTP/1.1", f"Host: {target.host_header}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append("Connection: keep-alive")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        reader = connection.reader
+        keep = False
+        try:
+            try:
+                connection.writer.write(request)
+                await connection.writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError) as e:
+                if reused and not getattr(e, "partial", b""):
+                    raise _StaleConnection() from e
+                raise ConnectionError("connection closed by server") from e
+
+            status, reason, response_headers, keep_alive = _parse_head(head)
+            # Skip interim responses (100 Continue, 103 Early Hints)
+            while 100 <= status < 200:
+                head = await reader.readuntil(b"\r\n\r\n")
+                status, reason, response_headers, keep_alive = _parse_head(head)
+
+            body = b""
+            if method == "HEAD" or status in (204, 304):
+                keep = keep_alive
+            elif read_body:
+                if "chunked" in response_headers.get("transfer-encoding", "").lower():
+                    body = await _read_chunked(reader)
+                    keep = keep_alive
+                elif "content-length" in response_headers:
+                    length = int(response_headers["content-length"])
+                    if length > MAX_BODY_SIZE:
+                        raise ConnectionError("response body too large")
+                    body = await reader.readexactly(length)
+                    keep = keep_alive
+                else:
+                    body = await _read_to_eof(reader)
+            return Response(status, reason, response_headers, body)
+        except (ValueError, asyncio.LimitOverrunError) as e:
+            # Bad chunk size or Content-Length, or an over-long header line
+            raise ProtocolError(f"invalid response: {e}") from e
+        finally:
+            idle = self._idle.setdefault(target.key, deque())
+            if keep and len(idle) < self._max_idle:
+                idle.append(connection)
+            else:
+                connection.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
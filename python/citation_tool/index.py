@@ -0,0 +1,443 @@
+"""
+In-memory search index for Citation Tool data.
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .models import Citation, CitationType
+
+# Length of the character n-grams stored in the index. Query terms at least
+# this long can be answered from posting lists; shorter terms are verified
+# directly against the candidate citations.
+NGRAM_SIZE = 3
+
+
+def searchable_fields(citation: Citation) -> List[str]:
+    """
+    Return the lowercased text fields matched by free-text search.
+
+    These are the same fields checked by ``CitationLibrary._matches_term()``:
+    title, authors, abstract, notes, tags and DOI.
+    """
+    fields = [citation.title.lower()]
+    fields.extend(author.lower() for author in citation.authors)
+    if citation.abstract:
+        fields.append(citation.abstract.lower())
+    if citation.notes:
+        fields.append(citation.notes.lower())
+    fields.extend(tag.lower() for tag in citation.tags)
+    if citation.doi:
+        fields.append(citation.doi.lower())
+    return fields
+
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Return the set of distinct character n-grams in a string."""
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def probe_postings(docs: List[int], posting: array) -> List[int]:
+    """
+    Keep the documents of a sorted list that also appear in a posting list.
+
+    Each document is looked up with a binary search, so the cost grows with
+    ``len(docs)`` rather than with the size of the posting list.
+    """
+    size = len(posting)
+    kept = []
+    for doc in docs:
+        i = bisect_left(posting, doc)
+        if i < size and posting[i] == doc:
+            kept.append(doc)
+    return kept
+
+
+def _insert(posting: array, doc: int) -> None:
+    """Insert a document into a sorted posting list (no duplicates)."""
+    if not posting or posting[-1] < doc:
+        posting.append(doc)
+        return
+    i = bisect_left(posting, doc)
+    if posting[i] != doc:
+        posting.insert(i, doc)
+
+
+def _discard(postings: Dict, key: object, doc: int) -> None:
+    """Remove a document from a posting list, dropping the list once empty."""
+    posting = postings.get(key)
+    if posting is None:
+        return
+    i = bisect_left(posting, doc)
+    if i < len(posting) and posting[i] == doc:
+        del posting[i]
+        if not posting:
+            del postings[key]
+
+
+class SearchIndex:
+    """
+    Inverted index over a list of citations.
+
+    Each document is identified by its position in the citation list the
+    index was built from. Posting lists are kept as sorted ``array('I')``
+    values so they stay compact and can be probed with ``bisect``.
+
+    Two kinds of postings are kept:
+
+    * Character n-grams of the searchable fields. Any substring of length
+      ``NGRAM_SIZE`` or more contains all of its own n-grams, so
+      intersecting their posting lists yields a superset of the citations
+      containing the substring. Callers verify those candidates to keep
+      exact substring semantics.
+    * Exact facets: domain ID, citation type and lowercased tag, plus a
+      year-sorted index for range queries.
+
+    The n-gram postings cover abstracts and notes and are several times
+    larger than the facets, so they can be left out and added later with
+    index_text(). Until then text terms do not narrow the candidates.
+    """
+
+    def __init__(self, citations: Iterable[Optional[Citation]], text: bool = True):
+        """
+        Build the index.
+
+        Args:
+            citations: Citations to index, in library order (None marks a
+                removed slot, which is left out)
+            text: Also build the n-gram postings
+        """
+        if not isinstance(citations, Sequence):
+            citations = list(citations)
+        by_domain: Dict[str, List[int]] = {}
+        by_type: Dict[CitationType, List[int]] = {}
+        by_tag: Dict[str, List[int]] = {}
+        year_of = array("q")
+        size = 0
+        for doc, citation in enumerate(citations):
+            size = doc + 1
+            if citation is None:
+                year_of.append(0)
+                continue
+            if citation.domain_id:
+                by_domain.setdefault(citation.domain_id, []).append(doc)
+            by_type.setdefault(citation.type, []).append(doc)
+            for tag in {t.lower() for t in citation.tags}:
+                by_tag.setdefault(tag, []).append(doc)
+            # 0 stands for "no year", matching the truthiness test in search()
+            year_of.append(citation.year or 0)
+
+        self._size = size
+        self._postings: Optional[Dict[str, array]] = None
+        self._by_domain = {key: array("I", docs) for key, docs in by_domain.items()}
+        self._by_type = {key: array("I", docs) for key, docs in by_type.items()}
+        self._by_tag = {key: array("I", docs) for key, docs in by_tag.items()}
+
+        # Documents with a year, sorted by (year, position)
+        dated = [doc for doc in range(size) if year_of[doc]]
+        dated.sort(key=year_of.__getitem__)
+        self._year_of = year_of
+        self._year_docs = array("I", dated)
+        self._year_keys = array("q", (year_of[doc] for doc in dated))
+        if text:
+            self.index_text(citations)
+
+    @property
+    def has_text(self) -> bool:
+        """Whether the n-gram postings have been built."""
+        return self._postings is not None
+
+    def index_text(self, citations: Iterable[Optional[Citation]]) -> None:
+        """
+        Build the n-gram postings.
+
+        Args:
+            citations: The citations currently indexed, by position
+        """
+        postings: Dict[str, List[int]] = {}
+        for doc, citation in enumerate(citations):
+            if citation is None:
+                continue
+            grams: Set[str] = set()
+            for text in searchable_fields(citation):
+                grams.update(ngrams(text))
+            for gram in grams:
+                docs = postings.get(gram)
+                if docs is None:
+                    postings[gram] = [doc]
+                else:
+                    docs.append(doc)
+        self._postings = {gram: array("I", docs) for gram, docs in postings.items()}
+
+    def _grams(self, citation: Citation) -> Set[str]:
+        """Return the n-grams of a citation's searchable fields."""
+        grams: Set[str] = set()
+        for text in searchable_fields(citation):
+            grams.update(ngrams(text))
+        return grams
+
+    def __len__(self) -> int:
+        """Return the number of document positions covered by the index."""
+        return self._size
+
+    def _facet_keys(self, citation: Citation) -> List[Tuple[Dict, object]]:
+        """Return (posting map, key) pairs for a citation's facets."""
+        keys: List[Tuple[Dict, object]] = [(self._by_type, citation.type)]
+        if citation.domain_id:
+            keys.append((self._by_domain, citation.domain_id))
+        keys.extend((self._by_tag, tag) for tag in {t.lower() for t in citation.tags})
+        return keys
+
+    def add(self, doc: int, citation: Citation) -> None:
+        """
+        Index a citation at a position that is not currently indexed.
+
+        Used to patch the index in place when a few records change.
+
+        Args:
+            doc: Document position (a new position or one previously removed)
+            citation: The citation stored at that position
+        """
+        if self._postings is not None:
+            for gram in self._grams(citation):
+                _insert(self._postings.setdefault(gram, array("I")), doc)
+        for postings, key in self._facet_keys(citation):
+            _insert(postings.setdefault(key, array("I")), doc)
+
+        while len(self._year_of) <= doc:
+            self._year_of.append(0)
+        year = citation.year or 0
+        self._year_of[doc] = year
+        if year:
+            lo = bisect_left(self._year_keys, year)
+            hi = bisect_right(self._year_keys, year)
+            i = bisect_left(self._year_docs, doc, lo, hi)
+            self._year_keys.insert(i, year)
+            self._year_docs.insert(i, doc)
+        self._size = max(self._size, doc + 1)
+
+    def remove(self, doc: int, citation: Citation) -> None:
+        """
+        Remove a citation from the index.
+
+        Args:
+            doc: Document position the citation was indexed at
+            citation: The citation as it was when indexed
+        """
+        if self._postings is not None:
+            for gram in self._grams(citation):
+                _discard(self._postings, gram, doc)
+        for postings, key in self._facet_keys(citation):
+            _discard(postings, key, doc)
+
+        year = self._year_of[doc] if doc < len(self._year_of) else 0
+        if year:
+            lo = bisect_left(self._year_keys, year)
+            hi = bisect_right(self._year_keys, year)
+            i = bisect_left(self._year_docs, doc, lo, hi)
+            if i < hi and self._year_docs[i] == doc:
+                del self._year_keys[i]
+                del self._year_docs[i]
+            self._year_of[doc] = 0
+
+    def postings(self, gram: str) -> array:
+        """Return the posting list for an n-gram (empty if unknown or not built)."""
+        if self._postings is None:
+            return array("I")
+        return self._postings.get(gram, array("I"))
+
+    def _plan(
+        self,
+        terms: Optional[List[str]],
+        domain_id: Optional[str],
+        citation_type: Optional[CitationType],
+        year_from: Optional[int],
+        year_to: Optional[int],
+        tags: Optional[List[str]]
+    ) -> Optional[Tuple[List[array], Optional[Tuple[int, int]]]]:
+        """
+        Turn search filters into posting lists and a year range.
+
+        Returns:
+            ``(postings, year_range)`` where ``year_range`` is a slice of the
+            year-sorted documents (or None if years are not filtered), or
+            None if some filter matches nothing
+        """
+        postings: List[array] = []
+        grams: Set[str] = set()
+        if self._postings is not None:
+            for term in terms or ():
+                if len(term) >= NGRAM_SIZE:
+                    grams.update(ngrams(term))
+        keys: List[Tuple[Dict, object]] = [(self._postings or {}, gram) for gram in grams]
+        if domain_id is not None:
+            keys.append((self._by_domain, domain_id))
+        if citation_type is not None:
+            keys.append((self._by_type, citation_type))
+        keys.extend((self._by_tag, tag) for tag in tags or ())
+        for source, key in keys:
+            posting = source.get(key)
+            if not posting:
+                return None
+            postings.append(posting)
+
+        year_range = None
+        if year_from is not None or year_to is not None:
+            lo = 0 if year_from is None else bisect_left(self._year_keys, year_from)
+            hi = (
+                len(self._year_keys) if year_to is None
+                else bisect_right(self._year_keys, year_to)
+            )
+            if lo >= hi:
+                return None
+            year_range = (lo, hi)
+        return postings, year_range
+
+    def candidates(
+        self,
+        terms: Optional[List[str]] = None,
+        domain_id: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> Optional[List[int]]:
+        """
+        Find documents matching a combination of search filters.
+
+        Every filter is turned into a posting list (or a year range) and
+        the most selective one drives the intersection; the others are
+        probed for each surviving document. Facet and year filters are
+        exact. Text terms only narrow the result: the candidates may not
+        contain every term and must be verified by the caller. Terms
+        shorter than ``NGRAM_SIZE``, or any terms before index_text(), are
+        not used for narrowing at all.
+
+        Args:
+            terms: Lowercased query terms
+            domain_id: Exact domain ID
+            citation_type: Citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: Lowercased tags that must all be present
+
+        Returns:
+            Sorted document positions, or None if no filter applies (every
+            document is then a candidate)
+        """
+        plan = self._plan(terms, domain_id, citation_type, year_from, year_to, tags)
+        if plan is None:
+            return []
+        postings, year_range = plan
+        lo, hi = year_range or (0, 0)
+        # None marks the year filter in the plan
+        filters: List[Tuple[int, Optional[array]]] = [(len(p), p) for p in postings]
+        if year_range is not None:
+            filters.append((hi - lo, None))
+        if not filters:
+            return None
+
+        # Drive with the most selective filter, probe the rest
+        filters.sort(key=lambda f: f[0])
+        driver = filters[0][1]
+        if driver is None:
+            result = sorted(self._year_docs[lo:hi])
+        else:
+            result = list(driver)
+
+        for _, posting in filters[1:]:
+            if posting is None:
+                low = self._year_keys[lo]
+                high = self._year_keys[hi - 1]
+                year_of = self._year_of
+                result = [doc for doc in result if year_of[doc] and low <= year_of[doc] <= high]
+            else:
+                result = probe_postings(result, posting)
+            if not result:
+                break
+        return result
+
+    def iter_candidates(
+        self,
+        terms: Optional[List[str]] = None,
+        domain_id: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        after: int = -1
+    ) -> Optional[Iterator[int]]:
+        """
+        Lazily find documents matching a combination of search filters.
+
+        Like candidates(), but documents are produced one at a time in
+        position order, each checked against every filter as it is
+        reached, so a consumer that stops early only pays for what it
+        read. Starting after a given position costs a binary search per
+        filter.
+
+        Args:
+            terms: Lowercased query terms
+            domain_id: Exact domain ID
+            citation_type: Citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: Lowercased tags that must all be present
+            after: Only return positions greater than this
+
+        Returns:
+            Iterator of document positions, or None if no filter applies
+        """
+        plan = self._plan(terms, domain_id, citation_type, year_from, year_to, tags)
+        if plan is None:
+            return iter(())
+        postings, year_range = plan
+        if not postings and year_range is None:
+            return None
+        postings.sort(key=len)
+        # Without a year range there is at least one posting list
+        if year_range is None or (postings and len(postings[0]) <= year_range[1] - year_range[0]):
+            driver = postings.pop(0)
+            start = bisect_right(driver, after)
+            docs: Iterator[int] = iter(driver[start:] if start else driver)
+        else:
+            docs = self._iter_years(year_range[0], year_range[1], after)
+            year_range = None
+        if not postings and year_range is None:
+            return docs
+        return self._probe(docs, postings, year_range)
+
+    def _iter_years(self, lo: int, hi: int, after: int) -> Iterator[int]:
+        """Merge the per-year runs of a year-sorted slice into position order."""
+        keys = self._year_keys
+        year_docs = self._year_docs
+        runs = []
+        while lo < hi:
+            # Within one year, documents are sorted by position
+            end = bisect_right(keys, keys[lo], lo, hi)
+            start = bisect_right(year_docs, after, lo, end)
+            runs.append(iter(year_docs[start:end]))
+            lo = end
+        return heapq.merge(*runs)
+
+    def _probe(
+        self,
+        docs: Iterator[int],
+        postings: List[array],
+        year_range: Optional[Tuple[int, int]]
+    ) -> Iterator[int]:
+        """Yield the documents that are in every posting list and year range."""
+        if year_range is not None:
+            low = self._year_keys[year_range[0]]
+            high = self._year_keys[year_range[1] - 1]
+        year_of = self._year_of
+        for doc in docs:
+            for posting in postings:
+                i = bisect_left(posting, doc)
+                if i == len(posting) or posting[i] != doc:
+                    break
+            else:
+                if year_range is None or (year_of[doc] and low <= year_of[doc] <= high):
+                    yield doc
@@ -0,0 +1,529 @@
+"""
+Opt-in timing and profiling of library operations.
+
+``CitationLibrary.enable_metrics()`` wraps the library's operations on that
+instance so that each call records its latency in a histogram, searches
+record how many candidate citations they examined against how many they
+returned, and the query and formatting caches report their hit rates.
+Every recorded call is also passed to the registered sinks. Until metrics
+are enabled nothing is wrapped, so an uninstrumented library runs the
+plain methods.
+
+profile() captures a cProfile profile and tracemalloc allocation diff
+around any block of code.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import math
+import pstats
+import threading
+import time
+import tracemalloc
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Union
+)
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, from 1 microsecond to 30 seconds
+DEFAULT_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+class OperationEvent(NamedTuple):
+    """One recorded library call, as passed to sinks."""
+    operation: str
+    seconds: float
+    # Candidate citations examined and matches returned, for searches
+    scanned: Optional[int]
+    returned: Optional[int]
+    error: bool
+
+
+Sink = Callable[[OperationEvent], None]
+
+
+class Histogram:
+    """Latency histogram with fixed bucket bounds."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            bounds: Increasing bucket upper bounds in seconds; a final
+                unbounded bucket is added
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a measurement."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile from the buckets.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Upper bound of the bucket holding the quantile (capped at the
+            largest measurement), or None without measurements
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """
+    Collects latency histograms, scan counts and cache statistics.
+
+    One Metrics object may be shared by several libraries; their
+    operations and caches are then reported together. Safe to use from
+    several threads.
+
+    Example:
+        >>> metrics = library.enable_metrics()
+        >>> library.search("neural", year_from=2020)
+        >>> metrics.snapshot()["operations"]["search"]["p50"]
+        0.00025
+        >>> print(metrics.prometheus_text())
+    """
+
+    def __init__(
+        self,
+        sinks: Optional[Iterable[Sink]] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Args:
+            sinks: Callables receiving an OperationEvent for every recorded
+                call (see logging_sink())
+            buckets: Histogram bucket upper bounds in seconds
+        """
+        self.sinks: List[Sink] = list(sinks or [])
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Histogram] = {}
+        self._scanned: Dict[str, int] = {}
+        self._returned: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._caches: Dict[str, List[Callable[[], Optional[Callable[[], Mapping[str, int]]]]]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add_sink(self, sink: Sink) -> None:
+        """Register a callable receiving an OperationEvent for every recorded call."""
+        self.sinks.append(sink)
+
+    def track_cache(self, name: str, cache_info: Callable[[], Mapping[str, int]]) -> None:
+        """
+        Report a cache's statistics under a name.
+
+        Caches registered under the same name are summed. Bound methods are
+        held weakly, so tracking does not keep their owner alive.
+
+        Args:
+            name: Cache name in reports
+            cache_info: Callable returning at least ``hits``, ``misses``
+                and ``size``
+        """
+        if hasattr(cache_info, "__self__"):
+            ref: Callable[[], Any] = weakref.WeakMethod(cache_info)  # type: ignore[arg-type]
+        else:
+            ref = lambda: cache_info  # noqa: E731
+        with self._lock:
+            refs = self._caches.setdefault(name, [])
+            if ref not in refs:
+                refs.append(ref)
+
+    def observe(
+        self,
+        operation: str,
+        seconds: float,
+        scanned: Optional[int] = None,
+        returned: Optional[int] = None,
+        error: bool = False
+    ) -> None:
+        """
+        Record a completed call and pass it to the sinks.
+
+        Args:
+            operation: Operation name
+            seconds: Wall-clock duration
+            scanned: Candidate citations examined, if applicable
+            returned: Results produced, if applicable
+            error: Whether the call raised
+        """
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if scanned is not None:
+                self._scanned[operation] = self._scanned.get(operation, 0) + scanned
+            if returned is not None:
+                self._returned[operation] = self._returned.get(operation, 0) + returned
+            if error:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+        if self.sinks:
+            event = OperationEvent(operation, seconds, scanned, returned, error)
+            for sink in self.sinks:
+                try:
+                    sink(event)
+                except Exception:
+                    logger.exception("Metrics sink %r failed", sink)
+
+    def record_scan(self, scanned: int, returned: int) -> None:
+        """
+        Count citations examined and matched by the innermost timed call
+        on this thread (and the calls enclosing it).
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            counts = stack[-1]
+            counts[0] += scanned
+            counts[1] += returned
+            counts[2] = True
+
+    @contextmanager
+    def time(self, operation: str) -> Iterator[None]:
+        """
+        Time a block of code as an operation.
+
+        Example:
+            >>> with metrics.time("notebook.cell"):
+            ...     library.search("graph")
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # Scanned, returned, and whether a scan was recorded at all
+        counts: List[Any] = [0, 0, False]
+        stack.append(counts)
+        error = True
+        start = time.perf_counter()
+        try:
+            yield
+            error = False
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            scanned = returned = None
+            if counts[2]:
+                scanned, returned = counts[0], counts[1]
+                if stack:
+                    outer = stack[-1]
+                    outer[0] += scanned
+                    outer[1] += returned
+                    outer[2] = True
+            self.observe(operation, seconds, scanned, returned, error)
+
+    def wrap(self, operation: str, func: Callable) -> Callable:
+        """Return ``func`` timed as ``operation``."""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with self.time(operation):
+                return func(*args, **kwargs)
+        return timed
+
+    def _cache_stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            caches = {name: list(refs) for name, refs in self._caches.items()}
+        stats: Dict[str, Dict[str, float]] = {}
+        for name, refs in caches.items():
+            hits = misses = size = 0
+            for ref in refs:
+                cache_info = ref()
+                if cache_info is None:
+                    continue
+                info = cache_info()
+                hits += info.get("hits", 0)
+                misses += info.get("misses", 0)
+                size += info.get("size", 0)
+            lookups = hits + misses
+            stats[name] = {
+                "hits": hits,
+                "misses": misses,
+                "size": size,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarize what has been recorded.
+
+        Returns:
+            Dictionary with ``operations`` (per operation: ``count``,
+            ``total``, ``mean``, ``min``, ``max``, ``p50``, ``p90``,
+            ``p99`` in seconds, ``errors``, and ``scanned``/``returned``
+            for searches) and ``caches`` (``hits``, ``misses``, ``size``,
+            ``hit_rate``)
+        """
+        with self._lock:
+            operations = {}
+            for name, histogram in sorted(self._histograms.items()):
+                summary: Dict[str, Any] = {
+                    "count": histogram.count,
+                    "total": histogram.sum,
+                    "mean": histogram.sum / histogram.count,
+                    "min": histogram.min,
+                    "max": histogram.max,
+                    "p50": histogram.quantile(0.5),
+                    "p90": histogram.quantile(0.9),
+                    "p99": histogram.quantile(0.99),
+                    "errors": self._errors.get(name, 0),
+                }
+                if name in self._scanned or name in self._returned:
+                    summary["scanned"] = self._scanned.get(name, 0)
+                    summary["returned"] = self._returned.get(name, 0)
+                operations[name] = summary
+        return {"operations": operations, "caches": self._cache_stats()}
+
+    def prometheus_text(self, prefix: str = "citation_tool") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Text suitable for a ``/metrics`` endpoint or the node
+            exporter's textfile collector
+        """
+        lines: List[str] = []
+
+        def header(name: str, kind: str, text: str) -> str:
+            lines.append(f"# HELP {prefix}_{name} {text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            return f"{prefix}_{name}"
+
+        with self._lock:
+            histograms = sorted(
+                (name, list(h.counts), h.sum, h.count) for name, h in self._histograms.items()
+            )
+            counters = [
+                ("operation_errors_total", "Library calls that raised.", dict(self._errors)),
+                ("scanned_total", "Candidate citations examined by searches.", dict(self._scanned)),
+                ("returned_total", "Citations returned by searches.", dict(self._returned)),
+            ]
+
+        metric = header("operation_seconds", "histogram", "Latency of library operations.")
+        for name, counts, total, count in histograms:
+            label = f'operation="{_escape(name)}"'
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                lines.append(f'{metric}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{metric}_sum{{{label}}} {total!r}")
+            lines.append(f"{metric}_count{{{label}}} {count}")
+        for name, text, values in counters:
+            metric = header(name, "counter", text)
+            for operation, value in sorted(values.items()):
+                lines.append(f'{metric}{{operation="{_escape(operation)}"}} {value}')
+
+        caches = self._cache_stats()
+        for key, kind, text in (
+            ("hits", "counter", "Cache hits."),
+            ("misses", "counter", "Cache misses."),
+            ("size", "gauge", "Cached entries."),
+        ):
+            metric = header(f"cache_{key}" + ("_total" if kind == "counter" else ""), kind, text)
+            for name, stats in sorted(caches.items()):
+                lines.append(f'{metric}{{cache="{_escape(name)}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path], prefix: str = "citation_tool") -> None:
+        """
+        Write prometheus_text() to a file, replacing it atomically.
+
+        Args:
+            path: Destination, e.g. a ``.prom`` file read by the node
+                exporter's textfile collector
+            prefix: Metric name prefix
+        """
+        path = Path(path)
+        partial = path.with_name(path.name + ".partial")
+        partial.write_text(self.prometheus_text(prefix), encoding="utf-8")
+        partial.replace(path)
+
+    def reset(self) -> None:
+        """Forget recorded operations (tracked caches keep their own counters)."""
+        with self._lock:
+            self._histograms.clear()
+            self._scanned.clear()
+            self._returned.clear()
+            self._errors.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def logging_sink(
+    target: Optional[logging.Logger] = None,
+    level: int = logging.DEBUG,
+    min_seconds: float = 0.0
+) -> Sink:
+    """
+    Create a sink that logs every recorded call.
+
+    Args:
+        target: Logger to use (defaults to this module's logger)
+        level: Log level
+        min_seconds: Only log calls at least this slow
+
+    Returns:
+        A sink for Metrics
+    """
+    target = target or logger
+
+    def sink(event: OperationEvent) -> None:
+        if event.seconds < min_seconds:
+            return
+        message = "%s took %.3f ms"
+        args: List[Any] = [event.operation, event.seconds * 1000]
+        if event.scanned is not None:
+            message += " (scanned %d, returned %d)"
+            args.extend([event.scanned, event.returned])
+        if event.error:
+            message += " and failed"
+        target.log(level, message, *args)
+
+    return sink
+
+
+def instrument(obj: Any, metrics: Metrics, operations: Mapping[str, str]) -> None:
+    """
+    Time methods of one object by shadowing them with wrapped versions.
+
+    Args:
+        obj: Object to instrument
+        metrics: Where calls are recorded
+        operations: Method name to operation name
+    """
+    uninstrument(obj, operations)
+    for method, operation in operations.items():
+        setattr(obj, method, metrics.wrap(operation, getattr(obj, method)))
+
+
+def uninstrument(obj: Any, operations: Iterable[str]) -> None:
+    """Remove the wrappers installed by instrument()."""
+    for method in operations:
+        obj.__dict__.pop(method, None)
+
+
+class ProfileReport:
+    """Results of a profile() block."""
+
+    def __init__(self, profiler: cProfile.Profile):
+        self.profiler = profiler
+        self.seconds = 0.0
+        # Allocation changes by source line, largest first
+        self.memory: List[tracemalloc.StatisticDiff] = []
+        self.peak_memory: Optional[int] = None
+
+    @property
+    def stats(self) -> pstats.Stats:
+        """The cProfile statistics."""
+        return pstats.Stats(self.profiler)
+
+    def report(self, limit: int = 20, sort: str = "cumulative") -> str:
+        """
+        Render the slowest functions and largest allocations as text.
+
+        Args:
+            limit: Number of functions and allocation sites shown
+            sort: pstats sort key, e.g. ``"cumulative"`` or ``"tottime"``
+
+        Returns:
+            Human-readable report
+        """
+        out = io.StringIO()
+        out.write(f"Elapsed: {self.seconds:.3f} s\n")
+        if self.peak_memory is not None:
+            out.write(f"Peak traced memory: {self.peak_memory / 1024 / 1024:.1f} MiB\n")
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        if self.memory:
+            out.write("Allocations:\n")
+            for diff in self.memory[:limit]:
+                out.write(f"  {diff}\n")
+        return out.getvalue()
+
+
+@contextmanager
+def profile(memory: bool = True, frames: int = 1) -> Iterator[ProfileReport]:
+    """
+    Profile a block of code with cProfile and, optionally, tracemalloc.
+
+    The report is filled in when the block exits. Tracing memory slows the
+    block down considerably; pass ``memory=False`` for timing only.
+
+    Args:
+        memory: Also record allocations with tracemalloc
+        frames: Stack frames kept per allocation
+
+    Yields:
+        ProfileReport
+
+    Example:
+        >>> with profile() as report:
+        ...     library.refresh()
+        ...     library.search("transformer")
+        >>> print(report.report(limit=10))
+    """
+    profiler = cProfile.Profile()
+    report = ProfileReport(profiler)
+    tracing = memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start(frames)
+    before = None
+    if memory:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield report
+    finally:
+        profiler.disable()
+        report.seconds = time.perf_counter() - start
+        if before is not None:
+            after = tracemalloc.take_snapshot()
+            report.peak_memory = tracemalloc.get_traced_memory()[1]
+            if tracing:
+                tracemalloc.stop()
+            ignore = [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+            report.memory = after.filter_traces(ignore).compare_to(
+                before.filter_traces(ignore), "lineno"
+            )
@@ -2,11 +2,75 @@
 Citation Library - main interface for working with citation data.
 """
 
+import asyncio
 import json
+import logging
+import threading
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Union
-from collections import Counter
-from .models import Citation, Domain, CitationType
+from typing import (
+    IO, TYPE_CHECKING, List, Optional, Dict, Any, Callable, Iterable, Iterator, Sequence, Set,
+    Tuple, Union
+)
+from itertools import chain, islice
+from .models import (
+    Citation, Domain, CitationType, DoiLookupResult, DuplicateMatch, DuplicateMatchReason,
+    FuzzyMatch, UrlHealthStatus, _parse_datetime
+)
+from . import bibtex, columnar, doi, urlhealth, writers
+from .authors import AuthorIndex, CoauthorGraph
+from .duplicates import find_duplicate_pairs
+from .facets import FacetCounts, FacetIndex
+from .formatting import CitationFormatter
+from .fuzzy import DEFAULT_MAX_EXPANSIONS, FuzzyIndex, fold_words
+from .index import SearchIndex
+from .instrumentation import Metrics, instrument, uninstrument
+from .query import CitationQuery, QueryFilters
+from .querycache import DEFAULT_QUERY_CACHE_SIZE, QueryCache, filters_key
+from .ranking import RankingIndex, tokenize
+from .snapshot import Snapshot, default_snapshot_path, read_snapshot, source_key, write_snapshot
+from .store import CitationStore
+from .streaming import iter_export_items
+
+if TYPE_CHECKING:
+    from .sharded import ShardedCitationLibrary
+
+logger = logging.getLogger(__name__)
+
+# refresh() rebuilds the index once this many slots (and at least a
+# quarter of all slots) belong to removed citations.
+_COMPACTION_MIN_TOMBSTONES = 1024
+
+# Methods timed by enable_metrics(), and the operation names they report
+_TIMED_OPERATIONS = {
+    "_load_data": "load",
+    "_build_search_index": "index.build",
+    "_build_text_index": "index.build_text",
+    "_build_ranking_index": "index.build_ranking",
+    "_build_fuzzy_index": "index.build_fuzzy",
+    "_build_author_index": "index.build_authors",
+    "_build_facet_index": "index.build_facets",
+    "coauthor_graph": "coauthor_graph",
+    "refresh": "refresh",
+    "search": "search",
+    "_scan": "search.scan",
+    "_ranked_search": "search.ranked",
+    "fuzzy_search": "search.fuzzy",
+    "get_statistics": "get_statistics",
+    "facets": "facets",
+    "find_duplicates": "find_duplicates",
+    "check_urls": "check_urls",
+    "enrich_from_doi": "enrich_from_doi",
+    "format_many": "format_many",
+    "export_bibtex": "export_bibtex",
+    "export_json": "export_json",
+    "write_bibtex": "write_bibtex",
+    "write_json": "write_json",
+    "to_dataframe": "to_dataframe",
+    "to_exploded_dataframe": "to_exploded_dataframe",
+    "to_arrow": "to_arrow",
+    "to_parquet": "to_parquet",
+}
 
 
 class CitationLibrary:
@@ -22,36 +86,610 @@ class CitationLibrary:
         [Citation(...), Citation(...)]
     """
 
-    def __init__(self, data_path: Union[str, Path]):
+    def __init__(
+        self,
+        data_path: Union[str, Path],
+        streaming: bool = False,
+        compact: bool = False,
+        cache: Union[bool, str, Path] = False,
+        source_format: str = "json",
+        workers: int = 1,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        metrics: Optional[Metrics] = None,
+        eager_index: bool = False
+    ):
         """
-        Initialize the library from a JSON export file.
+        Initialize the library from a JSON export (or BibTeX) file.
 
         Args:
             data_path: Path to the JSON export file from Citation Tool
+            streaming: Parse the export incrementally, building records as
+                they are read instead of decoding the whole file first.
+                Slightly slower, but peak memory stays close to the size of
+                the loaded library. Recommended for very large exports.
+            compact: Keep citations in a columnar CitationStore instead of
+                a list of Citation objects. Repeated values are stored once,
+                but abstracts and notes are kept as they are, so the saving
+                depends on the data (about a quarter of the record memory
+                on typical exports); the search indexes are the same size
+                either way. Citation objects are then created on access, so
+                changes made to them are not kept by the library.
+            cache: Reuse a binary snapshot of the parsed records (and the
+                search index, with ``eager_index``) instead of parsing the
+                export on every start. True keeps it next to the export as
+                ``<name>.snapshot``; a path selects another location. The
+                snapshot is rebuilt automatically when the export changes.
+            source_format: "json" for a Citation Tool export or "bibtex"
+                for a ``.bib`` file (see from_bibtex())
+            workers: Worker processes used to parse large BibTeX files
+            query_cache_size: Number of search() and get_statistics()
+                results kept in ``query_cache`` (0 disables it). Cached
+                results are invalidated when the data changes.
+            metrics: Record timings from the start, including the initial
+                load (see enable_metrics())
+            eager_index: Build the search index while loading. By default
+                the facet postings are built on the first search and the
+                n-gram postings on the first search with text terms; those
+                cover abstracts and notes, so they are usually several
+                times larger than the records and slow to build.
         """
+        if source_format not in ("json", "bibtex"):
+            raise ValueError(f"source_format must be 'json' or 'bibtex', got {source_format!r}")
         self.data_path = Path(data_path)
-        self._citations: List[Citation] = []
+        self.source_format = source_format
+        self.workers = workers
+        self.streaming = streaming
+        self.compact = compact
+        self.eager_index = eager_index
+        if cache is True:
+            self.snapshot_path: Optional[Path] = default_snapshot_path(self.data_path)
+        elif cache:
+            self.snapshot_path = Path(cache)
+        else:
+            self.snapshot_path = None
+        self._citations: Sequence[Citation] = []
+        # Index positions refer to slots; refresh() leaves None in the slots
+        # of removed citations until the index is compacted.
+        self._slots: Sequence[Optional[Citation]] = self._citations
         self._domains: List[Domain] = []
+        # Built on the first search (or while loading, with eager_index)
+        self._index: Optional[SearchIndex] = None
+        # Built on the first ranked search, then kept in step with _index
+        self._ranking: Optional[RankingIndex] = None
+        # Built on the first fuzzy search, then kept in step with _index
+        self._fuzzy: Optional[FuzzyIndex] = None
+        # Built on the first author query, then kept in step with _index
+        self._authors: Optional[AuthorIndex] = None
+        # Snapshot of the co-authorship graph, dropped on any change
+        self._coauthors: Optional[CoauthorGraph] = None
+        # Built on the first facet or statistics query, then kept in step with _index
+        self._facets: Optional[FacetIndex] = None
+        # Bumped whenever slot positions are reassigned (reload, re-index)
+        self._generation = 0
+        self._citation_positions: Dict[str, int] = {}
+        self._has_duplicate_ids = False
+        self._domains_by_id: Dict[str, Domain] = {}
+        self._domains_by_name: Dict[str, Domain] = {}
+        self._source: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.formatter = CitationFormatter()
+        self.query_cache = QueryCache(query_cache_size)
+        self.metrics: Optional[Metrics] = None
+        if metrics is not None:
+            self.enable_metrics(metrics)
         self._load_data()
 
     def _load_data(self) -> None:
-        """Load data from the JSON file."""
+        """Load data from the JSON file (or a valid snapshot of it)."""
         if not self.data_path.exists():
             raise FileNotFoundError(f"Data file not found: {self.data_path}")
 
+        snapshot = None
+        parsed_source = source_key(self.data_path)
+        if self.snapshot_path is not None:
+            snapshot = read_snapshot(self.snapshot_path, self.data_path)
+
+        if snapshot is not None:
+            self._citations = snapshot.citations if self.compact else list(snapshot.citations)
+            self._domains = snapshot.domains
+            self._slots = self._citations
+            self._index = snapshot.search_index
+        else:
+            if self.source_format == "bibtex":
+                records = bibtex.iter_bibtex(self.data_path, workers=self.workers)
+                self._citations = CitationStore(records) if self.compact else list(records)
+                self._domains = []
+            elif self.streaming:
+                self._load_data_streaming()
+            else:
+                with open(self.data_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+
+                records = (Citation.from_dict(c) for c in data.get("citations", []))
+                self._citations = CitationStore(records) if self.compact else list(records)
+                self._domains = [Domain.from_dict(d) for d in data.get("domains", [])]
+
+            self._slots = self._citations
+            self._index = None
+
+        if self._index is None and self.eager_index:
+            self._index = self._build_search_index()
+        if snapshot is None:
+            self._write_snapshot(parsed_source)
+        self._ranking = None
+        self._fuzzy = None
+        self._authors = None
+        self._coauthors = None
+        self._facets = None
+        self._generation += 1
+        self._source = parsed_source
+        self._build_lookups()
+        self.query_cache.invalidate()
+
+    def _write_snapshot(self, parsed_source: Dict[str, Any]) -> None:
+        """Save the freshly parsed data as a snapshot (best effort)."""
+        if self.snapshot_path is None:
+            return
+        if isinstance(self._citations, CitationStore):
+            store = self._citations
+        else:
+            store = CitationStore(self._citations)
+        try:
+            write_snapshot(
+                self.snapshot_path,
+                self.data_path,
+                Snapshot(store, self._domains, self._index),
+                parsed_source
+            )
+        except OSError:
+            # The cache is only an optimization; an unwritable location
+            # just means the next start parses the export again.
+            pass
+
+    def _build_lookups(self) -> None:
+        """Build the ID and name lookup maps (first occurrence wins)."""
+        if isinstance(self._slots, CitationStore):
+            ids: Iterable[Optional[str]] = self._slots.ids
+        else:
+            ids = (c.id if c is not None else None for c in self._slots)
+        positions: Dict[str, int] = {}
+        duplicates = False
+        for position, citation_id in enumerate(ids):
+            if citation_id is None:
+                continue
+            if citation_id in positions:
+                duplicates = True
+            else:
+                positions[citation_id] = position
+        self._citation_positions = positions
+        self._has_duplicate_ids = duplicates
+        self._build_domain_lookups()
+
+    def _build_domain_lookups(self) -> None:
+        """Build the domain ID and name maps (first occurrence wins)."""
+        self._domains_by_id = {}
+        self._domains_by_name = {}
+        for domain in self._domains:
+            self._domains_by_id.setdefault(domain.id, domain)
+            self._domains_by_name.setdefault(domain.name.casefold(), domain)
+
+    def _load_data_streaming(self) -> None:
+        """Load data by decoding one record at a time."""
+        citations: Union[CitationStore, List[Citation]] = CitationStore() if self.compact else []
+        domains: List[Domain] = []
+
         with open(self.data_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            for section, item in iter_export_items(f):
+                if section == "citations":
+                    citations.append(Citation.from_dict(item))
+                else:
+                    domains.append(Domain.from_dict(item))
+
+        self._citations = citations
+        self._domains = domains
+
+    @staticmethod
+    def iter_file(data_path: Union[str, Path]) -> Iterator[Citation]:
+        """
+        Stream citations from an export file without loading the library.
+
+        Only one record is held in memory at a time, which makes this
+        suitable for one-pass jobs over exports that do not fit in memory.
+
+        Args:
+            data_path: Path to the JSON export file from Citation Tool
+
+        Yields:
+            Citations in file order
+
+        Example:
+            >>> for citation in CitationLibrary.iter_file("citations.json"):
+            ...     print(citation.title)
+        """
+        path = Path(data_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Data file not found: {path}")
+
+        with open(path, "r", encoding="utf-8") as f:
+            for _, item in iter_export_items(f, sections=("citations",)):
+                yield Citation.from_dict(item)
+
+    @classmethod
+    def from_bibtex(
+        cls,
+        bib_path: Union[str, Path],
+        workers: int = 1,
+        compact: bool = False,
+        cache: Union[bool, str, Path] = False
+    ) -> "CitationLibrary":
+        """
+        Create a library from a BibTeX file.
+
+        Entries are mapped onto citations the same way the web app imports
+        BibTeX. Citation IDs are derived from the entry keys, so they stay
+        stable across reloads and refresh() can tell entries apart. Entries
+        that cannot be parsed are skipped with a logged warning.
+
+        Args:
+            bib_path: Path to the ``.bib`` file
+            workers: Worker processes used to parse large files
+            compact: Keep citations in a columnar CitationStore
+            cache: Reuse a binary snapshot (see ``__init__``)
+
+        Returns:
+            A CitationLibrary without domains
+
+        Example:
+            >>> library = CitationLibrary.from_bibtex("references.bib", workers=4)
+        """
+        return cls(bib_path, compact=compact, cache=cache, source_format="bibtex", workers=workers)
+
+    @staticmethod
+    def iter_bibtex(
+        bib_path: Union[str, Path, IO[str]],
+        workers: int = 1,
+        on_error: Optional[Callable[[bibtex.BibTexParseError], None]] = None
+    ) -> Iterator[Citation]:
+        """
+        Stream citations from a BibTeX file without loading a library.
+
+        The file is tokenized in a single pass with bounded memory. Nested
+        braces, ``@string`` macros and ``#`` concatenation are supported.
+
+        Args:
+            bib_path: Path to a ``.bib`` file, or a text stream
+            workers: Worker processes for large files; the file is split at
+                entry boundaries and results are yielded in file order
+            on_error: Called with a BibTexParseError for each skipped entry
+                (defaults to logging a warning)
+
+        Yields:
+            Citations in file order
+        """
+        return bibtex.iter_bibtex(bib_path, workers=workers, on_error=on_error)
+
+    @staticmethod
+    def open_many(paths: Sequence[Union[str, Path]], **options) -> "ShardedCitationLibrary":
+        """
+        Open several exports as one library.
 
-        self._citations = [Citation.from_dict(c) for c in data.get("citations", [])]
-        self._domains = [Domain.from_dict(d) for d in data.get("domains", [])]
+        Args:
+            paths: JSON exports from Citation Tool, in priority order
+            **options: Passed to ShardedCitationLibrary (``workers``,
+                ``cache``, ``compact``, ``dedupe``, ``query_cache_size``)
+
+        Returns:
+            A ShardedCitationLibrary over the exports
+
+        Example:
+            >>> library = CitationLibrary.open_many(["lab.json", "personal.json"], dedupe=True)
+        """
+        from .sharded import ShardedCitationLibrary
+
+        return ShardedCitationLibrary(paths, **options)
 
     def reload(self) -> None:
         """Reload data from the file."""
+        with self._lock:
+            self._load_data()
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Apply changes made to the export file since it was loaded.
+
+        The export is diffed against the loaded citations by ``id``; a
+        citation counts as changed when its ``dateModified`` (or
+        ``dateAdded``) differs, or, when it has neither, when its content
+        differs. Only added, changed and removed citations are rebuilt and
+        patched into the search index and lookup maps; domains are always
+        replaced. New citations are appended after the existing ones.
+
+        Compact libraries, and exports with duplicate citation IDs, are
+        reloaded in full instead. BibTeX sources are always reloaded in
+        full and diffed by ID and content afterwards.
+
+        Returns:
+            Dictionary with the number of ``added``, ``updated`` and
+            ``removed`` citations
+        """
+        if not self.data_path.exists():
+            raise FileNotFoundError(f"Data file not found: {self.data_path}")
+
+        with self._lock:
+            if self.source_format == "bibtex":
+                return self._reload_and_diff()
+            source = source_key(self.data_path)
+            positions = self._citation_positions
+            seen: Set[str] = set()
+            duplicate_ids = False
+            added: List[Citation] = []
+            updated: List[Tuple[int, Citation]] = []
+            domains: List[Domain] = []
+
+            with open(self.data_path, "r", encoding="utf-8") as f:
+                for section, item in iter_export_items(f):
+                    if section == "domains":
+                        domains.append(Domain.from_dict(item))
+                        continue
+                    citation_id = item.get("id", "")
+                    if citation_id in seen:
+                        duplicate_ids = True
+                    seen.add(citation_id)
+                    slot = positions.get(citation_id)
+                    current = None if slot is None else self._slots[slot]
+                    if slot is None or current is None:
+                        added.append(Citation.from_dict(item))
+                    else:
+                        changed = self._changed_citation(current, item)
+                        if changed is not None:
+                            updated.append((slot, changed))
+            removed = [slot for citation_id, slot in positions.items() if citation_id not in seen]
+            changes = {"added": len(added), "updated": len(updated), "removed": len(removed)}
+
+            if self.compact or duplicate_ids or self._has_duplicate_ids:
+                self._load_data()
+            else:
+                self._apply_changes(added, updated, removed)
+                self._domains = domains
+                self._build_domain_lookups()
+                self._source = source
+            return changes
+
+    def _reload_and_diff(self) -> Dict[str, int]:
+        """Reload the source in full and count changes against the old data."""
+        before = {c.id: c for c in self._citations}
         self._load_data()
+        after = {c.id: c for c in self._citations}
+        return {
+            "added": sum(1 for citation_id in after if citation_id not in before),
+            "updated": sum(
+                1 for citation_id, citation in after.items()
+                if citation_id in before and before[citation_id] != citation
+            ),
+            "removed": sum(1 for citation_id in before if citation_id not in after),
+        }
+
+    @staticmethod
+    def _changed_citation(current: Citation, data: dict) -> Optional[Citation]:
+        """Return the new version of a citation, or None if it is unchanged."""
+        new_version = (
+            _parse_datetime(data.get("dateModified")) or _parse_datetime(data.get("dateAdded"))
+        )
+        old_version = current.date_modified or current.date_added
+        if new_version is not None or old_version is not None:
+            return None if new_version == old_version else Citation.from_dict(data)
+        citation = Citation.from_dict(data)
+        return None if citation == current else citation
+
+    def _apply_changes(
+        self,
+        added: List[Citation],
+        updated: List[Tuple[int, Citation]],
+        removed: List[int]
+    ) -> None:
+        """Patch slots, index and lookups with the result of a diff."""
+        slots = self._slots
+        # Diffs only refer to slots found in the lookup maps, never to tombstones
+        previous: Dict[int, Citation] = {}
+        for slot in chain((slot for slot, _ in updated), removed):
+            citation = slots[slot]
+            if citation is not None:
+                previous[slot] = citation
+        changed = list(previous.values())
+        changed.extend(citation for _, citation in updated)
+        changed.extend(added)
+        self.query_cache.invalidate(changed)
+        if not (added or updated or removed):
+            return
+        if slots is self._citations or not isinstance(slots, list):
+            # Never expose tombstones through the public citation list
+            slots = list(slots)
+            self._slots = slots
+        indexes = [
+            index
+            for index in (self._index, self._ranking, self._fuzzy, self._authors, self._facets)
+            if index is not None
+        ]
+        self._coauthors = None
+        positions = self._citation_positions
+
+        for slot, citation in updated:
+            for index in indexes:
+                index.remove(slot, previous[slot])
+                index.add(slot, citation)
+            slots[slot] = citation
+        for slot in removed:
+            citation = previous[slot]
+            for index in indexes:
+                index.remove(slot, citation)
+            slots[slot] = None
+            del positions[citation.id]
+        for citation in added:
+            slot = len(slots)
+            slots.append(citation)
+            for index in indexes:
+                index.add(slot, citation)
+            positions[citation.id] = slot
+
+        self._citations = [c for c in slots if c is not None]
+
+        # Rebuild once removed slots make up a large share of the index
+        tombstones = len(slots) - len(self._citations)
+        if tombstones > max(_COMPACTION_MIN_TOMBSTONES, len(slots) // 4):
+            self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Re-index the current citations from scratch, dropping removed slots."""
+        self._slots = self._citations
+        self._index = self._build_search_index() if self.eager_index else None
+        self._ranking = None
+        self._fuzzy = None
+        self._authors = None
+        self._coauthors = None
+        self._facets = None
+        self._generation += 1
+        self._build_lookups()
+
+    def _build_search_index(self, text: bool = True) -> SearchIndex:
+        """Index the current slots for search(), with or without n-gram postings."""
+        return SearchIndex(self._slots, text=text)
+
+    def _build_text_index(self) -> None:
+        """Add the n-gram postings of the current slots to the search index."""
+        self._search_index().index_text(self._slots)
+
+    def _search_index(self, text: bool = False) -> SearchIndex:
+        """
+        Return the search index, built on first use.
+
+        Args:
+            text: Make sure the n-gram postings used to narrow text terms
+                are built too
+        """
+        if self._index is None:
+            self._index = self._build_search_index(text=False)
+        if text and not self._index.has_text:
+            self._build_text_index()
+        return self._index
+
+    def _build_ranking_index(self) -> RankingIndex:
+        """Index the current slots for ranked search()."""
+        return RankingIndex(self._slots)
+
+    def _build_fuzzy_index(self) -> FuzzyIndex:
+        """Index the current slots for fuzzy_search()."""
+        return FuzzyIndex(self._slots)
+
+    def _build_author_index(self) -> AuthorIndex:
+        """Index the current slots by normalized author."""
+        return AuthorIndex(self._slots)
+
+    def _build_facet_index(self) -> FacetIndex:
+        """Record the facet values of the current slots."""
+        return FacetIndex(self._slots)
+
+    def _facet_index(self) -> FacetIndex:
+        """Return the facet index, built on first use."""
+        if self._facets is None:
+            self._facets = self._build_facet_index()
+        return self._facets
+
+    def enable_metrics(self, metrics: Optional[Metrics] = None) -> Metrics:
+        """
+        Start recording operation timings, scan counts and cache hit rates.
+
+        Loading, index builds, searches, statistics, duplicate detection,
+        network lookups, formatting and exports of this library are timed
+        from now on. Until this is called no timing code runs at all.
+
+        Args:
+            metrics: Collector to record into, possibly shared with other
+                libraries (a new one is created by default)
+
+        Returns:
+            The collector, also available as ``library.metrics``
+
+        Example:
+            >>> from citation_tool.instrumentation import logging_sink
+            >>> metrics = library.enable_metrics()
+            >>> metrics.add_sink(logging_sink(min_seconds=0.1))
+            >>> library.search("attention")
+            >>> metrics.snapshot()["operations"]["search"]["count"]
+            1
+        """
+        metrics = metrics or Metrics()
+        with self._lock:
+            instrument(self, metrics, _TIMED_OPERATIONS)
+            metrics.track_cache("query", self.query_cache.cache_info)
+            metrics.track_cache("format", self.formatter.cache_info)
+            self.metrics = metrics
+        return metrics
+
+    def disable_metrics(self) -> None:
+        """Stop recording; already recorded metrics are kept by the collector."""
+        with self._lock:
+            uninstrument(self, _TIMED_OPERATIONS)
+            self.metrics = None
+
+    def watch(
+        self,
+        interval: float = 1.0,
+        on_change: Optional[Callable[[Dict[str, int]], None]] = None
+    ) -> None:
+        """
+        Poll the export file and apply changes automatically.
+
+        A daemon thread checks the file's size and modification time every
+        ``interval`` seconds and calls refresh() when they change. A file
+        that cannot be parsed (for example while it is being written) is
+        retried on the next poll. Any other error from refresh() is logged
+        once per version of the file, and errors from ``on_change`` are
+        logged too; polling continues either way.
+
+        Args:
+            interval: Seconds between polls
+            on_change: Optional callback receiving refresh()'s result
+        """
+        self.stop_watching()
+        self._stop_watching.clear()
+
+        def poll() -> None:
+            # Version of the file whose refresh() failed, not retried until it changes
+            failed = None
+            while not self._stop_watching.wait(interval):
+                key = None
+                try:
+                    key = source_key(self.data_path)
+                    if key == self._source or key == failed:
+                        continue
+                    changes = self.refresh()
+                except (OSError, ValueError):
+                    continue
+                except Exception:
+                    logger.exception("Could not refresh %s", self.data_path)
+                    failed = key
+                    continue
+                if on_change is not None:
+                    try:
+                        on_change(changes)
+                    except Exception:
+                        logger.exception("watch() callback %r failed", on_change)
+
+        self._watcher = threading.Thread(target=poll, name="citation-library-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the polling thread started by watch(), if any."""
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join()
+            self._watcher = None
 
     @property
-    def citations(self) -> List[Citation]:
-        """Get all citations."""
+    def citations(self) -> Sequence[Citation]:
+        """Get all citations (a read-only CitationStore in compact mode)."""
         return self._citations
 
     @property
@@ -77,10 +715,9 @@ class CitationLibrary:
         Returns:
             The Citation if found, None otherwise
         """
-        for citation in self._citations:
-            if citation.id == citation_id:
-                return citation
-        return None
+        with self._lock:
+            position = self._citation_positions.get(citation_id)
+            return self._slots[position] if position is not None else None
 
     def get_domain(self, domain_id: str) -> Optional[Domain]:
         """
@@ -92,10 +729,7 @@ class CitationLibrary:
         Returns:
             The Domain if found, None otherwise
         """
-        for domain in self._domains:
-            if domain.id == domain_id:
-                return domain
-        return None
+        return self._domains_by_id.get(domain_id)
 
     def get_domain_by_name(self, name: str) -> Optional[Domain]:
         """
@@ -107,11 +741,7 @@ class CitationLibrary:
         Returns:
             The Domain if found, None otherwise
         """
-        name_lower = name.lower()
-        for domain in self._domains:
-            if domain.name.lower() == name_lower:
-                return domain
-        return None
+        return self._domains_by_name.get(name.casefold())
 
     def search(
         self,
@@ -121,11 +751,20 @@ class CitationLibrary:
         year_from: Optional[int] = None,
         year_to: Optional[int] = None,
         tags: Optional[List[str]] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        ranked: bool = False
     ) -> List[Citation]:
         """
         Search citations with various filters.
 
+        By default every query term must occur (as a substring) in one of
+        the searched fields and results keep library order. With
+        ``ranked=True`` the query is split into words instead, citations
+        containing any of them are scored with BM25 over title, authors,
+        abstract and tags (see ``ranking.RankingIndex``), and the best
+        matches come first. The ranking index is built on the first ranked
+        search.
+
         Args:
             query: Text to search in title, authors, abstract, notes, tags, DOI
             domain: Domain ID or name to filter by
@@ -134,54 +773,284 @@ class CitationLibrary:
             year_to: Maximum publication year
             tags: List of tags to filter by (all must match)
             limit: Maximum number of results
+            ranked: Order results by relevance to the query
 
         Returns:
             List of matching citations
         """
-        results = list(self._citations)
+        with self._lock:
+            filters = self._resolve_filters(query, domain, citation_type, year_from, year_to, tags)
+            if filters is None:
+                return []
+            words = tokenize(query) if ranked and query else []
+            key = ("search", filters_key(filters), limit or None, frozenset(words))
+            found, results = self.query_cache.get(key)
+            if not found:
+                if words:
+                    hits = self._ranked_search(words, filters, limit)
+                    results = [citation for citation, _ in hits]
+                else:
+                    results = self._scan(filters, -1, limit or None)[1]
+                # Ranked scores depend on every citation
+                self.query_cache.put(key, results, None if words else filters)
+            return list(results)
+
+    def query(
+        self,
+        query: Optional[str] = None,
+        domain: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> CitationQuery:
+        """
+        Create a lazy search with the same filters as search().
+
+        Nothing is searched until the result is used. Matches are produced
+        in library order with every filter applied in one pass, stopping
+        as soon as enough are found, so existence checks and single pages
+        are cheap regardless of library size.
+
+        Args:
+            query: Text to search in title, authors, abstract, notes, tags, DOI
+            domain: Domain ID or name to filter by
+            citation_type: Filter by citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: List of tags to filter by (all must match)
+            limit: Maximum number of results
+
+        Returns:
+            A CitationQuery supporting iteration, count(), exists(),
+            first() and cursor-based page()
 
-        # Text search
-        if query:
-            query_lower = query.lower()
-            terms = query_lower.split()
-            results = [
-                c for c in results
-                if all(self._matches_term(c, term) for term in terms)
-            ]
+        Example:
+            >>> library.query(domain="AI", year_from=2023, year_to=2023).exists()
+            True
+            >>> page = library.query("transformer").page(20)
+        """
+        with self._lock:
+            filters = self._resolve_filters(query, domain, citation_type, year_from, year_to, tags)
+        return CitationQuery(self, filters, limit)
 
-        # Domain filter
+    def _resolve_filters(
+        self,
+        query: Optional[str],
+        domain: Optional[str],
+        citation_type: Optional[CitationType],
+        year_from: Optional[int],
+        year_to: Optional[int],
+        tags: Optional[List[str]]
+    ) -> Optional[QueryFilters]:
+        """Normalize search arguments; returns None if the domain is unknown."""
+        # Resolve the domain (ID first, then name)
+        domain_id = None
         if domain:
-            # Try as ID first, then as name
             domain_obj = self.get_domain(domain) or self.get_domain_by_name(domain)
-            if domain_obj:
-                results = [c for c in results if c.domain_id == domain_obj.id]
-            else:
-                results = []
-
-        # Type filter
-        if citation_type:
-            results = [c for c in results if c.type == citation_type]
+            if not domain_obj:
+                return None
+            domain_id = domain_obj.id
+        return QueryFilters(
+            terms=query.lower().split() if query else [],
+            domain_id=domain_id,
+            citation_type=citation_type or None,
+            year_from=year_from,
+            year_to=year_to,
+            tags=[t.lower() for t in tags] if tags else None
+        )
 
-        # Year range
-        if year_from is not None:
-            results = [c for c in results if c.year and c.year >= year_from]
-        if year_to is not None:
-            results = [c for c in results if c.year and c.year <= year_to]
+    def _scan(
+        self,
+        filters: QueryFilters,
+        after: int,
+        count: Optional[int],
+        build: bool = True
+    ) -> Tuple[List[int], List[Citation]]:
+        """
+        Find matching slot positions after ``after``, in order.
 
-        # Tags filter
-        if tags:
-            tags_lower = [t.lower() for t in tags]
-            results = [
-                c for c in results
-                if all(any(t.lower() == tag for t in c.tags) for tag in tags_lower)
-            ]
+        The facet, year and n-gram postings are walked lazily, the most
+        selective one driving, and only the text terms still need checking
+        on the survivors. Stops once ``count`` matches are found.
 
-        # Limit
-        if limit:
-            results = results[:limit]
+        Returns:
+            The positions and, if ``build`` is set or text terms had to be
+            checked, the citations at those positions (otherwise empty)
+        """
+        if count == 0:
+            return [], []
+        terms = filters.terms
+        index = self._search_index(bool(terms))
+        docs: Optional[Iterable[int]]
+        if count is None:
+            # Every candidate will be read: intersect whole posting lists
+            docs = index.candidates(
+                terms=terms,
+                domain_id=filters.domain_id,
+                citation_type=filters.citation_type,
+                year_from=filters.year_from,
+                year_to=filters.year_to,
+                tags=filters.tags
+            )
+            if docs and after >= 0:
+                docs = docs[bisect_right(docs, after):]
+        else:
+            docs = index.iter_candidates(
+                terms=terms,
+                domain_id=filters.domain_id,
+                citation_type=filters.citation_type,
+                year_from=filters.year_from,
+                year_to=filters.year_to,
+                tags=filters.tags,
+                after=after
+            )
+        slots = self._slots
+        # Removed slots only show up when scanning every position; compact
+        # libraries never have any
+        if docs is None:
+            docs = range(after + 1, len(slots))
+            if not terms and not isinstance(slots, CitationStore):
+                docs = (doc for doc in docs if slots[doc] is not None)
+        if not terms:
+            found = list(islice(docs, count))
+            if self.metrics is not None:
+                self.metrics.record_scan(len(found), len(found))
+            if not build:
+                return found, []
+            # Removed slots were skipped above
+            selected = map(slots.__getitem__, found)
+            return found, [citation for citation in selected if citation is not None]
+        found = []
+        citations = []
+        scanned = 0
+        for doc in docs:
+            scanned += 1
+            citation = slots[doc]
+            if citation is None:
+                continue
+            if not all(self._matches_term(citation, term) for term in terms):
+                continue
+            found.append(doc)
+            citations.append(citation)
+            if count is not None and len(found) >= count:
+                break
+        if self.metrics is not None:
+            self.metrics.record_scan(scanned, len(found))
+        return found, citations
 
+    def _ranked_search(
+        self,
+        words: List[str],
+        filters: QueryFilters,
+        limit: Optional[int]
+    ) -> List[Tuple[Citation, float]]:
+        """Return the best BM25 matches among citations passing the filters, with scores."""
+        allowed = self._search_index().candidates(
+            domain_id=filters.domain_id,
+            citation_type=filters.citation_type,
+            year_from=filters.year_from,
+            year_to=filters.year_to,
+            tags=filters.tags
+        )
+        if allowed is not None and not allowed:
+            return []
+        if self._ranking is None:
+            self._ranking = self._build_ranking_index()
+        hits = self._ranking.top_k(
+            words, limit or None, None if allowed is None else set(allowed)
+        )
+        results = []
+        for doc, score in hits:
+            citation = self._slots[doc]
+            # The ranking index skips removed slots
+            if citation is not None:
+                results.append((citation, score))
         return results
 
+    def fuzzy_search(
+        self,
+        query: str,
+        domain: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = 10,
+        max_distance: Optional[int] = None,
+        max_expansions: int = DEFAULT_MAX_EXPANSIONS
+    ) -> List[FuzzyMatch]:
+        """
+        Search titles, authors and tags, tolerating typos and accents.
+
+        Every query word must match a word of the citation within a small
+        edit distance (insertions, deletions, substitutions and swapped
+        adjacent letters). Words are compared without accents or case, so
+        "muller" finds "Müller". By default words shorter than 3 letters
+        must match exactly, shorter than 6 may have one edit, and longer
+        ones two. Candidate words are looked up in a trigram index built on
+        the first fuzzy search.
+
+        Args:
+            query: Words to look for
+            domain: Domain ID or name to filter by
+            citation_type: Filter by citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: List of tags to filter by (all must match)
+            limit: Maximum number of results (None for every match; the
+                best few are found without scoring every match)
+            max_distance: Edit budget for every query word
+            max_expansions: Closest citation words considered per query word
+
+        Returns:
+            Matches with similarity scores, best first
+
+        Example:
+            >>> match = library.fuzzy_search("kuberentes", limit=1)[0]
+            >>> match.score, match.terms
+            (0.9, {'kuberentes': 'kubernetes'})
+        """
+        with self._lock:
+            filters = self._resolve_filters(None, domain, citation_type, year_from, year_to, tags)
+            words = list(dict.fromkeys(fold_words(query)))
+            if filters is None or not words:
+                return []
+            key = (
+                "fuzzy", filters_key(filters), tuple(words), limit or None,
+                max_distance, max_expansions
+            )
+            found, results = self.query_cache.get(key)
+            if not found:
+                allowed = self._search_index().candidates(
+                    domain_id=filters.domain_id,
+                    citation_type=filters.citation_type,
+                    year_from=filters.year_from,
+                    year_to=filters.year_to,
+                    tags=filters.tags
+                )
+                results = []
+                if allowed is None or allowed:
+                    if self._fuzzy is None:
+                        self._fuzzy = self._build_fuzzy_index()
+                    hits = self._fuzzy.top_k(
+                        words, limit or None, None if allowed is None else set(allowed),
+                        max_distance, max_expansions
+                    )
+                    word = self._fuzzy.word
+                    for doc, score, word_ids in hits:
+                        citation = self._slots[doc]
+                        # The index skips removed slots
+                        if citation is not None:
+                            results.append(FuzzyMatch(
+                                citation, score,
+                                {term: word(word_id) for term, word_id in zip(words, word_ids)}
+                            ))
+                # Matches depend on the vocabulary of every citation
+                self.query_cache.put(key, results)
+            return list(results)
+
     def _matches_term(self, citation: Citation, term: str) -> bool:
         """Check if a citation matches a search term."""
         return (
@@ -229,6 +1098,271 @@ class CitationLibrary:
         """
         return self.search(year_from=year, year_to=year)
 
+    @property
+    def authors(self) -> AuthorIndex:
+        """
+        The author index, built on first use and kept up to date by refresh().
+
+        Name variants such as "Smith, J." and "J. Smith" share one entry
+        (see ``authors.author_key``).
+        """
+        with self._lock:
+            if self._authors is None:
+                self._authors = self._build_author_index()
+            else:
+                self._authors.update_names(self._slots)
+            return self._authors
+
+    def get_by_author(self, author: str) -> List[Citation]:
+        """
+        Get all citations by an author.
+
+        Args:
+            author: Author name in any common form ("Jane Smith", "J. Smith",
+                "Smith, J.")
+
+        Returns:
+            List of citations listing the author, in library order
+        """
+        with self._lock:
+            index = self.authors
+            author_id = index.lookup(author)
+            if author_id is None:
+                return []
+            return [self._slots[doc] for doc in index.docs(author_id)]
+
+    def top_authors(
+        self,
+        limit: Optional[int] = 10,
+        domain: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Find the most prolific authors, optionally among filtered citations.
+
+        Args:
+            limit: Number of authors to return (None for all)
+            domain: Domain ID or name to filter by
+            citation_type: Filter by citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: List of tags to filter by (all must match)
+
+        Returns:
+            ``(author, citation count)`` pairs, most citations first
+
+        Example:
+            >>> library.top_authors(3, domain="AI")
+            [('Jane Smith', 42), ('Wei Zhang', 37), ('Omar Ali', 30)]
+        """
+        with self._lock:
+            filters = self._resolve_filters(None, domain, citation_type, year_from, year_to, tags)
+            if filters is None:
+                return []
+            allowed = self._search_index().candidates(
+                domain_id=filters.domain_id,
+                citation_type=filters.citation_type,
+                year_from=filters.year_from,
+                year_to=filters.year_to,
+                tags=filters.tags
+            )
+            index = self.authors
+            top = index.top(limit, allowed, self._slots)
+            return [(index.name(author_id), count) for author_id, count in top]
+
+    def coauthor_graph(self) -> CoauthorGraph:
+        """
+        Get the co-authorship graph as a sparse adjacency matrix.
+
+        The graph is built on first use and rebuilt after the library
+        changes; a graph already returned stays as it was.
+
+        Returns:
+            CoauthorGraph with degree, component and collaborator queries
+        """
+        with self._lock:
+            if self._coauthors is None:
+                self._coauthors = CoauthorGraph(self.authors, self._slots)
+            return self._coauthors
+
+    def top_collaborators(self, author: str, limit: Optional[int] = 10) -> List[Tuple[str, int]]:
+        """
+        Find an author's most frequent co-authors.
+
+        Args:
+            author: Author name in any common form
+            limit: Number of co-authors to return (None for all)
+
+        Returns:
+            ``(co-author, shared citations)`` pairs, most shared first;
+            empty if the author is unknown
+        """
+        graph = self.coauthor_graph()
+        try:
+            return graph.collaborators(author, limit)
+        except KeyError:
+            return []
+
+    def find_duplicates(
+        self,
+        workers: Optional[int] = None,
+        bands: int = 20,
+        rows: int = 3
+    ) -> List[DuplicateMatch]:
+        """
+        Find likely duplicate pairs across the whole library.
+
+        Uses the web app's rules: same normalized DOI, same normalized
+        title, or a shared author surname and year with a title similarity
+        of at least 0.70, or a title similarity of at least 0.85 alone.
+        Candidates are generated by blocking and MinHash/LSH rather than
+        comparing every pair, so title-only fuzzy matches, and author/year
+        matches among the many citations of a common surname, are found
+        with high (but not guaranteed) recall.
+
+        Args:
+            workers: Worker processes for hashing and verification
+                (None uses every CPU, 1 runs in-process)
+            bands: Number of LSH bands (more bands find more fuzzy matches)
+            rows: MinHash values per band (more rows means fewer candidates)
+
+        Returns:
+            Matches sorted by confidence (highest first); ``citation``
+            precedes ``duplicate`` in library order
+        """
+        reason_order = {reason: i for i, reason in enumerate(DuplicateMatchReason)}
+        pairs = find_duplicate_pairs(self._citations, workers=workers, bands=bands, rows=rows)
+        pairs.sort(key=lambda p: (-p[2], reason_order[p[3]], p[0], p[1]))
+        return [
+            DuplicateMatch(
+                citation=self._citations[i],
+                duplicate=self._citations[j],
+                confidence=confidence,
+                reason=reason
+            )
+            for i, j, confidence, reason in pairs
+        ]
+
+    def check_urls(
+        self,
+        citations: Optional[Iterable[Citation]] = None,
+        cache_path: Optional[Union[str, Path]] = None,
+        **options
+    ) -> Dict[str, UrlHealthStatus]:
+        """
+        Check that citation URLs are reachable.
+
+        Each distinct URL is requested once (HEAD, falling back to GET) over
+        pooled keep-alive connections, with a global concurrency cap and a
+        per-host limit. Citations without a URL are skipped. Must not be
+        called from a running event loop; use check_urls_async() there.
+
+        Args:
+            citations: Citations to check (defaults to all)
+            cache_path: SQLite file caching results between runs, so only
+                URLs whose cached result expired are requested again
+            **options: Tuning options of ``urlhealth.check_urls_async()``
+                (concurrency, per_host, timeout, retries, ttl, progress, ...)
+
+        Returns:
+            Dictionary of citation ID to UrlHealthStatus
+
+        Example:
+            >>> results = library.check_urls(cache_path="url-health.sqlite")
+            >>> broken = [cid for cid, status in results.items() if not status.is_healthy]
+        """
+        return asyncio.run(self.check_urls_async(citations, cache_path, **options))
+
+    async def check_urls_async(
+        self,
+        citations: Optional[Iterable[Citation]] = None,
+        cache_path: Optional[Union[str, Path]] = None,
+        **options
+    ) -> Dict[str, UrlHealthStatus]:
+        """Coroutine version of check_urls()."""
+        citations = self._citations if citations is None else citations
+        with_urls = [(c.id, c.url) for c in citations if c.url]
+        statuses = await urlhealth.check_urls_async(
+            (url for _, url in with_urls), cache_path=cache_path, **options
+        )
+        return {citation_id: statuses[url] for citation_id, url in with_urls}
+
+    def enrich_from_doi(
+        self,
+        citations: Optional[Iterable[Citation]] = None,
+        overwrite: bool = False,
+        cache_path: Optional[Union[str, Path]] = None,
+        **options
+    ) -> Dict[str, DoiLookupResult]:
+        """
+        Fill in citation metadata from CrossRef using each citation's DOI.
+
+        Distinct DOIs are looked up once, concurrently, and successful
+        lookups are merged into the library's citations (search index
+        included). Citations without a DOI are skipped. Must not be called
+        from a running event loop; use enrich_from_doi_async() there.
+
+        Args:
+            citations: Citations to enrich (defaults to all)
+            overwrite: Replace existing field values and the citation type
+                instead of only filling empty fields
+            cache_path: SQLite file caching CrossRef responses between runs
+            **options: Tuning options of ``doi.resolve_dois_async()``
+                (concurrency, timeout, retries, ttl, mailto, progress, ...)
+
+        Returns:
+            Dictionary of citation ID to DoiLookupResult
+
+        Example:
+            >>> results = library.enrich_from_doi(cache_path="crossref.sqlite")
+            >>> failed = [cid for cid, result in results.items() if not result.success]
+        """
+        return asyncio.run(self.enrich_from_doi_async(citations, overwrite, cache_path, **options))
+
+    async def enrich_from_doi_async(
+        self,
+        citations: Optional[Iterable[Citation]] = None,
+        overwrite: bool = False,
+        cache_path: Optional[Union[str, Path]] = None,
+        **options
+    ) -> Dict[str, DoiLookupResult]:
+        """Coroutine version of enrich_from_doi()."""
+        citations = self._citations if citations is None else citations
+        with_dois = [(c.id, c.doi) for c in citations if c.doi]
+        lookups = await doi.resolve_dois_async(
+            (value for _, value in with_dois), cache_path=cache_path, **options
+        )
+        results = {citation_id: lookups[value] for citation_id, value in with_dois}
+
+        with self._lock:
+            updated: List[Tuple[int, Citation]] = []
+            for citation_id, result in results.items():
+                slot = self._citation_positions.get(citation_id)
+                if not result.success or slot is None:
+                    continue
+                current = self._slots[slot]
+                if current is None or result.citation is None:
+                    continue
+                merged = doi.merge_metadata(current, result.citation, overwrite)
+                if merged is not current:
+                    updated.append((slot, merged))
+            if isinstance(self._slots, CitationStore):
+                if updated:
+                    records = list(self._slots)
+                    changed = [records[slot] for slot, _ in updated]
+                    for slot, citation in updated:
+                        records[slot] = citation
+                    changed.extend(citation for _, citation in updated)
+                    self._citations = CitationStore(records)
+                    self._rebuild_index()
+                    self.query_cache.invalidate(changed)
+            else:
+                self._apply_changes([], updated, [])
+        return results
+
     def get_tags(self) -> List[str]:
         """
         Get all unique tags sorted alphabetically.
@@ -236,41 +1370,125 @@ class CitationLibrary:
         Returns:
             List of unique tag names
         """
-        tags = set()
-        for citation in self._citations:
-            tags.update(citation.tags)
-        return sorted(tags)
+        with self._lock:
+            return self._facet_index().totals.tags()
 
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about the citation library.
 
+        Counts come from the whole-library facet counts, which are built
+        once and kept up to date by refresh().
+
         Returns:
             Dictionary with various statistics
         """
-        years = [c.year for c in self._citations if c.year]
-        type_counts = Counter(c.type.value for c in self._citations)
-        domain_counts = Counter(c.domain_id for c in self._citations if c.domain_id)
-
-        return {
-            "total_citations": len(self._citations),
-            "total_domains": len(self._domains),
-            "total_tags": len(self.get_tags()),
-            "year_range": {
-                "min": min(years) if years else None,
-                "max": max(years) if years else None
-            },
-            "by_type": dict(type_counts),
-            "by_domain": {
-                self.get_domain(did).name if self.get_domain(did) else did: count
-                for did, count in domain_counts.items()
+        with self._lock:
+            counts = self._facet_index().totals
+            return {
+                "total_citations": counts.total,
+                "total_domains": len(self._domains),
+                "total_tags": counts.tag_count,
+                "year_range": counts.year_range,
+                "by_type": counts.by_type(),
+                "by_domain": counts.by_domain(self._domain_label)
             }
-        }
 
-    def to_dataframe(self):
+    def clear_facets(self) -> None:
+        """
+        Drop the cached facet counts.
+
+        The next get_statistics(), get_tags() or facets() call rebuilds
+        them from the citations.
+        """
+        with self._lock:
+            self._facets = None
+
+    def facets(
+        self,
+        source: Union[None, CitationQuery, Iterable[Citation]] = None,
+        tag_limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Count citations per type, domain, year and tag.
+
+        A CitationQuery is counted from the slot positions it matches,
+        using facet values kept per slot, so no result list is built. The
+        positions of facet-only filters come straight from the index
+        postings; text queries still read each candidate to check its
+        terms. The counts are cached like search() results. Any other
+        citations, such as a search() result, are counted as given.
+        Without a source the whole-library counts kept up to date by
+        refresh() are returned.
+
+        Args:
+            source: Query from query(), citations to count, or None for
+                the whole library
+            tag_limit: Maximum number of tags to return (None for all)
+
+        Returns:
+            Dictionary with ``total`` and ``by_type``, ``by_domain`` (by
+            domain name) and ``by_tag`` counts, most common first, plus
+            ``by_year`` counts, oldest year first
+
+        Raises:
+            ValueError: If the query belongs to another library
+
+        Example:
+            >>> q = library.query("transformer", year_from=2020)
+            >>> page = q.page(20)
+            >>> library.facets(q, tag_limit=10)["by_type"]
+            {'Article': 31, 'InProceedings': 12}
+        """
+        with self._lock:
+            if source is None:
+                counts = self._facet_index().totals
+            elif isinstance(source, CitationQuery):
+                counts = self._query_facets(source)
+            else:
+                counts = FacetCounts(source)
+            return counts.to_dict(self._domain_label, tag_limit)
+
+    def _query_facets(self, query: CitationQuery) -> FacetCounts:
+        """Count the citations a query matches, reusing cached counts."""
+        if query._library is not self:
+            raise ValueError("query belongs to another library")
+        filters, limit = query._filters, query._limit
+        if filters is None:
+            return FacetCounts()
+        index = self._facet_index()
+        if limit is None and not filters.terms and all(value is None for value in filters[1:]):
+            return index.totals
+        key = ("facets", filters_key(filters), limit)
+        found, cached = self.query_cache.get(key)
+        if found:
+            counts: FacetCounts = cached
+        else:
+            counts = index.count(self._scan(filters, -1, limit, build=False)[0])
+            self.query_cache.put(key, counts, filters)
+        return counts
+
+    def _domain_label(self, domain_id: str) -> str:
+        """Return a domain's name, falling back to its ID if unknown."""
+        domain = self._domains_by_id.get(domain_id)
+        return domain.name if domain else domain_id
+
+    def _domain_names(self) -> Dict[str, str]:
+        """Return the domain ID to name map used by the tabular exports."""
+        return {domain_id: domain.name for domain_id, domain in self._domains_by_id.items()}
+
+    def to_dataframe(self, lists: bool = False):
         """
         Convert citations to a pandas DataFrame.
 
+        Columns are built in a single pass over the citations. ``type``,
+        ``type_display``, ``domain_id`` and ``domain_name`` are categorical
+        and ``year`` is a nullable ``Int64`` column.
+
+        Args:
+            lists: Keep ``authors`` and ``tags`` as list columns instead of
+                ``"; "``-joined strings
+
         Returns:
             pandas.DataFrame with citation data
 
@@ -278,52 +1496,154 @@ class CitationLibrary:
             ImportError: If pandas is not installed
         """
         try:
-            import pandas as pd
+            import pandas  # noqa: F401
         except ImportError:
             raise ImportError("pandas is required for to_dataframe(). Install with: pip install pandas")
 
-        data = []
-        for c in self._citations:
-            domain = self.get_domain(c.domain_id) if c.domain_id else None
-            data.append({
-                "id": c.id,
-                "title": c.title,
-                "authors": "; ".join(c.authors),
-                "author_count": len(c.authors),
-                "type": c.type.value,
-                "type_display": c.type.display_name,
-                "year": c.year,
-                "journal_or_conference": c.journal_or_conference,
-                "volume": c.volume,
-                "issue": c.issue,
-                "pages": c.pages,
-                "doi": c.doi,
-                "url": c.url,
-                "domain_id": c.domain_id,
-                "domain_name": domain.name if domain else None,
-                "tags": "; ".join(c.tags),
-                "tag_count": len(c.tags),
-                "has_abstract": c.abstract is not None and len(c.abstract) > 0,
-                "abstract_length": len(c.abstract) if c.abstract else 0,
-                "date_added": c.date_added,
-            })
-
-        return pd.DataFrame(data)
-
-    def export_bibtex(self, citations: Optional[List[Citation]] = None) -> str:
+        columns = columnar.build_columns(self._citations, self._domain_names())
+        return columnar.to_pandas(columns, lists=lists)
+
+    def to_exploded_dataframe(self, field: str = "authors"):
+        """
+        Convert authors or tags to a long DataFrame with one row per value.
+
+        The result joins back to to_dataframe() on ``citation_id`` and is
+        the efficient way to count or group by individual authors or tags.
+
+        Args:
+            field: ``"authors"`` or ``"tags"``
+
+        Returns:
+            pandas.DataFrame with ``citation_id``, ``position`` and
+            ``author`` (or ``tag``) columns
+
+        Raises:
+            ImportError: If pandas is not installed
+            ValueError: If field is not ``"authors"`` or ``"tags"``
+        """
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "pandas is required for to_exploded_dataframe(). Install with: pip install pandas"
+            )
+
+        columns = columnar.build_columns(self._citations, self._domain_names())
+        return columnar.to_exploded_pandas(columns, field)
+
+    def iter_arrow_batches(self, batch_size: int = columnar.DEFAULT_BATCH_SIZE) -> Iterator[Any]:
+        """
+        Convert citations to Apache Arrow record batches.
+
+        Uses the same columns as to_dataframe(), with ``authors`` and
+        ``tags`` as list columns and categorical columns dictionary-encoded.
+
+        Args:
+            batch_size: Maximum number of citations per batch
+
+        Yields:
+            pyarrow.RecordBatch objects
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "pyarrow is required for Arrow export. Install with: pip install pyarrow"
+            )
+
+        return columnar.iter_arrow_batches(self._citations, self._domain_names(), batch_size)
+
+    def to_arrow(self, batch_size: int = columnar.DEFAULT_BATCH_SIZE):
+        """
+        Convert citations to an Apache Arrow table.
+
+        Args:
+            batch_size: Number of citations converted per record batch
+
+        Returns:
+            pyarrow.Table
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        batches = self.iter_arrow_batches(batch_size)
+        import pyarrow as pa
+
+        return pa.Table.from_batches(list(batches), schema=columnar.arrow_schema())
+
+    def to_parquet(
+        self,
+        path: Union[str, Path],
+        batch_size: int = columnar.DEFAULT_BATCH_SIZE,
+        compression: str = "snappy"
+    ) -> None:
+        """
+        Write citations to a Parquet file.
+
+        Record batches are written as they are produced, so memory use is
+        bounded by ``batch_size`` rather than by the library size.
+
+        Args:
+            path: Destination file
+            batch_size: Number of citations per record batch (row group)
+            compression: Parquet compression codec
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        batches = self.iter_arrow_batches(batch_size)
+        import pyarrow.parquet as pq
+
+        schema = columnar.arrow_schema()
+        with pq.ParquetWriter(str(path), schema, compression=compression) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    def export_bibtex(self, citations: Optional[Sequence[Citation]] = None) -> str:
         """
         Export citations to BibTeX format.
 
+        Entry keys are made unique across the export by appending a letter
+        (``smith2020deep``, ``smith2020deepa``, ...).
+
         Args:
             citations: List of citations to export (defaults to all)
 
         Returns:
             BibTeX formatted string
         """
-        citations = citations or self._citations
-        return "\n\n".join(c.format_bibtex() for c in citations)
+        citations = self._citations if citations is None else citations
+        return "\n\n".join(self.formatter.format_many(citations, "bibtex"))
+
+    def format_many(
+        self,
+        citations: Optional[Iterable[Citation]] = None,
+        style: str = "apa"
+    ) -> List[str]:
+        """
+        Format many citations at once, reusing cached results.
 
-    def export_json(self, citations: Optional[List[Citation]] = None, indent: int = 2) -> str:
+        Results are cached per citation and style and reformatted only when
+        the citation's fields change. BibTeX keys are unique across the batch.
+
+        Args:
+            citations: Citations to format (defaults to all)
+            style: "ieee", "apa" or "bibtex"
+
+        Returns:
+            Formatted citations, in order
+        """
+        citations = self._citations if citations is None else citations
+        return self.formatter.format_many(citations, style)
+
+    def export_json(
+        self,
+        citations: Optional[Sequence[Citation]] = None,
+        indent: int = 2
+    ) -> str:
         """
         Export citations to JSON format.
 
@@ -334,5 +1654,55 @@ class CitationLibrary:
         Returns:
             JSON formatted string
         """
-        citations = citations or self._citations
+        citations = self._citations if citations is None else citations
         return json.dumps([c.to_dict() for c in citations], indent=indent)
+
+    def write_bibtex(
+        self,
+        dest: Union[str, Path, IO[str]],
+        citations: Optional[Iterable[Citation]] = None,
+        workers: int = 1,
+        chunk_size: int = writers.DEFAULT_CHUNK_SIZE,
+        compress: Optional[bool] = None
+    ) -> None:
+        """
+        Write citations in BibTeX format to a file or stream.
+
+        Produces the same text as export_bibtex() without building it in
+        memory: citations are formatted and written in chunks.
+
+        Args:
+            dest: Output path or text stream
+            citations: Citations to write (defaults to all)
+            workers: Worker processes used for formatting, in order
+            chunk_size: Citations formatted per chunk
+            compress: gzip the output; None compresses paths ending in ``.gz``
+        """
+        citations = self._citations if citations is None else citations
+        writers.write_bibtex(citations, dest, workers, chunk_size, compress)
+
+    def write_json(
+        self,
+        dest: Union[str, Path, IO[str]],
+        citations: Optional[Iterable[Citation]] = None,
+        indent: Optional[int] = 2,
+        workers: int = 1,
+        chunk_size: int = writers.DEFAULT_CHUNK_SIZE,
+        compress: Optional[bool] = None
+    ) -> None:
+        """
+        Write citations in JSON format to a file or stream.
+
+        Produces the same text as export_json() without building it in
+        memory: citations are formatted and written in chunks.
+
+        Args:
+            dest: Output path or text stream
+            citations: Citations to write (defaults to all)
+            indent: JSON indentation level
+            workers: Worker processes used for formatting, in order
+            chunk_size: Citations formatted per chunk
+            compress: gzip the output; None compresses paths ending in ``.gz``
+        """
+        citations = self._citations if citations is None else citations
+        writers.write_json(citations, dest, indent, workers, chunk_size, compress)
@@ -0,0 +1,828 @@
+"""
+Model Context Protocol server: ``python -m citation_tool.mcp [export.json]``.
+
+Speaks JSON-RPC 2.0 over stdio, one message per line, with the same tools,
+resources and prompts as the C# ``CitationTool.McpServer``. The export is
+loaded once into a CitationLibrary whose indexes answer every tool call; a
+watcher applies changes to the file as they happen instead of re-reading
+it on a timer. Requests are handled by a thread pool, so a slow call does
+not hold up the ones pipelined behind it; responses are written as they
+complete and matched to requests by ``id``.
+
+The export path defaults to ``CITATION_DATA_PATH`` or
+``~/.citation-tool/citations.json``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Hashable, List, Optional, Union
+
+from .library import CitationLibrary
+from .models import Citation, CitationType, Domain
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = "2024-11-05"
+SERVER_INFO = {"name": "citation-tool", "version": "1.0.0"}
+
+DEFAULT_WORKERS = 4
+DEFAULT_POLL_INTERVAL = 1.0
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_EMPTY_SCHEMA = {"type": "object", "properties": {}}
+
+TOOLS: List[Dict[str, Any]] = [
+    {
+        "name": "search_citations",
+        "description": (
+            "Search citations by query, domain, type, year range, or tags. "
+            "Returns matching citations with full details."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": (
+                        "Search text to match against title, authors, abstract, notes, tags, "
+                        "and DOI"
+                    ),
+                },
+                "domain_id": {
+                    "type": "string",
+                    "description": "Filter by domain ID or domain name",
+                },
+                "type": {
+                    "type": "string",
+                    "description": "Filter by citation type (Article, Book, InProceedings, etc.)",
+                },
+                "year_from": {"type": "integer", "description": "Minimum publication year"},
+                "year_to": {"type": "integer", "description": "Maximum publication year"},
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Filter by tags (all must match)",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum results to return (default: 50)",
+                },
+            },
+        },
+    },
+    {
+        "name": "get_citation",
+        "description": (
+            "Get a single citation by its ID with full details including formatted citations "
+            "in multiple styles."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {"id": {"type": "string", "description": "The citation ID (GUID)"}},
+            "required": ["id"],
+        },
+    },
+    {
+        "name": "list_citations",
+        "description": (
+            "List all citations, optionally filtered. Returns a summary of each citation."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum results to return (default: 100)",
+                },
+            },
+        },
+    },
+    {
+        "name": "list_domains",
+        "description": "List all available domains/categories for citations.",
+        "inputSchema": _EMPTY_SCHEMA,
+    },
+    {
+        "name": "get_citations_by_domain",
+        "description": "Get all citations in a specific domain.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"domain": {"type": "string", "description": "Domain ID or name"}},
+            "required": ["domain"],
+        },
+    },
+    {
+        "name": "format_citation",
+        "description": "Format a citation in a specific style (IEEE, APA, BibTeX).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string", "description": "The citation ID (GUID)"},
+                "style": {
+                    "type": "string",
+                    "description": "Citation style: ieee, apa, or bibtex",
+                    "enum": ["ieee", "apa", "bibtex"],
+                },
+            },
+            "required": ["id", "style"],
+        },
+    },
+    {
+        "name": "get_statistics",
+        "description": "Get statistics about the citation database.",
+        "inputSchema": _EMPTY_SCHEMA,
+    },
+    {
+        "name": "list_tags",
+        "description": "List all unique tags used across citations.",
+        "inputSchema": _EMPTY_SCHEMA,
+    },
+]
+
+RESOURCES: List[Dict[str, Any]] = [
+    {
+        "uri": "citations://all",
+        "name": "All Citations",
+        "description": "Complete list of all citations in JSON format",
+        "mimeType": "application/json",
+    },
+    {
+        "uri": "citations://domains",
+        "name": "All Domains",
+        "description": "List of all domains/categories",
+        "mimeType": "application/json",
+    },
+    {
+        "uri": "citations://statistics",
+        "name": "Statistics",
+        "description": "Database statistics",
+        "mimeType": "application/json",
+    },
+]
+
+PROMPTS: List[Dict[str, Any]] = [
+    {
+        "name": "find_relevant_citations",
+        "description": "Find citations relevant to a research topic or question",
+        "arguments": [
+            {"name": "topic", "description": "The research topic or question", "required": True},
+        ],
+    },
+    {
+        "name": "summarize_domain",
+        "description": "Summarize all citations in a specific domain",
+        "arguments": [{"name": "domain", "description": "The domain name", "required": True}],
+    },
+    {
+        "name": "create_bibliography",
+        "description": "Create a formatted bibliography for selected citations",
+        "arguments": [
+            {"name": "query", "description": "Search query to select citations", "required": True},
+            {
+                "name": "style",
+                "description": "Citation style (ieee, apa, bibtex)",
+                "required": False,
+            },
+        ],
+    },
+]
+
+# Citation type names accepted by search_citations (case-insensitive)
+_TYPES_BY_NAME = {t.value.lower(): t for t in CitationType}
+
+
+class RpcError(Exception):
+    """A JSON-RPC error to send back instead of a result."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class ToolError(Exception):
+    """A tool failure reported to the client as an ``isError`` result."""
+
+
+def default_data_path() -> Path:
+    """Return ``CITATION_DATA_PATH`` or ``~/.citation-tool/citations.json``."""
+    path = os.environ.get("CITATION_DATA_PATH")
+    return Path(path) if path else Path.home() / ".citation-tool" / "citations.json"
+
+
+def _text(text: str) -> Dict[str, Any]:
+    """Return a tool result with one text block."""
+    return {"content": [{"type": "text", "text": text}], "isError": False}
+
+
+def _tool_error(message: str) -> Dict[str, Any]:
+    """Return a failed tool result."""
+    return {"content": [{"type": "text", "text": f"Error: {message}"}], "isError": True}
+
+
+def _string_arg(args: Dict[str, Any], name: str) -> Optional[str]:
+    value = args.get(name)
+    return value if isinstance(value, str) else None
+
+
+def _int_arg(args: Dict[str, Any], name: str) -> Optional[int]:
+    value = args.get(name)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value)
+
+
+def _string_list_arg(args: Dict[str, Any], name: str) -> Optional[List[str]]:
+    value = args.get(name)
+    if not isinstance(value, list):
+        return None
+    return [item for item in value if isinstance(item, str)]
+
+
+def _domain_dict(domain: Domain) -> Dict[str, Any]:
+    """Serialize a domain the way the export (and the C# server) does."""
+    return {
+        "id": domain.id,
+        "name": domain.name,
+        "description": domain.description,
+        "color": domain.color,
+        "dateCreated": domain.date_created.isoformat() if domain.date_created else None,
+    }
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class McpServer:
+    """
+    MCP server over a CitationLibrary that stays loaded between calls.
+
+    The export is loaded in the background when the server starts, so
+    ``initialize`` is answered at once; tool calls wait for the load. If the
+    export does not exist yet it is opened on the first call after it
+    appears.
+
+    Example:
+        >>> server = McpServer("citations.json")
+        >>> response = server.handle({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+        >>> response["result"]["tools"][0]["name"]
+        'search_citations'
+    """
+
+    def __init__(
+        self,
+        data_path: Union[str, Path],
+        cache: bool = False,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        workers: int = DEFAULT_WORKERS
+    ):
+        """
+        Args:
+            data_path: Path to the JSON export file from Citation Tool
+            cache: Keep a binary snapshot next to the export so restarts
+                skip parsing it (see CitationLibrary)
+            poll_interval: Seconds between checks of the export for changes
+            workers: Requests handled at the same time by serve()
+        """
+        self.data_path = Path(data_path)
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.workers = workers
+        self._library: Optional[CitationLibrary] = None
+        self._loader: Optional[threading.Thread] = None
+        self._open_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._write_lock = threading.Lock()
+        self._methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self._initialize,
+            "initialized": lambda params: {},
+            "ping": lambda params: {},
+            "tools/list": lambda params: {"tools": TOOLS},
+            "tools/call": self._call_tool,
+            "resources/list": lambda params: {"resources": RESOURCES},
+            "resources/read": self._read_resource,
+            "prompts/list": lambda params: {"prompts": PROMPTS},
+            "prompts/get": self._get_prompt,
+        }
+        self._tools: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "search_citations": self._search_citations,
+            "get_citation": self._get_citation,
+            "list_citations": self._list_citations,
+            "list_domains": self._list_domains,
+            "get_citations_by_domain": self._get_citations_by_domain,
+            "format_citation": self._format_citation,
+            "get_statistics": self._get_statistics,
+            "list_tags": self._list_tags,
+        }
+
+    def start(self) -> None:
+        """Load the export in a background thread."""
+        if self._loader is None:
+            self._loader = threading.Thread(
+                target=self._load, name="citation-mcp-load", daemon=True
+            )
+            self._loader.start()
+
+    def _load(self) -> None:
+        try:
+            self._open()
+        except Exception:
+            logger.exception("Error loading data")
+        finally:
+            self._loaded.set()
+
+    def _open(self) -> Optional[CitationLibrary]:
+        """Open the export and start watching it, if it exists."""
+        with self._open_lock:
+            if self._library is None and self.data_path.exists():
+                library = CitationLibrary(self.data_path, cache=self.cache)
+                # Warm the caches answering the summary tools
+                library.get_statistics()
+                library.watch(self.poll_interval, self._log_changes)
+                logger.info(
+                    "Loaded %d citations and %d domains", len(library), len(library.domains)
+                )
+                self._library = library
+            return self._library
+
+    @staticmethod
+    def _log_changes(changes: Dict[str, int]) -> None:
+        logger.info("Export changed: %s", changes)
+
+    @property
+    def library(self) -> CitationLibrary:
+        """
+        The loaded library.
+
+        Raises:
+            ToolError: If the export does not exist
+        """
+        if self._loader is not None:
+            self._loaded.wait()
+        library = self._library or self._open()
+        if library is None:
+            raise ToolError(
+                f"Data file not found: {self.data_path}. "
+                "Export your citations from the web app first."
+            )
+        return library
+
+    def close(self) -> None:
+        """Stop watching the export."""
+        if self._library is not None:
+            self._library.stop_watching()
+
+    def serve(self, stdin: Optional[IO[str]] = None, stdout: Optional[IO[str]] = None) -> None:
+        """
+        Answer requests read from ``stdin`` until it is closed.
+
+        Args:
+            stdin: Stream of newline-delimited JSON-RPC messages (default: sys.stdin)
+            stdout: Stream responses are written to (default: sys.stdout)
+        """
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        self.start()
+        logger.info("Server starting...")
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="citation-mcp")
+        with pool:
+            for line in iter(stdin.readline, ""):
+                if line.strip():
+                    pool.submit(self._answer, line, stdout)
+        logger.info("Server shutting down...")
+
+    def _answer(self, line: str, stdout: IO[str]) -> None:
+        """Handle one line and write its response, if any."""
+        try:
+            response = self.handle_line(line)
+        except Exception:
+            logger.exception("Error processing request")
+            return
+        if response is not None:
+            with self._write_lock:
+                stdout.write(response + "\n")
+                stdout.flush()
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """
+        Handle one serialized message or batch.
+
+        Returns:
+            The serialized response, or None for notifications
+        """
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            logger.error("Error processing request: %s", e)
+            return _dumps(self._error(None, PARSE_ERROR, "Parse error", str(e)))
+
+        if isinstance(message, list):
+            if not message:
+                return _dumps(self._error(None, INVALID_REQUEST, "Invalid Request"))
+            responses = [response for response in map(self.handle, message) if response]
+            return _dumps(responses) if responses else None
+        response = self.handle(message)
+        return _dumps(response) if response is not None else None
+
+    def handle(self, message: Any) -> Optional[Dict[str, Any]]:
+        """
+        Handle one decoded JSON-RPC message.
+
+        Returns:
+            The response, or None for notifications
+        """
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return self._error(None, INVALID_REQUEST, "Invalid Request")
+        method = message["method"]
+        request_id = message.get("id")
+        notification = "id" not in message
+        logger.debug("Received: %s", method)
+
+        handler = self._methods.get(method)
+        try:
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+            params = message.get("params")
+            if params is not None and not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "Invalid params")
+            result = handler(params or {})
+        except RpcError as e:
+            return None if notification else self._error(request_id, e.code, e.message)
+        except Exception as e:
+            logger.exception("Error handling %s", method)
+            return None if notification else self._error(request_id, INTERNAL_ERROR, str(e))
+        return None if notification else {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def _error(
+        request_id: Any,
+        code: int,
+        message: str,
+        data: Optional[str] = None
+    ) -> Dict[str, Any]:
+        error: Dict[str, Any] = {"code": code, "message": message}
+        if data is not None:
+            error["data"] = data
+        return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+    def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "protocolVersion": PROTOCOL_VERSION,
+            "serverInfo": SERVER_INFO,
+            "capabilities": {
+                "tools": {"listChanged": False},
+                "resources": {"subscribe": False, "listChanged": False},
+                "prompts": {"listChanged": False},
+            },
+        }
+
+    def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcError(INVALID_PARAMS, "Missing params")
+        name = params.get("name")
+        args = params.get("arguments")
+        tool = self._tools.get(name) if isinstance(name, str) else None
+        if tool is None:
+            return _tool_error(f"Unknown tool: {name}")
+        try:
+            return tool(args if isinstance(args, dict) else {})
+        except ToolError as e:
+            return _tool_error(str(e))
+        except Exception as e:
+            logger.exception("Tool error")
+            return _tool_error(str(e))
+
+    def _cached(self, key: Hashable, compute: Callable[[CitationLibrary], Any]) -> Any:
+        """Return a result kept in the library's query cache until the data changes."""
+        library = self.library
+        with library._lock:
+            key = ("mcp", key)
+            found, value = library.query_cache.get(key)
+            if not found:
+                value = compute(library)
+                library.query_cache.put(key, value)
+            return value
+
+    # Tools
+
+    def _summary(self, library: CitationLibrary, citation: Citation) -> str:
+        domain = library.get_domain(citation.domain_id) if citation.domain_id else None
+        domain_str = f" [{domain.name}]" if domain else ""
+        year_str = f" ({citation.year})" if citation.year else ""
+        return (
+            f"**{citation.title}**{year_str}{domain_str}\n"
+            f"  Authors: {citation.authors_display}\n"
+            f"  Type: {citation.type.display_name}\n"
+            f"  ID: {citation.id}"
+        )
+
+    def _search(
+        self,
+        library: CitationLibrary,
+        query: Optional[str] = None,
+        domain: Optional[str] = None,
+        citation_type: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Citation]:
+        return library.search(
+            query=query,
+            domain=domain,
+            citation_type=_TYPES_BY_NAME.get(citation_type.lower()) if citation_type else None,
+            year_from=year_from,
+            year_to=year_to,
+            tags=tags,
+            limit=limit
+        )
+
+    def _search_citations(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        library = self.library
+        limit = _int_arg(args, "limit")
+        limit = 50 if limit is None else limit
+        results: List[Citation] = []
+        if limit > 0:
+            results = self._search(
+                library,
+                query=_string_arg(args, "query"),
+                domain=_string_arg(args, "domain_id"),
+                citation_type=_string_arg(args, "type"),
+                year_from=_int_arg(args, "year_from"),
+                year_to=_int_arg(args, "year_to"),
+                tags=_string_list_arg(args, "tags"),
+                limit=limit
+            )
+        output = "\n\n".join(self._summary(library, c) for c in results)
+        return _text(f"Found {len(results)} citations:\n\n{output}")
+
+    def _find(self, args: Dict[str, Any]) -> Citation:
+        citation_id = _string_arg(args, "id")
+        if not citation_id:
+            raise ToolError("Missing required parameter: id")
+        citation = self.library.get_citation(citation_id)
+        if citation is None:
+            raise ToolError(f"Citation not found: {citation_id}")
+        return citation
+
+    def _get_citation(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        citation = self._find(args)
+        library = self.library
+        format_ = library.formatter.format
+        domain = library.get_domain(citation.domain_id) if citation.domain_id else None
+        venue = citation.journal_or_conference
+        details = [
+            f"# {citation.title}",
+            "",
+            f"**Authors:** {citation.authors_display}",
+            f"**Type:** {citation.type.display_name}",
+            f"**Year:** {citation.year}" if citation.year else None,
+            f"**Domain:** {domain.name}" if domain else None,
+            f"**Venue:** {venue}" if venue else None,
+            f"**DOI:** {citation.doi}" if citation.doi else None,
+            f"**URL:** {citation.url}" if citation.url else None,
+            f"**Tags:** {', '.join(citation.tags)}" if citation.tags else None,
+            "",
+            f"**Abstract:**\n{citation.abstract}" if citation.abstract else None,
+            f"\n**Notes:**\n{citation.notes}" if citation.notes else None,
+            "",
+            "## Formatted Citations",
+            f"**IEEE:** {format_(citation, 'ieee')}",
+            f"**APA:** {format_(citation, 'apa')}",
+            "",
+            f"**BibTeX:**\n```bibtex\n{format_(citation, 'bibtex')}\n```",
+        ]
+        return _text("\n".join(line for line in details if line is not None))
+
+    def _list_citations(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        library = self.library
+        limit = _int_arg(args, "limit")
+        citations = library.citations
+        shown = islice(citations, max(0, 100 if limit is None else limit))
+        output = "\n\n".join(self._summary(library, c) for c in shown)
+        return _text(f"Total citations: {len(citations)}\n\n{output}")
+
+    def _list_domains(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        def compute(library: CitationLibrary) -> str:
+            output = "\n\n".join(
+                f"- **{d.name}** ({library.query(domain=d.id).count()} citations)\n"
+                f"  ID: {d.id}\n"
+                f"  {d.description or 'No description'}"
+                for d in library.domains
+            )
+            return f"Available domains ({len(library.domains)}):\n\n{output}"
+
+        return _text(self._cached("list_domains", compute))
+
+    def _domain_citations(self, library: CitationLibrary, domain: str) -> List[Citation]:
+        if not (library.get_domain(domain) or library.get_domain_by_name(domain)):
+            return []
+        return library.search(domain=domain)
+
+    def _get_citations_by_domain(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        domain = _string_arg(args, "domain")
+        if not domain:
+            raise ToolError("Missing required parameter: domain")
+        library = self.library
+        citations = self._domain_citations(library, domain)
+        if not citations:
+            return _text(f"No citations found for domain: {domain}")
+        output = "\n\n".join(self._summary(library, c) for c in citations)
+        return _text(f"Found {len(citations)} citations in domain '{domain}':\n\n{output}")
+
+    def _format_citation(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        style = (_string_arg(args, "style") or "ieee").lower()
+        citation = self._find(args)
+        formatted = self.library.formatter.format(
+            citation, style if style in ("apa", "bibtex") else "ieee"
+        )
+        return _text(f"**{style.upper()} Format:**\n\n{formatted}")
+
+    def _statistics(self) -> Dict[str, int]:
+        """Return statistics keyed like the C# server's."""
+        stats = self.library.get_statistics()
+        result = {
+            "total_citations": stats["total_citations"],
+            "total_domains": stats["total_domains"],
+            "total_tags": stats["total_tags"],
+        }
+        for citation_type in CitationType:
+            count = stats["by_type"].get(citation_type.value)
+            if count:
+                result[f"type_{citation_type.value.lower()}"] = count
+        if stats["year_range"]["min"] is not None:
+            result["oldest_year"] = stats["year_range"]["min"]
+            result["newest_year"] = stats["year_range"]["max"]
+        return result
+
+    def _get_statistics(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        output = "\n".join(
+            f"- **{key.replace('_', ' ')}:** {value}" for key, value in self._statistics().items()
+        )
+        return _text(f"Citation Database Statistics:\n\n{output}")
+
+    def _list_tags(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        def compute(library: CitationLibrary) -> List[str]:
+            # Distinct ignoring case; get_tags() is sorted, so the first spelling wins
+            unique: Dict[str, str] = {}
+            for tag in library.get_tags():
+                unique.setdefault(tag.casefold(), tag)
+            return sorted(unique.values(), key=lambda tag: (tag.casefold(), tag))
+
+        tags = self._cached("tags", compute)
+        return _text(f"Available tags ({len(tags)}):\n\n{', '.join(tags)}")
+
+    # Resources
+
+    def _read_resource(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcError(INVALID_PARAMS, "Missing params")
+        uri = params.get("uri")
+        readers: Dict[str, Callable[[], str]] = {
+            "citations://all": lambda: self._cached(
+                "all", lambda library: _dumps([c.to_dict() for c in library.citations])
+            ),
+            "citations://domains": lambda: _dumps(
+                [_domain_dict(d) for d in self.library.domains]
+            ),
+            "citations://statistics": lambda: _dumps(self._statistics()),
+        }
+        reader = readers.get(uri) if isinstance(uri, str) else None
+        if reader is None:
+            raise RpcError(INVALID_PARAMS, f"Unknown resource: {uri}")
+        try:
+            content = reader()
+        except ToolError as e:
+            raise RpcError(INTERNAL_ERROR, str(e))
+        return {"contents": [{"uri": uri, "mimeType": "application/json", "text": content}]}
+
+    # Prompts
+
+    def _get_prompt(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not params:
+            raise RpcError(INVALID_PARAMS, "Missing params")
+        name = params.get("name")
+        args = params.get("arguments")
+        args = args if isinstance(args, dict) else {}
+        prompts: Dict[str, Callable[[Dict[str, Any]], str]] = {
+            "find_relevant_citations": self._find_relevant_prompt,
+            "summarize_domain": self._summarize_domain_prompt,
+            "create_bibliography": self._bibliography_prompt,
+        }
+        prompt = prompts.get(name) if isinstance(name, str) else None
+        try:
+            text = prompt(args) if prompt else "Unknown prompt"
+        except ToolError as e:
+            raise RpcError(INTERNAL_ERROR, str(e))
+        return {
+            "description": f"Prompt: {name}",
+            "messages": [{"role": "user", "content": {"type": "text", "text": text}}],
+        }
+
+    def _find_relevant_prompt(self, args: Dict[str, Any]) -> str:
+        topic = _string_arg(args, "topic") or "machine learning"
+        library = self.library
+        citations = self._search(library, topic, limit=20)
+        citation_list = "\n".join(self._summary(library, c) for c in citations)
+        return (
+            f"I'm researching: {topic}\n\n"
+            f"Here are potentially relevant citations from my library:\n\n{citation_list}\n\n"
+            "Please analyze these citations and recommend the most relevant ones for my "
+            "research, explaining why each is useful."
+        )
+
+    def _summarize_domain_prompt(self, args: Dict[str, Any]) -> str:
+        domain = _string_arg(args, "domain") or "Software Engineering"
+        library = self.library
+        citations = self._domain_citations(library, domain)
+        citation_list = "\n".join(self._summary(library, c) for c in citations)
+        return (
+            f"Please summarize the research landscape represented by these {len(citations)} "
+            f"citations in the '{domain}' domain:\n\n{citation_list}\n\n"
+            "Provide an overview of key themes, seminal works, and trends visible in this "
+            "collection."
+        )
+
+    def _bibliography_prompt(self, args: Dict[str, Any]) -> str:
+        query = _string_arg(args, "query") or ""
+        style = _string_arg(args, "style") or "ieee"
+        library = self.library
+        citations = self._search(library, query, limit=50)
+        render_style = style.lower() if style.lower() in ("apa", "bibtex") else "ieee"
+        # Entries are formatted one by one, like the C# server (keys are not deduplicated)
+        formatted = "\n\n".join(library.formatter.format(c, render_style) for c in citations)
+        return (
+            f"Here is a bibliography of {len(citations)} citations in {style.upper()} "
+            f"format:\n\n{formatted}\n\n"
+            "Please review this bibliography and suggest any improvements or note any "
+            "formatting issues."
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m citation_tool.mcp", description="Citation Tool MCP server (stdio)"
+    )
+    parser.add_argument(
+        "data_path", nargs="?", type=Path,
+        help="JSON export (default: $CITATION_DATA_PATH or ~/.citation-tool/citations.json)"
+    )
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="keep a binary snapshot next to the export so restarts skip parsing"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+        help="seconds between checks of the export for changes (default: 1.0)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="requests handled concurrently (default: 4)"
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        stream=sys.stderr,
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="[CitationMCP] %(message)s"
+    )
+    data_path = args.data_path or default_data_path()
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info("Data path: %s", data_path)
+    if not data_path.exists():
+        logger.warning(
+            "Warning: Data file not found. Export your citations from the web app first."
+        )
+        logger.warning("Use the Export feature and save the JSON file to the path above.")
+
+    for stream in (sys.stdin, sys.stdout):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8")
+
+    server = McpServer(data_path, args.cache, args.poll_interval, args.workers)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,14 @@
 Data models for Citation Tool.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, List, Type, Union
 import json
+import sys
 
 
 class CitationType(Enum):
@@ -42,6 +45,56 @@ class CitationType(Enum):
         return names.get(self, self.value)
 
 
+# Export type string -> CitationType, avoiding the slower Enum lookup
+_CITATION_TYPES: Dict[str, CitationType] = {t.value: t for t in CitationType}
+
+
+def _intern(value: Any) -> Any:
+    """Intern a string so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _lazy_datetime(slot: str) -> property:
+    """
+    Property storing a datetime in ``slot`` that also accepts the raw ISO
+    string and parses it on first read.
+    """
+    def get(self) -> Optional[datetime]:
+        value = getattr(self, slot)
+        if value is not None and not isinstance(value, datetime):
+            value = _parse_datetime(value)
+            setattr(self, slot, value)
+        return value
+
+    def set(self, value: Optional[datetime]) -> None:
+        setattr(self, slot, value)
+
+    return property(get, set)
+
+
+def _slotted(*lazy_dates: str) -> Callable[[Type[Any]], Type[Any]]:
+    """
+    Recreate a dataclass with ``__slots__``.
+
+    ``dataclass(slots=True)`` needs Python 3.10. Fields named in
+    ``lazy_dates`` become _lazy_datetime() properties backed by a slot
+    with a leading underscore.
+    """
+    def wrap(cls: Type[Any]) -> Type[Any]:
+        names = [f.name for f in fields(cls)]
+        namespace = dict(cls.__dict__)
+        for name in names:
+            namespace.pop(name, None)
+        namespace.pop("__dict__", None)
+        namespace.pop("__weakref__", None)
+        namespace["__slots__"] = tuple(f"_{n}" if n in lazy_dates else n for n in names)
+        for name in lazy_dates:
+            namespace[name] = _lazy_datetime(f"_{name}")
+        return type(cls.__name__, cls.__bases__, namespace)
+    return wrap
+
+
+@_slotted()
 @dataclass
 class Domain:
     """A domain/category for organizing citations."""
@@ -63,9 +116,15 @@ class Domain:
         )
 
 
+@_slotted("date_added", "date_modified")
 @dataclass
 class Citation:
-    """A citation/reference entry."""
+    """
+    A citation/reference entry.
+
+    Citations loaded from an export keep ``date_added`` and
+    ``date_modified`` as strings until first accessed.
+    """
     id: str
     title: str
     authors: List[str] = field(default_factory=list)
@@ -87,38 +146,79 @@ class Citation:
     date_added: Optional[datetime] = None
     date_modified: Optional[datetime] = None
 
+    if TYPE_CHECKING:
+        # Slots behind the date properties, holding a datetime or raw ISO string
+        _date_added: Union[datetime, str, None] = field(init=False, default=None)
+        _date_modified: Union[datetime, str, None] = field(init=False, default=None)
+
     @classmethod
     def from_dict(cls, data: dict) -> "Citation":
         """Create a Citation from a dictionary."""
-        # Parse citation type
-        type_str = data.get("type", "Article")
         try:
-            citation_type = CitationType(type_str)
-        except ValueError:
-            citation_type = CitationType.MISC
-
-        return cls(
-            id=data.get("id", ""),
-            title=data.get("title", ""),
-            authors=data.get("authors", []),
-            type=citation_type,
-            journal_or_conference=data.get("journalOrConference"),
-            volume=data.get("volume"),
-            issue=data.get("issue"),
-            pages=data.get("pages"),
-            year=data.get("year"),
-            month=data.get("month"),
-            publisher=data.get("publisher"),
-            doi=data.get("doi"),
-            url=data.get("url"),
-            isbn=data.get("isbn"),
-            abstract=data.get("abstract"),
-            notes=data.get("notes"),
-            tags=data.get("tags", []),
-            domain_id=data.get("domainId"),
-            date_added=_parse_datetime(data.get("dateAdded")),
-            date_modified=_parse_datetime(data.get("dateModified"))
-        )
+            # The web app writes every key, so one C-level lookup usually does
+            if len(data) < len(_EXPORT_KEYS):
+                raise KeyError
+            (
+                citation_id, title, authors, type_str, venue, volume, issue, pages, year, month,
+                publisher, doi, url, isbn, abstract, notes, tags, domain_id, added, modified
+            ) = _export_fields(data)
+        except KeyError:
+            (
+                citation_id, title, authors, type_str, venue, volume, issue, pages, year, month,
+                publisher, doi, url, isbn, abstract, notes, tags, domain_id, added, modified
+            ) = map(data.get, _EXPORT_KEYS)
+            # Apply the defaults of missing keys (present null values are kept)
+            if citation_id is None and "id" not in data:
+                citation_id = ""
+            if title is None and "title" not in data:
+                title = ""
+            if type_str is None and "type" not in data:
+                type_str = "Article"
+            if authors is None and "authors" not in data:
+                authors = []
+            if tags is None and "tags" not in data:
+                tags = []
+
+        # Author, tag, venue and domain names repeat across a library; share them
+        try:
+            if type(authors) is not list or type(tags) is not list:
+                raise TypeError
+            authors = list(map(_intern_str, authors))
+            tags = list(map(_intern_str, tags))
+        except TypeError:
+            # Only malformed records get here
+            authors = [_intern(a) for a in authors] if type(authors) is list else authors
+            tags = [_intern(t) for t in tags] if type(tags) is list else tags
+        if type(venue) is str:
+            venue = _intern_str(venue)
+        if type(publisher) is str:
+            publisher = _intern_str(publisher)
+        if type(domain_id) is str:
+            domain_id = _intern_str(domain_id)
+
+        citation = _new_citation(cls)
+        citation.id = citation_id
+        citation.title = title
+        citation.authors = authors
+        citation.type = _CITATION_TYPES.get(type_str, CitationType.MISC)
+        citation.journal_or_conference = venue
+        citation.volume = volume
+        citation.issue = issue
+        citation.pages = pages
+        citation.year = year
+        citation.month = month
+        citation.publisher = publisher
+        citation.doi = doi
+        citation.url = url
+        citation.isbn = isbn
+        citation.abstract = abstract
+        citation.notes = notes
+        citation.tags = tags
+        citation.domain_id = domain_id
+        # Parsed on first access (see _lazy_datetime); "" means no date
+        citation._date_added = added or None
+        citation._date_modified = modified or None
+        return citation
 
     @property
     def authors_display(self) -> str:
@@ -161,14 +261,7 @@ class Citation:
         parts = []
 
         if self.authors:
-            formatted_authors = []
-            for author in self.authors:
-                name_parts = author.split()
-                if len(name_parts) >= 2:
-                    formatted_authors.append(f"{name_parts[-1]}, {' '.join(n[0] + '.' for n in name_parts[:-1])}")
-                else:
-                    formatted_authors.append(author)
-            parts.append(", ".join(formatted_authors))
+            parts.append(", ".join(_apa_author(author) for author in self.authors))
 
         if self.year:
             parts.append(f"({self.year})")
@@ -191,25 +284,22 @@ class Citation:
 
         return ". ".join(filter(None, parts))
 
-    def format_bibtex(self) -> str:
-        """Format citation in BibTeX format."""
-        # Generate key
+    def bibtex_key(self) -> str:
+        """Default BibTeX key: first author surname, year and first title word."""
         author_key = self.authors[0].split()[-1].lower() if self.authors else "unknown"
         year_key = str(self.year) if self.year else "0000"
         title_key = self.title.split()[0].lower() if self.title else "untitled"
-        key = f"{author_key}{year_key}{title_key}"
-
-        # Entry type
-        entry_types = {
-            CitationType.ARTICLE: "article",
-            CitationType.IN_PROCEEDINGS: "inproceedings",
-            CitationType.BOOK: "book",
-            CitationType.IN_BOOK: "inbook",
-            CitationType.TECH_REPORT: "techreport",
-            CitationType.THESIS: "phdthesis",
-            CitationType.MANUAL: "manual",
-        }
-        entry_type = entry_types.get(self.type, "misc")
+        return f"{author_key}{year_key}{title_key}"
+
+    def format_bibtex(self, key: Optional[str] = None) -> str:
+        """
+        Format citation in BibTeX format.
+
+        Args:
+            key: Entry key to use instead of bibtex_key()
+        """
+        key = key or self.bibtex_key()
+        entry_type = _BIBTEX_ENTRY_TYPES.get(self.type, "misc")
 
         lines = [f"@{entry_type}{{{key},"]
         lines.append(f"  title = {{{self.title}}}")
@@ -264,13 +354,170 @@ class Citation:
         }
 
 
+# Export keys read by Citation.from_dict(), in field order
+_EXPORT_KEYS = (
+    "id", "title", "authors", "type", "journalOrConference", "volume", "issue", "pages",
+    "year", "month", "publisher", "doi", "url", "isbn", "abstract", "notes", "tags",
+    "domainId", "dateAdded", "dateModified",
+)
+
+_export_fields = itemgetter(*_EXPORT_KEYS)
+_new_citation = object.__new__
+_intern_str = sys.intern
+
+_BIBTEX_ENTRY_TYPES = {
+    CitationType.ARTICLE: "article",
+    CitationType.IN_PROCEEDINGS: "inproceedings",
+    CitationType.BOOK: "book",
+    CitationType.IN_BOOK: "inbook",
+    CitationType.TECH_REPORT: "techreport",
+    CitationType.THESIS: "phdthesis",
+    CitationType.MANUAL: "manual",
+}
+
+
+@lru_cache(maxsize=65536)
+def _apa_author(author: str) -> str:
+    """Format one author name APA-style ("Jane Q Smith" -> "Smith, J. Q.")."""
+    name_parts = author.split()
+    if len(name_parts) >= 2:
+        return f"{name_parts[-1]}, {' '.join(n[0] + '.' for n in name_parts[:-1])}"
+    return author
+
+
+class DuplicateMatchReason(Enum):
+    """Why two citations were flagged as duplicates (mirrors the web app)."""
+    EXACT_DOI = "ExactDoi"
+    EXACT_TITLE = "ExactTitle"
+    SIMILAR_TITLE = "SimilarTitle"
+    SAME_AUTHOR_YEAR_TITLE = "SameAuthorYearTitle"
+
+    @property
+    def display_name(self) -> str:
+        """Human-readable description of the reason."""
+        names = {
+            DuplicateMatchReason.EXACT_DOI: "Exact DOI match",
+            DuplicateMatchReason.EXACT_TITLE: "Exact title match",
+            DuplicateMatchReason.SIMILAR_TITLE: "Similar title",
+            DuplicateMatchReason.SAME_AUTHOR_YEAR_TITLE: "Same author, year, and similar title",
+        }
+        return names.get(self, self.value)
+
+
+@dataclass
+class DuplicateMatch:
+    """A pair of citations that are likely duplicates of each other."""
+    citation: Citation
+    duplicate: Citation
+    confidence: float
+    reason: DuplicateMatchReason
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    """A citation found by fuzzy search."""
+    citation: Citation
+    # Average similarity of the closest word for each query word (0 to 1]
+    score: float
+    # Query word -> the (folded) citation word it matched
+    terms: Dict[str, str]
+
+
+class HealthLevel(Enum):
+    """Outcome category of a URL health check."""
+    UNKNOWN = "Unknown"
+    HEALTHY = "Healthy"
+    REDIRECT = "Redirect"
+    NOT_FOUND = "NotFound"
+    SERVER_ERROR = "ServerError"
+    ERROR = "Error"
+
+
+@dataclass
+class UrlHealthStatus:
+    """Result of checking a citation URL."""
+    checked_at: Optional[datetime]
+    status_code: int = 0
+    is_healthy: bool = False
+    error_message: Optional[str] = None
+
+    @property
+    def level(self) -> HealthLevel:
+        """Category derived from the status code."""
+        code = self.status_code
+        if 200 <= code < 300:
+            return HealthLevel.HEALTHY
+        if 300 <= code < 400:
+            return HealthLevel.REDIRECT
+        if 400 <= code < 500:
+            return HealthLevel.NOT_FOUND
+        if code >= 500:
+            return HealthLevel.SERVER_ERROR
+        if code == 0 and self.error_message:
+            return HealthLevel.ERROR
+        return HealthLevel.UNKNOWN
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UrlHealthStatus":
+        """Create a UrlHealthStatus from a dictionary."""
+        return cls(
+            checked_at=_parse_datetime(data.get("checkedAt")),
+            status_code=data.get("statusCode", 0),
+            is_healthy=data.get("isHealthy", False),
+            error_message=data.get("errorMessage")
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "checkedAt": self.checked_at.isoformat() if self.checked_at else None,
+            "statusCode": self.status_code,
+            "isHealthy": self.is_healthy,
+            "errorMessage": self.error_message,
+        }
+
+
+class DoiLookupErrorType(Enum):
+    """Why a DOI lookup failed."""
+    UNKNOWN = "Unknown"
+    INVALID_FORMAT = "InvalidFormat"
+    NOT_FOUND = "NotFound"
+    NETWORK_ERROR = "NetworkError"
+    PARSE_ERROR = "ParseError"
+    RATE_LIMITED = "RateLimited"
+
+
+@dataclass
+class DoiLookupResult:
+    """Result of looking up a DOI's metadata."""
+    success: bool
+    citation: Optional[Citation] = None
+    error_message: Optional[str] = None
+    error_type: DoiLookupErrorType = DoiLookupErrorType.UNKNOWN
+
+    @classmethod
+    def ok(cls, citation: Citation) -> "DoiLookupResult":
+        """Create a successful result."""
+        return cls(success=True, citation=citation)
+
+    @classmethod
+    def fail(
+        cls,
+        message: str,
+        error_type: DoiLookupErrorType = DoiLookupErrorType.UNKNOWN
+    ) -> "DoiLookupResult":
+        """Create a failed result."""
+        return cls(success=False, error_message=message, error_type=error_type)
+
+
 def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
     """Parse an ISO datetime string."""
     if not value:
         return None
     try:
-        # Handle various ISO formats
-        value = value.replace("Z", "+00:00")
+        # fromisoformat() only accepts a "Z" suffix from Python 3.11 on
+        if value[-1] == "Z":
+            value = value[:-1] + "+00:00"
         return datetime.fromisoformat(value)
     except (ValueError, TypeError):
         return None
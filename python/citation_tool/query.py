@@ -0,0 +1,169 @@
+"""
+Lazy, paginated search results.
+
+A CitationQuery holds search filters, not results. Matches are found on
+demand in library order, all filters checked in a single pass, and the
+work stops as soon as enough have been found, so ``exists()`` or a first
+page cost about as much as the matches they return.
+"""
+
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional, Tuple
+
+from .models import Citation, CitationType
+
+if TYPE_CHECKING:
+    from .library import CitationLibrary
+
+# Matches fetched per lock acquisition while iterating
+_BATCH_SIZE = 256
+
+
+class QueryFilters(NamedTuple):
+    """Resolved search filters of a query."""
+    terms: List[str]
+    domain_id: Optional[str]
+    citation_type: Optional[CitationType]
+    year_from: Optional[int]
+    year_to: Optional[int]
+    tags: Optional[List[str]]
+
+
+class Page(NamedTuple):
+    """One page of query results."""
+    items: List[Citation]
+    next_cursor: Optional[str]
+
+
+class CitationQuery:
+    """
+    Lazily evaluated search over a CitationLibrary.
+
+    Created by ``CitationLibrary.query()``. Iterating yields matching
+    citations in library order; nothing is computed up front.
+
+    Example:
+        >>> q = library.query(domain="AI", year_from=2023, year_to=2023)
+        >>> q.exists()
+        True
+        >>> page = q.page(20)
+        >>> next_page = q.page(20, cursor=page.next_cursor)
+    """
+
+    def __init__(
+        self,
+        library: "CitationLibrary",
+        filters: Optional[QueryFilters],
+        limit: Optional[int] = None
+    ):
+        """
+        Args:
+            library: Library to search
+            filters: Resolved filters, or None for a query matching nothing
+            limit: Maximum number of results
+        """
+        self._library = library
+        self._filters = filters
+        self._limit = limit or None
+
+    def _scan(
+        self,
+        after: int,
+        count: Optional[int],
+        build: bool = True
+    ) -> Tuple[List[int], List[Citation]]:
+        """Return up to ``count`` matching positions after ``after`` and their citations."""
+        if self._filters is None:
+            return [], []
+        return self._library._scan(self._filters, after, count, build)
+
+    def _capped(self, seen: int, count: Optional[int]) -> Optional[int]:
+        """Apply the query's limit to a request for ``count`` more results."""
+        if self._limit is None:
+            return count
+        left = max(self._limit - seen, 0)
+        return left if count is None else min(count, left)
+
+    def __iter__(self) -> Iterator[Citation]:
+        """
+        Yield matching citations in library order.
+
+        Matches are fetched in batches, each under the library lock, so a
+        concurrent refresh() is safe. If the library is reloaded or its
+        index rebuilt meanwhile, iteration stops with a RuntimeError.
+        """
+        library = self._library
+        after = -1
+        seen = 0
+        generation = None
+        while True:
+            count = self._capped(seen, _BATCH_SIZE)
+            if not count:
+                return
+            with library._lock:
+                if generation is None:
+                    generation = library._generation
+                elif generation != library._generation:
+                    raise RuntimeError("library was reloaded during iteration")
+                docs, citations = self._scan(after, count)
+            yield from citations
+            if len(docs) < count:
+                return
+            seen += len(docs)
+            after = docs[-1]
+
+    def count(self) -> int:
+        """Count matching citations (up to the limit) without building a result list."""
+        with self._library._lock:
+            docs, _ = self._scan(-1, self._capped(0, None), build=False)
+        return len(docs)
+
+    def exists(self) -> bool:
+        """Check whether anything matches, stopping at the first match."""
+        with self._library._lock:
+            docs, _ = self._scan(-1, self._capped(0, 1), build=False)
+        return bool(docs)
+
+    def first(self) -> Optional[Citation]:
+        """Return the first match, or None."""
+        with self._library._lock:
+            _, citations = self._scan(-1, self._capped(0, 1))
+        return citations[0] if citations else None
+
+    def page(self, size: int, cursor: Optional[str] = None) -> Page:
+        """
+        Fetch one page of results.
+
+        Cursors point just past the last citation of a page. They stay
+        valid while refresh() adds, changes or removes citations (new
+        citations show up on later pages), but not across a full reload
+        or index rebuild.
+
+        Args:
+            size: Maximum number of citations on the page
+            cursor: ``next_cursor`` of the previous page (None for the first)
+
+        Returns:
+            The page; its ``next_cursor`` is None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed or no longer valid
+        """
+        if size < 1:
+            raise ValueError(f"size must be positive, got {size}")
+        after, seen = -1, 0
+        library = self._library
+        with library._lock:
+            if cursor is not None:
+                try:
+                    generation, after, seen = (int(part) for part in cursor.split(":"))
+                except ValueError:
+                    raise ValueError(f"Invalid cursor: {cursor!r}") from None
+                if generation != library._generation:
+                    raise ValueError("Cursor is no longer valid; the library was reloaded")
+            count = self._capped(seen, size + 1)
+            docs, citations = self._scan(after, count)
+            generation = library._generation
+        next_cursor = None
+        if len(docs) > size:
+            next_cursor = f"{generation}:{docs[size - 1]}:{seen + size}"
+        return Page(citations[:size], next_cursor)
@@ -0,0 +1,160 @@
+"""
+LRU cache of search and statistics results.
+
+Entries are keyed by normalized query parameters, so equivalent calls
+(different term order, tag case or a domain given by name instead of ID)
+share one entry. When citations change, only entries whose filters match
+an old or new version of a changed citation are dropped; results that do
+not depend on individual filters, such as statistics and ranked searches,
+are dropped on every change.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .index import searchable_fields
+from .models import Citation
+from .query import QueryFilters
+
+DEFAULT_QUERY_CACHE_SIZE = 256
+
+# Above this many (entry, citation) checks an invalidation clears everything
+_MAX_INVALIDATION_CHECKS = 1 << 20
+
+
+def filters_key(filters: QueryFilters) -> Tuple[Hashable, ...]:
+    """Return a hashable key for filters; term order and tag order do not matter."""
+    return (
+        frozenset(filters.terms),
+        filters.domain_id,
+        filters.citation_type,
+        filters.year_from,
+        filters.year_to,
+        frozenset(filters.tags) if filters.tags else None,
+    )
+
+
+def matches(filters: QueryFilters, citation: Citation) -> bool:
+    """Check whether a citation satisfies every filter, as search() would."""
+    if filters.domain_id is not None and citation.domain_id != filters.domain_id:
+        return False
+    if filters.citation_type is not None and citation.type != filters.citation_type:
+        return False
+    if filters.year_from is not None or filters.year_to is not None:
+        if not citation.year:
+            return False
+        if filters.year_from is not None and citation.year < filters.year_from:
+            return False
+        if filters.year_to is not None and citation.year > filters.year_to:
+            return False
+    if filters.tags:
+        tags = {tag.lower() for tag in citation.tags}
+        if not all(tag in tags for tag in filters.tags):
+            return False
+    if filters.terms:
+        fields = searchable_fields(citation)
+        return all(any(term in text for text in fields) for term in filters.terms)
+    return True
+
+
+class QueryCache:
+    """
+    Size-bounded LRU cache for CitationLibrary query results.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUERY_CACHE_SIZE):
+        """
+        Args:
+            maxsize: Maximum number of cached results (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._cache: "OrderedDict[Hashable, Tuple[Optional[QueryFilters], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a result.
+
+        Returns:
+            ``(found, value)``
+        """
+        if not self.maxsize:
+            return False, None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Hashable, value: Any, filters: Optional[QueryFilters] = None) -> None:
+        """
+        Store a result.
+
+        Args:
+            key: Normalized query key
+            value: Result to cache
+            filters: Filters the result depends on, or None if it depends on
+                every citation (it is then dropped on any change)
+        """
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._cache[key] = (filters, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, changed: Optional[Iterable[Citation]] = None) -> int:
+        """
+        Drop results affected by changed citations.
+
+        Args:
+            changed: Old and new versions of every added, updated or removed
+                citation; None drops everything
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            if not self._cache:
+                return 0
+            citations: List[Citation] = [] if changed is None else list(changed)
+            if changed is None or len(citations) * len(self._cache) > _MAX_INVALIDATION_CHECKS:
+                stale = list(self._cache)
+            else:
+                stale = [
+                    key for key, (filters, _) in self._cache.items()
+                    if filters is None or any(matches(filters, c) for c in citations)
+                ]
+            for key in stale:
+                del self._cache[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Return cache hits, misses, invalidated entries, current size and maximum size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
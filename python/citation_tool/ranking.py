@@ -0,0 +1,291 @@
+"""
+BM25 relevance ranking for free-text search.
+
+Citations are tokenized into words; title, author, abstract and tag words
+are weighted by per-field boosts and scored with Okapi BM25. Top-k
+retrieval processes query terms from the most to the least informative
+and stops admitting new documents once the terms left cannot lift one
+into the top k (MaxScore pruning), so its cost follows the posting lists
+of the query terms and k rather than the library size.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+
+from .models import Citation
+
+# Weight of a word occurrence in each field
+DEFAULT_FIELD_BOOSTS: Dict[str, float] = {
+    "title": 3.0,
+    "authors": 2.0,
+    "tags": 2.0,
+    "abstract": 1.0,
+}
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+# Probe a posting list with binary searches instead of scanning it when it
+# is this many times longer than the set of documents of interest
+_PROBE_RATIO = 16
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased words."""
+    return _WORD.findall(text.lower())
+
+
+def _field_texts(citation: Citation) -> Iterable[Tuple[str, str]]:
+    yield "title", citation.title
+    for author in citation.authors:
+        yield "authors", author
+    if citation.abstract:
+        yield "abstract", citation.abstract
+    for tag in citation.tags:
+        yield "tags", tag
+
+
+class RankingIndex:
+    """
+    Weighted term-frequency postings with BM25 scoring.
+
+    For every word, a document's term frequency is the boost-weighted count
+    of its occurrences across the ranked fields, and its length the
+    boost-weighted word count. Postings are sorted ``array`` pairs of
+    document positions and term frequencies. Document frequencies, lengths
+    and per-term maximum frequencies are kept up to date by add() and
+    remove(), so scores always reflect the indexed documents.
+    """
+
+    def __init__(
+        self,
+        citations: Iterable[Optional[Citation]],
+        boosts: Optional[Dict[str, float]] = None,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B
+    ):
+        """
+        Build the index.
+
+        Args:
+            citations: Citations by document position (None marks an
+                unused position)
+            boosts: Weight per field (title, authors, abstract, tags);
+                defaults to DEFAULT_FIELD_BOOSTS
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization strength
+        """
+        self.boosts = dict(DEFAULT_FIELD_BOOSTS if boosts is None else boosts)
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, array] = {}
+        self._tfs: Dict[str, array] = {}
+        self._max_tf: Dict[str, float] = {}
+        self._doc_len = array("f")
+        self._total_len = 0.0
+        self._count = 0
+
+        docs: Dict[str, List[int]] = {}
+        tfs: Dict[str, List[float]] = {}
+        for doc, citation in enumerate(citations):
+            if citation is None:
+                self._doc_len.append(0.0)
+                continue
+            weights, length = self._weigh(citation)
+            self._doc_len.append(length)
+            self._total_len += length
+            self._count += 1
+            for term, tf in weights.items():
+                if term in docs:
+                    docs[term].append(doc)
+                    tfs[term].append(tf)
+                else:
+                    docs[term] = [doc]
+                    tfs[term] = [tf]
+        for term, term_docs in docs.items():
+            term_tfs = tfs[term]
+            self._docs[term] = array("I", term_docs)
+            self._tfs[term] = array("f", term_tfs)
+            self._max_tf[term] = max(term_tfs)
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return self._count
+
+    def _weigh(self, citation: Citation) -> Tuple[Dict[str, float], float]:
+        """Return a citation's weighted term frequencies and length."""
+        boosts = self.boosts
+        weights: Dict[str, float] = {}
+        length = 0.0
+        for field, text in _field_texts(citation):
+            boost = boosts.get(field, 0.0)
+            if not boost or not text:
+                continue
+            words = _WORD.findall(text.lower())
+            length += boost * len(words)
+            for word in words:
+                weights[word] = weights.get(word, 0.0) + boost
+        return weights, length
+
+    def add(self, doc: int, citation: Citation) -> None:
+        """
+        Index a citation at a position that is not currently indexed.
+
+        Args:
+            doc: Document position
+            citation: The citation stored at that position
+        """
+        weights, length = self._weigh(citation)
+        while len(self._doc_len) <= doc:
+            self._doc_len.append(0.0)
+        self._doc_len[doc] = length
+        self._total_len += length
+        self._count += 1
+        for term, tf in weights.items():
+            docs = self._docs.get(term)
+            if docs is None:
+                self._docs[term] = array("I", [doc])
+                self._tfs[term] = array("f", [tf])
+                self._max_tf[term] = tf
+                continue
+            i = bisect_left(docs, doc)
+            docs.insert(i, doc)
+            self._tfs[term].insert(i, tf)
+            if tf > self._max_tf[term]:
+                self._max_tf[term] = tf
+
+    def remove(self, doc: int, citation: Citation) -> None:
+        """
+        Remove a citation from the index.
+
+        Args:
+            doc: Document position the citation was indexed at
+            citation: The citation as it was when indexed
+        """
+        weights, _ = self._weigh(citation)
+        for term in weights:
+            docs = self._docs.get(term)
+            if docs is None:
+                continue
+            i = bisect_left(docs, doc)
+            if i < len(docs) and docs[i] == doc:
+                del docs[i]
+                del self._tfs[term][i]
+                if not docs:
+                    del self._docs[term]
+                    del self._tfs[term]
+                    del self._max_tf[term]
+        # Per-term maxima may now be stale, but remain valid upper bounds
+        self._total_len -= self._doc_len[doc]
+        self._doc_len[doc] = 0.0
+        self._count -= 1
+
+    def _postings(
+        self,
+        term: str,
+        restrict: Optional[Collection[int]]
+    ) -> Iterable[Tuple[int, float]]:
+        """Return (doc, tf) pairs of a term, optionally limited to some documents."""
+        docs = self._docs[term]
+        tfs = self._tfs[term]
+        if restrict is None:
+            return zip(docs, tfs)
+        if len(restrict) * _PROBE_RATIO < len(docs):
+            size = len(docs)
+            found = []
+            for doc in restrict:
+                i = bisect_left(docs, doc)
+                if i < size and docs[i] == doc:
+                    found.append((doc, tfs[i]))
+            return found
+        return [(doc, tf) for doc, tf in zip(docs, tfs) if doc in restrict]
+
+    def top_k(
+        self,
+        terms: Iterable[str],
+        k: Optional[int] = None,
+        allowed: Optional[Collection[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the highest-scoring documents for a query.
+
+        A document matches if it contains any of the terms. Terms are
+        processed in order of decreasing maximum contribution. Once the
+        remaining terms together cannot beat the current k-th best score,
+        only documents already seen are updated and those that can no
+        longer reach the top k are dropped.
+
+        Args:
+            terms: Query words (as produced by tokenize())
+            k: Number of results, or None for every match
+            allowed: Only consider these document positions (a set or
+                other collection with fast membership tests)
+
+        Returns:
+            ``(doc, score)`` pairs, best first; equal scores keep document order
+        """
+        if not self._count:
+            return []
+        k1, b = self.k1, self.b
+        count = self._count
+        avg_len = self._total_len / count if self._total_len else 1.0
+
+        bounds: Dict[str, Tuple[float, float]] = {}
+        for term in terms:
+            docs = self._docs.get(term)
+            if docs is None or term in bounds:
+                continue
+            df = len(docs)
+            idf = math.log(1.0 + (count - df + 0.5) / (df + 0.5))
+            max_tf = self._max_tf[term]
+            # Score of the most frequent occurrence in the shortest document
+            bound = idf * (k1 + 1) * max_tf / (max_tf + k1 * (1 - b))
+            bounds[term] = (idf, bound)
+        if not bounds:
+            return []
+
+        order = sorted(bounds, key=lambda t: bounds[t][1], reverse=True)
+        remaining = sum(bound for _, bound in bounds.values())
+        doc_len = self._doc_len
+        norm_base = k1 * (1 - b)
+        norm_len = k1 * b / avg_len
+        scores: Dict[int, float] = {}
+        admit = True
+
+        for term in order:
+            idf, bound = bounds[term]
+            remaining -= bound
+            weight = idf * (k1 + 1)
+            if not scores:
+                scores = {
+                    doc: weight * tf / (tf + norm_base + norm_len * doc_len[doc])
+                    for doc, tf in self._postings(term, allowed)
+                }
+            elif admit:
+                for doc, tf in self._postings(term, allowed):
+                    score = weight * tf / (tf + norm_base + norm_len * doc_len[doc])
+                    scores[doc] = scores.get(doc, 0.0) + score
+            else:
+                for doc, tf in self._postings(term, scores):
+                    scores[doc] += weight * tf / (tf + norm_base + norm_len * doc_len[doc])
+
+            if k and len(scores) > k and remaining > 0:
+                threshold = heapq.nlargest(k, scores.values())[-1]
+                if remaining < threshold:
+                    # Unseen documents can score at most `remaining`
+                    admit = False
+                    scores = {
+                        doc: score for doc, score in scores.items()
+                        if score + remaining >= threshold
+                    }
+
+        ranked = scores.items()
+        if k:
+            return heapq.nsmallest(k, ranked, key=lambda item: (-item[1], item[0]))
+        return sorted(ranked, key=lambda item: (-item[1], item[0]))
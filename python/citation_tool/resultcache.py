@@ -0,0 +1,115 @@
+"""
+On-disk cache of network lookup results.
+
+Results are stored as JSON in a SQLite database, each with its own expiry
+time, so long-running audits can be re-run and only redo stale lookups.
+Several result kinds can share one file; each uses its own namespace.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+# SQLite's default limit on host parameters is 999
+_BATCH = 500
+
+
+class ResultCache:
+    """
+    SQLite-backed key/value store with per-entry time-to-live.
+
+    Example:
+        >>> with ResultCache("lookups.sqlite", "urls") as cache:
+        ...     cache.put_many([("https://example.org", {"ok": True}, 3600)])
+        ...     cache.get_many(["https://example.org"])
+        {'https://example.org': {'ok': True}}
+    """
+
+    def __init__(self, path: Union[str, Path], namespace: str):
+        """
+        Open (or create) a cache file.
+
+        Args:
+            path: SQLite database file
+            namespace: Name separating this kind of result from others in
+                the same file
+        """
+        self.path = Path(path)
+        self.namespace = namespace
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Look up unexpired results.
+
+        Args:
+            keys: Keys to look up
+
+        Returns:
+            Dictionary of key to stored value for every fresh hit
+        """
+        now = time.time()
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        for start in range(0, len(keys), _BATCH):
+            batch = keys[start:start + _BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, value FROM results WHERE namespace = ? AND expires_at > ?"
+                f" AND key IN ({placeholders})",
+                [self.namespace, now, *batch]
+            )
+            for key, value in rows:
+                found[key] = json.loads(value)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Any, float]]) -> None:
+        """
+        Store results.
+
+        Args:
+            items: ``(key, value, ttl_seconds)`` tuples; values must be
+                JSON-serializable
+        """
+        now = time.time()
+        rows: List[Tuple[str, str, str, float]] = [
+            (self.namespace, key, json.dumps(value), now + ttl) for key, value, ttl in items
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (namespace, key, value, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def purge(self) -> int:
+        """Delete expired entries of this namespace; returns how many were removed."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM results WHERE namespace = ? AND expires_at <= ?",
+                (self.namespace, time.time())
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
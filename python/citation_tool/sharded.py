@@ -0,0 +1,698 @@
+"""
+Several exports queried as one library.
+
+A ShardedCitationLibrary opens each export (a "shard") in a pool of worker
+processes. The workers parse the exports, save them as binary snapshots and
+report back only their domains and a small summary, so opening many exports
+takes about as long as parsing the largest one. A shard is loaded from its
+snapshot the first time a query needs it; queries that can be answered
+from the summaries, or whose filters rule a shard out, never load it.
+
+Domains are merged across shards by ID, then by name (case-insensitive).
+Searches fan out to the shards and their results are merged; with
+``dedupe=True`` a citation is dropped if an earlier shard has a citation
+with the same ID or DOI.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    IO, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional,
+    Sequence, Set, Tuple, TypeVar, Union
+)
+
+from . import columnar, writers
+from .duplicates import normalize_doi
+from .formatting import CitationFormatter
+from .fuzzy import DEFAULT_MAX_EXPANSIONS
+from .library import CitationLibrary
+from .models import Citation, CitationType, Domain, FuzzyMatch
+from .querycache import DEFAULT_QUERY_CACHE_SIZE
+from .ranking import tokenize
+from .snapshot import default_snapshot_path
+
+_T = TypeVar("_T")
+
+
+class _ShardSummary(NamedTuple):
+    """Counts behind get_statistics() for one shard."""
+    total: int
+    year_min: Optional[int]
+    year_max: Optional[int]
+    by_type: Counter
+    by_domain: Counter
+    tags: FrozenSet[str]
+
+
+class _ShardInfo(NamedTuple):
+    """What a worker reports about a shard it opened."""
+    domains: List[Domain]
+    summary: _ShardSummary
+    # (ID, normalized DOI) of every citation, collected for dedupe only
+    keys: Optional[List[Tuple[str, str]]]
+
+
+def _summarize(citations: Iterable[Citation]) -> _ShardSummary:
+    """Count citations by year, type, domain and tag."""
+    count = 0
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    by_type: Counter = Counter()
+    by_domain: Counter = Counter()
+    tags: Set[str] = set()
+    for citation in citations:
+        count += 1
+        year = citation.year
+        if year:
+            if year_min is None or year < year_min:
+                year_min = year
+            if year_max is None or year > year_max:
+                year_max = year
+        by_type[citation.type.value] += 1
+        if citation.domain_id:
+            by_domain[citation.domain_id] += 1
+        tags.update(citation.tags)
+    return _ShardSummary(count, year_min, year_max, by_type, by_domain, frozenset(tags))
+
+
+def _open_shard(path: Path, snapshot_path: Path, keys: bool) -> _ShardInfo:
+    """Parse an export, save its snapshot and summarize it (runs in a worker)."""
+    library = CitationLibrary(
+        path, compact=True, cache=snapshot_path, query_cache_size=0, eager_index=True
+    )
+    citations = library.citations
+    return _ShardInfo(
+        library.domains,
+        _summarize(citations),
+        [(c.id, normalize_doi(c.doi)) for c in citations] if keys else None
+    )
+
+
+class ShardedCitationLibrary:
+    """
+    Query several Citation Tool exports as one library.
+
+    Shards keep the order of ``paths``: searches without ``ranked`` return
+    the matches of the first shard, then the second, and so on. Shards are
+    loaded on first use and stay loaded until close().
+
+    Example:
+        >>> library = ShardedCitationLibrary(["2023.json", "2024.json"], dedupe=True)
+        >>> library.search("transformer", domain="AI", limit=20)
+        [Citation(...), ...]
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[Union[str, Path]],
+        workers: Optional[int] = None,
+        cache: Union[bool, str, Path] = False,
+        compact: bool = False,
+        dedupe: bool = False,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE
+    ):
+        """
+        Open the exports in worker processes.
+
+        Args:
+            paths: JSON exports from Citation Tool, in priority order
+            workers: Worker processes used to open the exports (None uses
+                every CPU, 1 opens them in-process)
+            cache: Where shard snapshots are kept. False uses a temporary
+                directory removed by close(); True keeps them next to each
+                export as ``<name>.snapshot`` so later opens reuse them; a
+                path selects a directory for them.
+            compact: Load shards as columnar CitationStores (see
+                CitationLibrary)
+            dedupe: Drop citations whose ID or normalized DOI already
+                occurs in an earlier shard
+            query_cache_size: Size of each shard's query cache
+
+        Raises:
+            FileNotFoundError: If an export does not exist
+        """
+        self.paths = [Path(path) for path in paths]
+        for path in self.paths:
+            if not path.exists():
+                raise FileNotFoundError(f"Data file not found: {path}")
+        self.compact = compact
+        self.dedupe = dedupe
+        self.query_cache_size = query_cache_size
+        self.formatter = CitationFormatter()
+
+        self._temp_dir: Optional[str] = None
+        if cache is True:
+            self._snapshot_paths = [default_snapshot_path(path) for path in self.paths]
+        else:
+            if cache:
+                directory = Path(cache)
+                directory.mkdir(parents=True, exist_ok=True)
+            else:
+                self._temp_dir = tempfile.mkdtemp(prefix="citation-shards-")
+                directory = Path(self._temp_dir)
+            self._snapshot_paths = [
+                directory / f"{self._path_digest(path)}-{path.name}.snapshot"
+                for path in self.paths
+            ]
+        self._cleanup = weakref.finalize(self, self._remove_temp_dir, self._temp_dir)
+
+        self._shards: List[Optional[CitationLibrary]] = [None] * len(self.paths)
+        self._lock = threading.Lock()
+        self._unique_summaries: Optional[List[_ShardSummary]] = None
+        try:
+            infos = self._open_shards(workers)
+        except BaseException:
+            self.close()
+            raise
+        self._summaries = [info.summary for info in infos]
+        self._shard_tags = [{tag.lower() for tag in info.summary.tags} for info in infos]
+        self._merge_domains([info.domains for info in infos])
+        self._id_owners: Dict[str, int] = {}
+        self._doi_owners: Dict[str, int] = {}
+        self._size = sum(summary.total for summary in self._summaries)
+        if dedupe:
+            self._size = self._index_keys([info.keys or [] for info in infos])
+
+    @staticmethod
+    def _path_digest(path: Path) -> str:
+        """Return a short digest telling apart exports with the same file name."""
+        return hashlib.blake2b(str(path.resolve()).encode("utf-8"), digest_size=6).hexdigest()
+
+    @staticmethod
+    def _remove_temp_dir(temp_dir: Optional[str]) -> None:
+        """Delete the temporary snapshot directory, if any."""
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _open_shards(self, workers: Optional[int]) -> List[_ShardInfo]:
+        """Open every shard, largest first so the slowest one starts early."""
+        count = len(self.paths)
+        workers = min(workers or os.cpu_count() or 1, count)
+        if workers <= 1:
+            return [
+                _open_shard(path, snapshot_path, self.dedupe)
+                for path, snapshot_path in zip(self.paths, self._snapshot_paths)
+            ]
+
+        order = sorted(range(count), key=lambda i: self.paths[i].stat().st_size, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                i: pool.submit(_open_shard, self.paths[i], self._snapshot_paths[i], self.dedupe)
+                for i in order
+            }
+            return [futures[i].result() for i in range(count)]
+
+    def _merge_domains(self, shard_domains: List[List[Domain]]) -> None:
+        """Merge the shards' domains by ID, then by name (first occurrence wins)."""
+        self._domains: List[Domain] = []
+        self._domains_by_id: Dict[str, Domain] = {}
+        self._domains_by_name: Dict[str, Domain] = {}
+        # Per shard: local domain ID -> merged domain
+        self._shard_domains: List[Dict[str, Domain]] = []
+        for domains in shard_domains:
+            local: Dict[str, Domain] = {}
+            for domain in domains:
+                name = domain.name.casefold()
+                merged = self._domains_by_id.get(domain.id) or self._domains_by_name.get(name)
+                if merged is None:
+                    merged = domain
+                    self._domains.append(domain)
+                self._domains_by_id.setdefault(domain.id, merged)
+                self._domains_by_name.setdefault(name, merged)
+                local.setdefault(domain.id, merged)
+            self._shard_domains.append(local)
+
+    def _index_keys(self, shard_keys: List[List[Tuple[str, str]]]) -> int:
+        """Record the first shard of every ID and DOI; returns the unique count."""
+        unique = 0
+        for position, keys in enumerate(shard_keys):
+            for citation_id, doi in keys:
+                if ((not citation_id
+                        or self._id_owners.setdefault(citation_id, position) == position)
+                        and (not doi or self._doi_owners.setdefault(doi, position) == position)):
+                    unique += 1
+        return unique
+
+    def _is_duplicate(self, position: int, citation: Citation) -> bool:
+        """Return True if dedupe drops a citation of the shard at ``position``."""
+        if not self.dedupe:
+            return False
+        if citation.id and self._id_owners.get(citation.id, position) < position:
+            return True
+        doi = normalize_doi(citation.doi)
+        return bool(doi) and self._doi_owners.get(doi, position) < position
+
+    def _shard(self, position: int) -> CitationLibrary:
+        """Return a shard, loading it from its snapshot on first use."""
+        shard = self._shards[position]
+        if shard is None:
+            with self._lock:
+                shard = self._shards[position]
+                if shard is None:
+                    shard = CitationLibrary(
+                        self.paths[position],
+                        compact=self.compact,
+                        cache=self._snapshot_paths[position],
+                        query_cache_size=self.query_cache_size
+                    )
+                    self._shards[position] = shard
+        return shard
+
+    @property
+    def loaded_shards(self) -> List[int]:
+        """Positions of the shards loaded so far."""
+        return [position for position, shard in enumerate(self._shards) if shard is not None]
+
+    def close(self) -> None:
+        """Unload every shard and delete temporary snapshots."""
+        self._shards = [None] * len(self.paths)
+        self._cleanup()
+
+    def __enter__(self) -> "ShardedCitationLibrary":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def domains(self) -> List[Domain]:
+        """Get the merged domains."""
+        return self._domains
+
+    def __len__(self) -> int:
+        """Return the number of citations (after dedupe)."""
+        return self._size
+
+    def __iter__(self) -> Iterator[Citation]:
+        """Iterate over citations shard by shard (after dedupe)."""
+        for position in range(len(self.paths)):
+            for citation in self._shard(position):
+                if not self._is_duplicate(position, citation):
+                    yield citation
+
+    def get_citation(self, citation_id: str) -> Optional[Citation]:
+        """
+        Get a citation by its ID from the first shard that has it.
+
+        Args:
+            citation_id: The citation's unique ID
+
+        Returns:
+            The Citation if found, None otherwise
+        """
+        if self.dedupe:
+            position = self._id_owners.get(citation_id)
+            return None if position is None else self._shard(position).get_citation(citation_id)
+        for position in range(len(self.paths)):
+            citation = self._shard(position).get_citation(citation_id)
+            if citation is not None:
+                return citation
+        return None
+
+    def get_domain(self, domain_id: str) -> Optional[Domain]:
+        """
+        Get a merged domain by the ID it has in any shard.
+
+        Args:
+            domain_id: The domain's ID
+
+        Returns:
+            The Domain if found, None otherwise
+        """
+        return self._domains_by_id.get(domain_id)
+
+    def get_domain_by_name(self, name: str) -> Optional[Domain]:
+        """
+        Get a merged domain by its name (case-insensitive).
+
+        Args:
+            name: The domain name
+
+        Returns:
+            The Domain if found, None otherwise
+        """
+        return self._domains_by_name.get(name.casefold())
+
+    def _targets(
+        self,
+        domain: Optional[str],
+        citation_type: Optional[CitationType],
+        year_from: Optional[int],
+        year_to: Optional[int],
+        tags: Optional[List[str]]
+    ) -> List[Tuple[int, Optional[str]]]:
+        """
+        Return the shards that can match the filters, with their local domain IDs.
+
+        A shard whose domains were merged by name appears once per local
+        domain ID, in its domain order; a shard that has ``domain`` as an
+        ID is searched under that ID only. Shards are ruled out from their
+        summaries, without loading them.
+        """
+        merged = None
+        if domain:
+            merged = self.get_domain(domain) or self.get_domain_by_name(domain)
+            if merged is None:
+                return []
+        wanted_tags = {tag.lower() for tag in tags} if tags else set()
+        targets: List[Tuple[int, Optional[str]]] = []
+        for position, summary in enumerate(self._summaries):
+            if citation_type and not summary.by_type.get(CitationType(citation_type).value):
+                continue
+            if year_from and (summary.year_max is None or summary.year_max < year_from):
+                continue
+            if year_to and (summary.year_min is None or summary.year_min > year_to):
+                continue
+            if not wanted_tags <= self._shard_tags[position]:
+                continue
+            if merged is None:
+                targets.append((position, None))
+                continue
+            local = self._shard_domains[position]
+            if domain in local:
+                local_ids = [domain]
+            else:
+                local_ids = [lid for lid, d in local.items() if d is merged]
+            targets.extend(
+                (position, lid) for lid in local_ids if summary.by_domain.get(lid)
+            )
+        return targets
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        domain: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        ranked: bool = False
+    ) -> List[Citation]:
+        """
+        Search every shard with the filters of CitationLibrary.search().
+
+        Unranked results come in shard order, and shards after the one
+        that fills ``limit`` are not searched. Ranked results are merged by
+        BM25 score; scores use each shard's own term statistics, so they
+        are comparable when shards are similar in content.
+
+        Args:
+            query: Text to search in title, authors, abstract, notes, tags, DOI
+            domain: Domain ID or name to filter by
+            citation_type: Filter by citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: List of tags to filter by (all must match)
+            limit: Maximum number of results
+            ranked: Order results by relevance to the query
+
+        Returns:
+            List of matching citations
+        """
+        targets = self._targets(domain, citation_type, year_from, year_to, tags)
+        words = tokenize(query) if ranked and query else []
+        if words:
+            def ranked_hits(
+                position: int, local_id: Optional[str], count: Optional[int]
+            ) -> List[Tuple[float, Citation, Citation]]:
+                shard = self._shard(position)
+                with shard._lock:
+                    filters = shard._resolve_filters(
+                        query, local_id, citation_type, year_from, year_to, tags
+                    )
+                    if filters is None:
+                        return []
+                    hits = shard._ranked_search(words, filters, count)
+                return [(score, citation, citation) for citation, score in hits]
+
+            return self._merge_scored(targets, ranked_hits, limit)
+
+        results: List[Citation] = []
+        for position, local_id in targets:
+            remaining = limit - len(results) if limit else None
+            shard = self._shard(position)
+            if not self.dedupe:
+                results.extend(shard.search(
+                    query, local_id, citation_type, year_from, year_to, tags, remaining
+                ))
+            else:
+                matches = shard.query(query, local_id, citation_type, year_from, year_to, tags)
+                for citation in matches:
+                    if not self._is_duplicate(position, citation):
+                        results.append(citation)
+                        if remaining and len(results) == limit:
+                            break
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def fuzzy_search(
+        self,
+        query: str,
+        domain: Optional[str] = None,
+        citation_type: Optional[CitationType] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        limit: Optional[int] = 10,
+        max_distance: Optional[int] = None,
+        max_expansions: int = DEFAULT_MAX_EXPANSIONS
+    ) -> List[FuzzyMatch]:
+        """
+        Run CitationLibrary.fuzzy_search() on every shard and merge by score.
+
+        Args:
+            query: Words to look for
+            domain: Domain ID or name to filter by
+            citation_type: Filter by citation type
+            year_from: Minimum publication year
+            year_to: Maximum publication year
+            tags: List of tags to filter by (all must match)
+            limit: Maximum number of results (None for every match)
+            max_distance: Edit budget for every query word
+            max_expansions: Closest citation words considered per query word
+
+        Returns:
+            Matches with similarity scores, best first
+        """
+        def fuzzy_hits(
+            position: int, local_id: Optional[str], count: Optional[int]
+        ) -> List[Tuple[float, Citation, FuzzyMatch]]:
+            matches = self._shard(position).fuzzy_search(
+                query, local_id, citation_type, year_from, year_to, tags,
+                count, max_distance, max_expansions
+            )
+            return [(match.score, match.citation, match) for match in matches]
+
+        targets = self._targets(domain, citation_type, year_from, year_to, tags)
+        return self._merge_scored(targets, fuzzy_hits, limit)
+
+    def _merge_scored(
+        self,
+        targets: List[Tuple[int, Optional[str]]],
+        fetch: Callable[[int, Optional[str], Optional[int]], List[Tuple[float, Citation, _T]]],
+        limit: Optional[int]
+    ) -> List[_T]:
+        """
+        Merge every target's best hits by score (ties keep target order).
+
+        With dedupe, dropped hits can leave fewer than ``limit``; the shards
+        are then asked for twice as many until enough remain.
+        """
+        limit = limit or None
+        factor = 1
+        while True:
+            count = None if limit is None else limit * factor
+            merged = []
+            exhausted = True
+            for order, (position, local_id) in enumerate(targets):
+                hits = fetch(position, local_id, count)
+                if count is not None and len(hits) >= count:
+                    exhausted = False
+                for rank, (score, citation, item) in enumerate(hits):
+                    if not self._is_duplicate(position, citation):
+                        merged.append((-score, order, rank, item))
+            merged.sort(key=lambda hit: hit[:3])
+            if limit is None or len(merged) >= limit or exhausted:
+                return [item for *_, item in merged[:limit]]
+            factor *= 2
+
+    def get_tags(self) -> List[str]:
+        """
+        Get all unique tags sorted alphabetically.
+
+        Returns:
+            List of unique tag names
+        """
+        tags: Set[str] = set()
+        for summary in self._statistics_summaries():
+            tags.update(summary.tags)
+        return sorted(tags)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get statistics about all shards, in the format of CitationLibrary.
+
+        Domains are counted and labelled after merging. Without dedupe the
+        statistics come from the summaries taken when the shards were
+        opened and no shard is loaded; with dedupe every shard is loaded
+        once to count only the citations that are kept.
+
+        Returns:
+            Dictionary with various statistics
+        """
+        summaries = self._statistics_summaries()
+        years = [
+            year for summary in summaries
+            for year in (summary.year_min, summary.year_max) if year is not None
+        ]
+        by_type: Counter = Counter()
+        by_domain: Counter = Counter()
+        tags: Set[str] = set()
+        for position, summary in enumerate(summaries):
+            by_type.update(summary.by_type)
+            local = self._shard_domains[position]
+            for domain_id, count in summary.by_domain.items():
+                domain = local.get(domain_id) or self._domains_by_id.get(domain_id)
+                by_domain[domain.name if domain else domain_id] += count
+            tags.update(summary.tags)
+
+        return {
+            "total_citations": sum(summary.total for summary in summaries),
+            "total_domains": len(self._domains),
+            "total_tags": len(tags),
+            "year_range": {
+                "min": min(years) if years else None,
+                "max": max(years) if years else None
+            },
+            "by_type": dict(by_type),
+            "by_domain": dict(by_domain)
+        }
+
+    def _statistics_summaries(self) -> List[_ShardSummary]:
+        """Return per-shard summaries of the citations kept after dedupe."""
+        if not self.dedupe:
+            return self._summaries
+        if self._unique_summaries is None:
+            self._unique_summaries = [
+                _summarize(c for c in self._shard(position) if not self._is_duplicate(position, c))
+                for position in range(len(self.paths))
+            ]
+        return self._unique_summaries
+
+    def _domain_names(self) -> Dict[str, str]:
+        """Map every shard's domain IDs to merged domain names."""
+        names: Dict[str, str] = {}
+        for local in self._shard_domains:
+            for domain_id, domain in local.items():
+                names.setdefault(domain_id, domain.name)
+        return names
+
+    def to_dataframe(self, lists: bool = False):
+        """
+        Convert the citations of every shard to one pandas DataFrame.
+
+        Args:
+            lists: Keep ``authors`` and ``tags`` as list columns instead of
+                ``"; "``-joined strings
+
+        Returns:
+            pandas.DataFrame with citation data and merged domain names
+
+        Raises:
+            ImportError: If pandas is not installed
+        """
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "pandas is required for to_dataframe(). Install with: pip install pandas"
+            )
+
+        columns = columnar.build_columns(self, self._domain_names())
+        return columnar.to_pandas(columns, lists=lists)
+
+    def export_bibtex(self, citations: Optional[Iterable[Citation]] = None) -> str:
+        """
+        Export citations to BibTeX format with keys unique across shards.
+
+        Args:
+            citations: Citations to export (defaults to all)
+
+        Returns:
+            BibTeX formatted string
+        """
+        citations = self if citations is None else citations
+        return "\n\n".join(self.formatter.format_many(citations, "bibtex"))
+
+    def export_json(
+        self,
+        citations: Optional[Iterable[Citation]] = None,
+        indent: int = 2
+    ) -> str:
+        """
+        Export citations to JSON format.
+
+        Args:
+            citations: Citations to export (defaults to all)
+            indent: JSON indentation level
+
+        Returns:
+            JSON formatted string
+        """
+        buffer = io.StringIO()
+        self.write_json(buffer, citations, indent=indent)
+        return buffer.getvalue()
+
+    def write_bibtex(
+        self,
+        dest: Union[str, Path, IO[str]],
+        citations: Optional[Iterable[Citation]] = None,
+        workers: int = 1,
+        chunk_size: int = writers.DEFAULT_CHUNK_SIZE,
+        compress: Optional[bool] = None
+    ) -> None:
+        """
+        Write citations in BibTeX format to a file or stream.
+
+        Args:
+            dest: Output path or text stream
+            citations: Citations to write (defaults to all)
+            workers: Worker processes used for formatting, in order
+            chunk_size: Citations formatted per chunk
+            compress: gzip the output; None compresses paths ending in ``.gz``
+        """
+        citations = self if citations is None else citations
+        writers.write_bibtex(citations, dest, workers, chunk_size, compress)
+
+    def write_json(
+        self,
+        dest: Union[str, Path, IO[str]],
+        citations: Optional[Iterable[Citation]] = None,
+        indent: Optional[int] = 2,
+        workers: int = 1,
+        chunk_size: int = writers.DEFAULT_CHUNK_SIZE,
+        compress: Optional[bool] = None
+    ) -> None:
+        """
+        Write citations in JSON format to a file or stream.
+
+        Args:
+            dest: Output path or text stream
+            citations: Citations to write (defaults to all)
+            indent: JSON indentation level
+            workers: Worker processes used for formatting, in order
+            chunk_size: Citations formatted per chunk
+            compress: gzip the output; None compresses paths ending in ``.gz``
+        """
+        citations = self if citations is None else citations
+        writers.write_json(citations, dest, indent, workers, chunk_size, compress)
@@ -0,0 +1,145 @@
+"""
+Binary snapshot cache for fast library startup.
+
+A snapshot is a sidecar file next to the JSON export holding the parsed
+records (as a columnar ``CitationStore``), the domains and, if it was built
+while loading, the ``SearchIndex``. It is only reused while it matches the export it was built
+from, identified by size, modification time and content hash.
+
+Snapshots are pickles and must only be loaded from trusted locations.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .index import SearchIndex
+from .models import Domain
+from .store import CitationStore
+
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Bump whenever the pickled layout of the payload changes, including the
+# layout of the Domain, CitationStore and SearchIndex objects it holds.
+SNAPSHOT_VERSION = 2
+
+_MAGIC = b"CTSNAP\x00\x01"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+class Snapshot(NamedTuple):
+    """Parsed contents of an export, ready to back a CitationLibrary."""
+    citations: CitationStore
+    domains: List[Domain]
+    search_index: Optional[SearchIndex]
+
+
+def default_snapshot_path(data_path: Path) -> Path:
+    """Return the sidecar path used for an export (``<name>.snapshot``)."""
+    return data_path.with_name(data_path.name + SNAPSHOT_SUFFIX)
+
+
+def content_hash(path: Path) -> str:
+    """Return the BLAKE2b digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(data_path: Path) -> Dict[str, Any]:
+    """Return the size and modification time identifying an export's version."""
+    stat = data_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_snapshot(snapshot_path: Path, data_path: Path) -> Optional[Snapshot]:
+    """
+    Load a snapshot if it is still valid for the export.
+
+    Size and modification time are compared first; if they differ (for
+    example after a copy or ``touch``) the export's content hash decides.
+
+    Args:
+        snapshot_path: Path of the snapshot file
+        data_path: Path of the JSON export it should describe
+
+    Returns:
+        The snapshot, or None if it is missing, stale or unreadable
+    """
+    try:
+        with open(snapshot_path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(_MAGIC)] != _MAGIC:
+                return None
+            start = len(_MAGIC) + _HEADER_LENGTH.size
+            (header_length,) = _HEADER_LENGTH.unpack_from(mapped, len(_MAGIC))
+            header = json.loads(mapped[start:start + header_length])
+            if header.get("version") != SNAPSHOT_VERSION:
+                return None
+
+            source = header.get("source", {})
+            current = source_key(data_path)
+            if current["size"] != source.get("size"):
+                return None
+            if (current["mtime_ns"] != source.get("mtime_ns")
+                    and content_hash(data_path) != source.get("hash")):
+                return None
+
+            with memoryview(mapped) as view:
+                payload = pickle.loads(view[start + header_length:])
+    except Exception:
+        # Any unreadable or incompatible snapshot just means a full parse
+        return None
+
+    if not isinstance(payload, Snapshot):
+        return None
+    return payload
+
+
+def write_snapshot(
+    snapshot_path: Path,
+    data_path: Path,
+    snapshot: Snapshot,
+    parsed_source: Dict[str, Any]
+) -> bool:
+    """
+    Write a snapshot for an export.
+
+    The file is written next to its final location and renamed into place,
+    so readers never observe a partial snapshot. Nothing is written if the
+    export changed since it was parsed.
+
+    Args:
+        snapshot_path: Path of the snapshot file
+        data_path: Path of the JSON export the snapshot describes
+        snapshot: Parsed contents to store
+        parsed_source: ``source_key()`` of the export taken before parsing
+
+    Returns:
+        True if the snapshot was written
+    """
+    source = source_key(data_path)
+    if source != parsed_source:
+        return False
+    source["hash"] = content_hash(data_path)
+    header = json.dumps({"version": SNAPSHOT_VERSION, "source": source}).encode("utf-8")
+
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return True
@@ -0,0 +1,242 @@
+"""
+Compact columnar storage for large citation libraries.
+"""
+
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from .models import Citation, CitationType
+
+_TYPES: List[CitationType] = list(CitationType)
+_TYPE_CODES: Dict[CitationType, int] = {t: i for i, t in enumerate(_TYPES)}
+
+# Sentinels for missing values in numeric columns.
+_NO_YEAR = -(1 << 63)
+_NO_DATE = -(1 << 63)
+_NAIVE = -(1 << 31)
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class StringTable:
+    """Interning table that maps repeated strings to small integer codes."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def code(self, value: Optional[str]) -> int:
+        """Return the code for a string, adding it if needed (-1 for None)."""
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self._codes[value] = code
+            self.strings.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Return the code for a string without adding it (-1 if unknown)."""
+        return self._codes.get(value, -1)
+
+    def get(self, code: int) -> Optional[str]:
+        """Return the string for a code (None for -1)."""
+        return self.strings[code] if code >= 0 else None
+
+
+def _encode_datetime(value: Optional[datetime]) -> Tuple[int, int]:
+    """Encode a datetime as (microseconds since epoch, UTC offset in seconds)."""
+    if value is None:
+        return _NO_DATE, _NAIVE
+    offset = value.utcoffset()
+    if offset is None:
+        delta = value - _EPOCH
+        tz = _NAIVE
+    else:
+        delta = value - _EPOCH_UTC
+        tz = int(offset.total_seconds())
+    micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return micros, tz
+
+
+def _decode_datetime(micros: int, tz: int) -> Optional[datetime]:
+    """Inverse of ``_encode_datetime``."""
+    if micros == _NO_DATE:
+        return None
+    if tz == _NAIVE:
+        return _EPOCH + timedelta(microseconds=micros)
+    return (_EPOCH_UTC + timedelta(microseconds=micros)).astimezone(
+        timezone(timedelta(seconds=tz))
+    )
+
+
+class CitationStore(Sequence[Citation]):
+    """
+    Column-oriented, read-only sequence of citations.
+
+    Fields that repeat across records (venue, publisher, month, volume,
+    issue, pages, domain IDs, authors and tags) are interned into string
+    tables and stored as integer codes in ``array`` columns. Authors and
+    tags are flattened into a single code array per field with an offset
+    array marking where each record's values start. Years, types and
+    timestamps are plain numeric arrays. Mostly-unique text (ID, title,
+    abstract, notes, DOI, URL, ISBN) is kept in lists of strings.
+
+    ``Citation`` objects are only created when an element is accessed, and
+    each access returns a fresh object: modifying it does not change the
+    store.
+
+    Example:
+        >>> store = CitationStore(library.citations)
+        >>> store[0].title
+        'Attention Is All You Need'
+    """
+
+    def __init__(self, citations: Iterable[Citation] = ()):
+        """
+        Create a store.
+
+        Args:
+            citations: Initial citations to append, in order
+        """
+        self._strings = StringTable()
+
+        # Mostly-unique text columns
+        self._ids: List[str] = []
+        self._titles: List[str] = []
+        self._dois: List[Optional[str]] = []
+        self._urls: List[Optional[str]] = []
+        self._isbns: List[Optional[str]] = []
+        self._abstracts: List[Optional[str]] = []
+        self._notes: List[Optional[str]] = []
+
+        # Interned code columns (-1 means None)
+        self._venues = array("i")
+        self._volumes = array("i")
+        self._issues = array("i")
+        self._pages = array("i")
+        self._months = array("i")
+        self._publishers = array("i")
+        self._domain_ids = array("i")
+
+        # Numeric columns
+        self._types = array("B")
+        self._years = array("q")
+        self._added = array("q")
+        self._added_tz = array("i")
+        self._modified = array("q")
+        self._modified_tz = array("i")
+
+        # Multi-valued columns: flattened codes plus per-record start offsets
+        self._author_codes = array("I")
+        self._author_offsets = array("I", [0])
+        self._tag_codes = array("I")
+        self._tag_offsets = array("I", [0])
+
+        self.extend(citations)
+
+    def append(self, citation: Citation) -> None:
+        """Append a citation to the end of the store."""
+        code = self._strings.code
+
+        self._ids.append(citation.id)
+        self._titles.append(citation.title)
+        self._dois.append(citation.doi)
+        self._urls.append(citation.url)
+        self._isbns.append(citation.isbn)
+        self._abstracts.append(citation.abstract)
+        self._notes.append(citation.notes)
+
+        self._venues.append(code(citation.journal_or_conference))
+        self._volumes.append(code(citation.volume))
+        self._issues.append(code(citation.issue))
+        self._pages.append(code(citation.pages))
+        self._months.append(code(citation.month))
+        self._publishers.append(code(citation.publisher))
+        self._domain_ids.append(code(citation.domain_id))
+
+        self._types.append(_TYPE_CODES[citation.type])
+        self._years.append(_NO_YEAR if citation.year is None else citation.year)
+        micros, tz = _encode_datetime(citation.date_added)
+        self._added.append(micros)
+        self._added_tz.append(tz)
+        micros, tz = _encode_datetime(citation.date_modified)
+        self._modified.append(micros)
+        self._modified_tz.append(tz)
+
+        self._author_codes.extend(code(a) for a in citation.authors)
+        self._author_offsets.append(len(self._author_codes))
+        self._tag_codes.extend(code(t) for t in citation.tags)
+        self._tag_offsets.append(len(self._tag_codes))
+
+    def extend(self, citations: Iterable[Citation]) -> None:
+        """Append several citations in order."""
+        for citation in citations:
+            self.append(citation)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Citation: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Citation]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Citation, List[Citation]]:
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("CitationStore index out of range")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[Citation]:
+        for i in range(len(self)):
+            yield self._materialize(i)
+
+    @property
+    def ids(self) -> Sequence[str]:
+        """Citation IDs in store order, without materializing citations."""
+        return self._ids
+
+    def __repr__(self) -> str:
+        return f"<CitationStore of {len(self)} citations>"
+
+    def _materialize(self, i: int) -> Citation:
+        """Build the Citation object for row ``i``."""
+        strings = self._strings.strings
+        get = self._strings.get
+        year = self._years[i]
+        return Citation(
+            id=self._ids[i],
+            title=self._titles[i],
+            authors=[strings[c] for c in self._author_codes[
+                self._author_offsets[i]:self._author_offsets[i + 1]]],
+            type=_TYPES[self._types[i]],
+            journal_or_conference=get(self._venues[i]),
+            volume=get(self._volumes[i]),
+            issue=get(self._issues[i]),
+            pages=get(self._pages[i]),
+            year=None if year == _NO_YEAR else year,
+            month=get(self._months[i]),
+            publisher=get(self._publishers[i]),
+            doi=self._dois[i],
+            url=self._urls[i],
+            isbn=self._isbns[i],
+            abstract=self._abstracts[i],
+            notes=self._notes[i],
+            tags=[strings[c] for c in self._tag_codes[
+                self._tag_offsets[i]:self._tag_offsets[i + 1]]],
+            domain_id=get(self._domain_ids[i]),
+            date_added=_decode_datetime(self._added[i], self._added_tz[i]),
+            date_modified=_decode_datetime(self._modified[i], self._modified_tz[i]),
+        )
@@ -0,0 +1,137 @@
+"""
+Incremental reader for Citation Tool JSON exports.
+
+The export is a single JSON object whose ``citations`` and ``domains``
+members are (potentially very large) arrays. This module walks the top-level
+object with a small buffered scanner and decodes one array element at a
+time, so memory stays proportional to a single record rather than to the
+whole file.
+"""
+
+import json
+import re
+from typing import IO, Any, Collection, Iterator, Tuple
+
+# Default number of characters read from the file per refill.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class _JsonScanner:
+    """Buffered cursor over a text stream that decodes one JSON value at a time."""
+
+    def __init__(self, fp: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Append up to ``size`` characters to the buffer; return False at EOF."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            skipped = _WHITESPACE.match(self._buf, self._pos)
+            # The pattern also matches the empty string, so it never fails
+            assert skipped is not None
+            self._pos = skipped.end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume ``char`` (after optional whitespace) or raise."""
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(
+                f"Expecting {char!r}, found {found or 'end of input'!r}", self._buf, self._pos
+            )
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number ending at (or just before a partial exponent at) the
+            # buffer edge may be truncated; only accept it once more input
+            # confirms the boundary.
+            if (end == len(self._buf) or self._buf[end] in _NUMBER_CHARS) and self._fill(size):
+                continue
+            self._pos = end
+            return obj
+
+
+def iter_export_items(
+    fp: IO[str],
+    sections: Collection[str] = ("citations", "domains"),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the elements of top-level arrays in a Citation Tool export.
+
+    Other top-level members (``version``, ``exportDate``, ...) are decoded
+    and discarded.
+
+    Args:
+        fp: Text stream positioned at the start of the export
+        sections: Names of the top-level arrays whose elements are yielded
+        chunk_size: Number of characters read per refill
+
+    Yields:
+        ``(section, item)`` tuples in file order, where ``item`` is the
+        decoded JSON element (usually a dict)
+
+    Raises:
+        json.JSONDecodeError: If the input is not a valid export
+    """
+    scanner = _JsonScanner(fp, chunk_size)
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+
+    while True:
+        key = scanner.value()
+        scanner.expect(":")
+        if key in sections and scanner.peek() == "[":
+            scanner.expect("[")
+            if scanner.peek() == "]":
+                scanner.expect("]")
+            else:
+                while True:
+                    yield key, scanner.value()
+                    if scanner.peek() == ",":
+                        scanner.expect(",")
+                    else:
+                        scanner.expect("]")
+                        break
+        else:
+            scanner.value()
+
+        if scanner.peek() == ",":
+            scanner.expect(",")
+        else:
+            scanner.expect("}")
+            return
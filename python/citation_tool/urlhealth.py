@@ -0,0 +1,342 @@
+"""
+Asynchronous URL health checks.
+
+Follows the web app's ``UrlHealthService``: a HEAD request with the same
+User-Agent, success meaning a 2xx final status and the same error messages.
+Requests are made with asyncio streams over a pool of keep-alive
+connections. A global concurrency cap and per-host limits keep the load on
+any single server bounded.
+
+Servers that reject HEAD are retried with GET, redirects are followed, and
+timeouts, connection failures and 429/502/503/504 responses are retried
+with exponential backoff. Results can be kept in an on-disk cache
+(``ResultCache``) so that re-runs only check URLs whose result has expired.
+"""
+
+import asyncio
+import socket
+import ssl
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import urljoin
+
+from .httpclient import ConnectionPool, HostKey, ProtocolError, parse_target
+from .models import UrlHealthStatus
+from .resultcache import ResultCache
+
+USER_AGENT = "CitationManager/1.0 (Health Check)"
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 10.0
+
+# Cached healthy results are reused for a week, failures for a day
+DEFAULT_TTL = 7 * 24 * 3600.0
+DEFAULT_ERROR_TTL = 24 * 3600.0
+
+CACHE_NAMESPACE = "url-health"
+
+# HEAD responses that mean "try GET instead"
+_HEAD_FALLBACK_STATUSES = frozenset({405, 501})
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_MAX_RETRY_AFTER = 60.0
+_CACHE_FLUSH_SIZE = 500
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _retry_after(headers: Dict[str, str], default: float) -> float:
+    value = headers.get("retry-after", "")
+    try:
+        return min(max(float(value), 0.0), _MAX_RETRY_AFTER)
+    except ValueError:
+        return default
+
+
+def _failure(message: str) -> UrlHealthStatus:
+    return UrlHealthStatus(
+        checked_at=datetime.now(timezone.utc),
+        status_code=0,
+        is_healthy=False,
+        error_message=message
+    )
+
+
+class _Checker:
+    """Checks URLs under global and per-host concurrency limits."""
+
+    def __init__(
+        self,
+        concurrency: int,
+        per_host: int,
+        per_host_interval: float,
+        timeout: float,
+        retries: int,
+        backoff: float,
+        max_redirects: int,
+        user_agent: str,
+        ssl_context: Optional[ssl.SSLContext]
+    ):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_redirects = max_redirects
+        self.pool = ConnectionPool(ssl_context, self.per_host)
+        self.headers = {"User-Agent": user_agent, "Accept": "*/*"}
+
+    async def check(self, url: str) -> UrlHealthStatus:
+        """Check one URL, following redirects and retrying transient failures."""
+        if not url or not url.strip():
+            return _failure("URL is empty")
+        target = parse_target(url.strip())
+        if target is None:
+            return _failure("Invalid URL format")
+
+        method = "HEAD"
+        redirects = 0
+        attempt = 0
+        while True:
+            checked_at = datetime.now(timezone.utc)
+            retryable = False
+            try:
+                response = await asyncio.wait_for(
+                    self.pool.request(target, method, self.headers, read_body=False), self.timeout
+                )
+            except asyncio.TimeoutError:
+                error, retryable = "Request timed out", True
+            except (ssl.SSLError, ssl.CertificateError):
+                error = "SSL/TLS certificate error"
+            except socket.gaierror:
+                error = "Domain not found"
+            except (OSError, asyncio.IncompleteReadError):
+                error, retryable = "Connection failed", True
+            except ProtocolError:
+                error = "Invalid HTTP response"
+            except Exception as e:
+                error = f"Unexpected error: {e}"
+            else:
+                status = response.status
+                if method == "HEAD" and status in _HEAD_FALLBACK_STATUSES:
+                    method = "GET"
+                    continue
+                location = response.headers.get("location")
+                if 300 <= status < 400 and location and redirects < self.max_redirects:
+                    next_target = parse_target(urljoin(url, location))
+                    if next_target is not None:
+                        url = urljoin(url, location)
+                        target = next_target
+                        redirects += 1
+                        method = "HEAD"
+                        continue
+                if status in _RETRY_STATUSES and attempt < self.retries:
+                    attempt += 1
+                    delay = self.backoff * 2 ** (attempt - 1)
+                    await asyncio.sleep(_retry_after(response.headers, delay))
+                    continue
+                healthy = 200 <= status < 300
+                return UrlHealthStatus(
+                    checked_at=checked_at,
+                    status_code=status,
+                    is_healthy=healthy,
+                    error_message=None if healthy else (response.reason or None)
+                )
+
+            if retryable and attempt < self.retries:
+                attempt += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+                continue
+            return UrlHealthStatus(checked_at, 0, False, error)
+
+    async def run(
+        self,
+        urls: List[str],
+        on_result: Callable[[str, UrlHealthStatus], None]
+    ) -> None:
+        """
+        Check every URL, calling ``on_result`` as each one finishes.
+
+        A fixed set of workers pulls URLs from per-host queues. A host is
+        only handed out while it has fewer than ``per_host`` requests in
+        flight, so a slow or popular host never occupies the global slots.
+        Redirects are followed within the slot of the URL's own host.
+        """
+        queues: Dict[Optional[HostKey], Deque[str]] = {}
+        for url in urls:
+            target = parse_target(url.strip()) if url and url.strip() else None
+            queues.setdefault(target.key if target else None, deque()).append(url)
+
+        ready: Deque[Optional[HostKey]] = deque(queues)
+        in_ready: Set[Optional[HostKey]] = set(queues)
+        active: Dict[Optional[HostKey], int] = {key: 0 for key in queues}
+        next_start: Dict[Optional[HostKey], float] = {}
+        remaining = len(urls)
+        condition = asyncio.Condition()
+        loop = asyncio.get_running_loop()
+
+        def can_dispatch(key: Optional[HostKey]) -> bool:
+            # Invalid URLs (key None) need no network and are never limited
+            return bool(queues[key]) and (key is None or active[key] < self.per_host)
+
+        async def worker() -> None:
+            nonlocal remaining
+            while True:
+                async with condition:
+                    while not ready:
+                        if remaining == 0:
+                            return
+                        await condition.wait()
+                    key = ready.popleft()
+                    in_ready.discard(key)
+                    url = queues[key].popleft()
+                    remaining -= 1
+                    active[key] += 1
+                    if can_dispatch(key):
+                        ready.append(key)
+                        in_ready.add(key)
+                    delay = 0.0
+                    if key is not None and self.per_host_interval > 0:
+                        now = loop.time()
+                        start = max(now, next_start.get(key, now))
+                        next_start[key] = start + self.per_host_interval
+                        delay = start - now
+                    if remaining == 0:
+                        condition.notify_all()
+                try:
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    result = await self.check(url)
+                finally:
+                    async with condition:
+                        active[key] -= 1
+                        if key not in in_ready and can_dispatch(key):
+                            ready.append(key)
+                            in_ready.add(key)
+                            condition.notify()
+                on_result(url, result)
+
+        workers = min(self.concurrency, len(urls))
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            self.pool.close()
+
+
+async def check_urls_async(
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    per_host_interval: float = 0.0,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = 2,
+    backoff: float = 0.5,
+    max_redirects: int = 5,
+    cache_path: Optional[Union[str, Path]] = None,
+    ttl: float = DEFAULT_TTL,
+    error_ttl: float = DEFAULT_ERROR_TTL,
+    user_agent: str = USER_AGENT,
+    ssl_context: Optional[ssl.SSLContext] = None,
+    progress: Optional[ProgressCallback] = None
+) -> Dict[str, UrlHealthStatus]:
+    """
+    Check many URLs concurrently (coroutine version of check_urls()).
+
+    Args:
+        urls: URLs to check; duplicates are checked once
+        concurrency: Maximum requests in flight overall
+        per_host: Maximum requests in flight per host (also the number of
+            idle keep-alive connections kept per host). Limits apply to the
+            host of each input URL: a redirect to another host is followed
+            within the original host's slot, so a host that many URLs
+            redirect to can see up to ``concurrency`` requests at once.
+        per_host_interval: Minimum seconds between request starts to the
+            same host (redirects are followed immediately)
+        timeout: Seconds allowed per request attempt
+        retries: Extra attempts after a timeout, connection failure or a
+            429/502/503/504 response
+        backoff: Delay before the first retry, doubled for each later one
+            (a numeric Retry-After header takes precedence)
+        max_redirects: Redirects followed before the 3xx status is reported
+        cache_path: SQLite file caching results between runs
+        ttl: Seconds a healthy cached result stays fresh
+        error_ttl: Seconds an unhealthy cached result stays fresh
+        user_agent: User-Agent header sent with each request
+        ssl_context: TLS settings for https URLs (defaults to system trust)
+        progress: Called with ``(completed, total)`` after each URL
+
+    Returns:
+        Dictionary of URL to UrlHealthStatus
+    """
+    unique = list(dict.fromkeys(urls))
+    total = len(unique)
+    results: Dict[str, UrlHealthStatus] = {}
+
+    cache = ResultCache(cache_path, CACHE_NAMESPACE) if cache_path is not None else None
+    try:
+        if cache is not None:
+            now = datetime.now(timezone.utc)
+            for url, data in cache.get_many(unique).items():
+                status = UrlHealthStatus.from_dict(data)
+                # Honour this run's TTLs for entries written with longer ones
+                max_age = ttl if status.is_healthy else error_ttl
+                if status.checked_at and (now - status.checked_at).total_seconds() < max_age:
+                    results[url] = status
+            if progress is not None and results:
+                progress(len(results), total)
+
+        unflushed: List[Tuple[str, dict, float]] = []
+
+        def flush() -> None:
+            if cache is not None and unflushed:
+                cache.put_many(unflushed)
+                unflushed.clear()
+
+        def on_result(url: str, status: UrlHealthStatus) -> None:
+            results[url] = status
+            if cache is not None:
+                unflushed.append((url, status.to_dict(), ttl if status.is_healthy else error_ttl))
+                if len(unflushed) >= _CACHE_FLUSH_SIZE:
+                    flush()
+            if progress is not None:
+                progress(len(results), total)
+
+        checker = _Checker(
+            concurrency, per_host, per_host_interval, timeout, retries, backoff,
+            max_redirects, user_agent, ssl_context
+        )
+        try:
+            await checker.run([url for url in unique if url not in results], on_result)
+        finally:
+            # Keep whatever finished, even if the run was interrupted
+            flush()
+    finally:
+        if cache is not None:
+            cache.close()
+
+    return {url: results[url] for url in unique if url in results}
+
+
+def check_urls(urls: Iterable[str], **options) -> Dict[str, UrlHealthStatus]:
+    """
+    Check many URLs concurrently.
+
+    Runs check_urls_async() in a new event loop; from code that already
+    runs an event loop (e.g. Jupyter), await check_urls_async() instead.
+
+    Args:
+        urls: URLs to check
+        **options: Any option of check_urls_async()
+
+    Returns:
+        Dictionary of URL to UrlHealthStatus
+
+    Example:
+        >>> results = check_urls(["https://example.org"], cache_path="health.sqlite")
+        >>> results["https://example.org"].is_healthy
+        True
+    """
+    return asyncio.run(check_urls_async(urls, **options))
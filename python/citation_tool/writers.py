@@ -0,0 +1,173 @@
+"""
+Streaming writers for BibTeX and JSON exports.
+
+Citations are formatted in fixed-size chunks and written as soon as each
+chunk is ready, so memory use does not grow with the size of the export.
+Chunks can be formatted in worker processes; results are always written in
+input order.
+"""
+
+import gzip
+import json
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice, tee
+from pathlib import Path
+from typing import IO, Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .formatting import unique_bibtex_keys
+from .models import Citation
+
+DEFAULT_CHUNK_SIZE = 1000
+
+Destination = Union[str, Path, IO[str]]
+
+
+def _format_bibtex_chunk(entries: List[Tuple[Citation, str]]) -> str:
+    return "\n\n".join(c.format_bibtex(key) for c, key in entries)
+
+
+def _with_unique_keys(citations: Iterable[Citation]) -> Iterator[Tuple[Citation, str]]:
+    """Pair citations with library-wide unique BibTeX keys as they stream past."""
+    citations, keyed = tee(citations)
+    return zip(citations, unique_bibtex_keys(keyed))
+
+
+class _JsonChunkFormatter:
+    """Formats citations exactly as ``json.dumps(list, indent=indent)`` would."""
+
+    def __init__(self, indent: Optional[Union[int, str]]):
+        self.indent = indent
+        if indent is None:
+            self.prefix = None
+            self.separator = ", "
+        else:
+            self.prefix = " " * indent if isinstance(indent, int) else indent
+            self.separator = ",\n"
+
+    def __call__(self, citations: List[Citation]) -> str:
+        items = [json.dumps(c.to_dict(), indent=self.indent) for c in citations]
+        if self.prefix is not None:
+            items = [self.prefix + item.replace("\n", "\n" + self.prefix) for item in items]
+        return self.separator.join(items)
+
+
+@contextmanager
+def _open_destination(dest: Destination, compress: Optional[bool]) -> Iterator[IO[str]]:
+    """Open a path for text writing (gzip-compressed if requested) or pass a stream through."""
+    if isinstance(dest, (str, Path)):
+        path = Path(dest)
+        if compress is None:
+            compress = path.suffix == ".gz"
+        if compress:
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                yield f
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                yield f
+    else:
+        if compress:
+            raise ValueError("compress is only supported when writing to a path")
+        yield dest
+
+
+def _formatted_chunks(
+    items: Iterable[Any],
+    formatter: Callable[[List[Any]], str],
+    chunk_size: int,
+    workers: int,
+) -> Iterator[str]:
+    """Format items chunk by chunk, optionally in worker processes, preserving order."""
+    iterator = iter(items)
+
+    def chunks() -> Iterator[List[Any]]:
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    if workers <= 1:
+        for chunk in chunks():
+            yield formatter(chunk)
+        return
+
+    # Keep a bounded window of chunks in flight so memory stays constant
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks():
+            pending.append(pool.submit(formatter, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_joined(f: IO[str], parts: Iterable[str], separator: str) -> None:
+    for i, part in enumerate(parts):
+        if i:
+            f.write(separator)
+        f.write(part)
+
+
+def write_bibtex(
+    citations: Iterable[Citation],
+    dest: Destination,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: Optional[bool] = None,
+) -> None:
+    """
+    Write citations as BibTeX entries separated by blank lines.
+
+    Entry keys are made unique across the whole output (see
+    ``unique_bibtex_keys()``).
+
+    Args:
+        citations: Citations to write
+        dest: Output path or text stream
+        workers: Worker processes used for formatting (1 formats in-process)
+        chunk_size: Citations formatted per chunk
+        compress: gzip the output; None compresses paths ending in ``.gz``
+    """
+    with _open_destination(dest, compress) as f:
+        entries = _with_unique_keys(citations)
+        chunks = _formatted_chunks(entries, _format_bibtex_chunk, chunk_size, workers)
+        _write_joined(f, chunks, "\n\n")
+
+
+def write_json(
+    citations: Iterable[Citation],
+    dest: Destination,
+    indent: Optional[Union[int, str]] = 2,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: Optional[bool] = None,
+) -> None:
+    """
+    Write citations as a JSON array, formatted like ``json.dumps(..., indent=indent)``.
+
+    Args:
+        citations: Citations to write
+        dest: Output path or text stream
+        indent: JSON indentation level
+        workers: Worker processes used for formatting (1 formats in-process)
+        chunk_size: Citations formatted per chunk
+        compress: gzip the output; None compresses paths ending in ``.gz``
+    """
+    formatter = _JsonChunkFormatter(indent)
+    with _open_destination(dest, compress) as f:
+        chunks = _formatted_chunks(citations, formatter, chunk_size, workers)
+        opening = "[" if indent is None else "[\n"
+        closing = "]" if indent is None else "\n]"
+        first = next(chunks, None)
+        if first is None:
+            f.write("[]")
+            return
+        f.write(opening)
+        f.write(first)
+        for chunk in chunks:
+            f.write(formatter.separator)
+            f.write(chunk)
+        f.write(closing)
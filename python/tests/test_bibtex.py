@@ -0,0 +1,30 @@
+"""Tests for the streaming BibTeX parser."""
+
+from citation_tool.bibtex import _MIN_PARALLEL_BYTES, iter_bibtex
+
+
+def _entry(key: str, journal: str) -> str:
+    return (
+        f"@article{{{key},\n  title = {{Paper {key}}},\n"
+        f"  journal = {journal},\n  year = 2020\n}}\n"
+    )
+
+
+def test_parallel_parse_matches_serial_macros(tmp_path):
+    # Early entries use a macro that is defined later, and "j" is redefined halfway
+    count = _MIN_PARALLEL_BYTES // len(_entry("k000000", "j")) + 1
+    parts = ['@string{j = "Journal A"}\n']
+    parts += [_entry(f"a{i:06d}", "j # late") for i in range(count)]
+    parts += ['@string{j = "Journal B"}\n', '@string{late = " Late"}\n']
+    parts += [_entry(f"b{i:06d}", "j # late") for i in range(count)]
+    path = tmp_path / "refs.bib"
+    path.write_text("".join(parts), encoding="utf-8")
+
+    def journals(workers: int):
+        return [(c.id, c.journal_or_conference) for c in iter_bibtex(path, workers=workers)]
+
+    serial = journals(1)
+    assert len(serial) == 2 * count
+    assert serial[0][1] == serial[count - 1][1] == "Journal A"
+    assert serial[count][1] == serial[-1][1] == "Journal B Late"
+    assert journals(4) == serial
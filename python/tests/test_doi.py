@@ -0,0 +1,64 @@
+"""Tests for batch DOI lookup against a local mock server."""
+
+import asyncio
+import json
+
+from citation_tool.doi import resolve_dois_async
+from citation_tool.models import DoiLookupErrorType
+
+_GOOD = json.dumps({"message": {"title": ["A Good Paper"], "type": "journal-article"}})
+_ODD = json.dumps({"message": {"title": ["An Odd Paper"], "author": 5}})
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            path = head.split(b" ", 2)[1]
+            if b"badlength" in path:
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: many\r\n\r\n")
+            elif b"bad" in path:
+                # Chunk size that is not hexadecimal
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n"
+                )
+            else:
+                body = (_ODD if b"odd" in path else _GOOD).encode("utf-8")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _resolve(dois):
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await resolve_dois_async(
+            dois, base_url=f"http://127.0.0.1:{port}/works/", retries=0, concurrency=1
+        )
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_malformed_response_fails_only_its_doi():
+    results = asyncio.run(_resolve(["10.1000/bad", "10.1000/badlength", "10.1000/b2"]))
+
+    for doi in ("10.1000/bad", "10.1000/badlength"):
+        assert not results[doi].success
+        assert results[doi].error_type == DoiLookupErrorType.PARSE_ERROR
+    assert results["10.1000/b2"].success
+    assert results["10.1000/b2"].citation.title == "A Good Paper"
+
+
+def test_unexpected_field_types_are_ignored():
+    results = asyncio.run(_resolve(["10.1000/odd"]))
+
+    assert results["10.1000/odd"].success
+    assert results["10.1000/odd"].citation.title == "An Odd Paper"
+    assert results["10.1000/odd"].citation.authors == []
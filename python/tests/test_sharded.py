@@ -0,0 +1,30 @@
+"""Tests for querying several exports as one sharded library."""
+
+import json
+
+from citation_tool.sharded import ShardedCitationLibrary
+
+
+def _citation(citation_id: str, domain_id: str) -> dict:
+    return {
+        "id": citation_id, "title": f"Neural paper {citation_id}", "authors": ["Ada Lovelace"],
+        "type": "JournalArticle", "year": 2020, "tags": [], "domainId": domain_id,
+    }
+
+
+def test_domains_merged_by_name_are_all_searched(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps({
+        "version": "1.0",
+        "citations": [_citation("c1", "d1"), _citation("c2", "d2")],
+        "domains": [{"id": "d1", "name": "AI"}, {"id": "d2", "name": "ai"}],
+    }), encoding="utf-8")
+
+    with ShardedCitationLibrary([path], workers=1) as library:
+        assert [c.id for c in library.search(domain="AI")] == ["c1", "c2"]
+        assert [c.id for c in library.search(domain="d2")] == ["c2"]
+        assert [c.id for c in library.search("neural", domain="AI", ranked=True)] == ["c1", "c2"]
+        assert sorted(m.citation.id for m in library.fuzzy_search("neural", domain="AI")) == [
+            "c1", "c2"
+        ]
+        assert library.get_statistics()["by_domain"] == {"AI": 2}